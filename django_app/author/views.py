@@ -12,8 +12,9 @@ def dashboard(request):
     api = get_api_client()
     
     try:
-        all_stories = api.get_stories(status=None)
-        my_stories = [s for s in all_stories if s.get('author_id') == request.user.id]
+        my_stories = api.get_stories(
+            status=None, author_id=request.user.id, fields=['title', 'description', 'status']
+        )
     except Exception as e:
         messages.error(request, f"Could not load stories: {e}")
         my_stories = []
@@ -61,7 +62,7 @@ def edit_story(request, story_id):
     
     try:
         story = api.get_story(story_id)
-        tree = api.get_story_tree(story_id)
+        tree = api.get_story_tree(story_id, draft=True)
     except Exception as e:
         messages.error(request, f"Error loading story: {e}")
         return redirect('author:dashboard')
@@ -129,8 +130,8 @@ def edit_page(request, story_id, page_id):
     
     try:
         story = api.get_story(story_id)
-        page = api.get_page(page_id)
-        tree = api.get_story_tree(story_id)
+        page = api.get_page(page_id, draft=True)
+        tree = api.get_story_tree(story_id, draft=True)
     except Exception as e:
         messages.error(request, f"Error loading page: {e}")
         return redirect('author:edit_story', story_id=story_id)
@@ -174,7 +175,7 @@ def add_choice(request, story_id, page_id):
     
     api = get_api_client()
     try:
-        tree = api.get_story_tree(story_id)
+        tree = api.get_story_tree(story_id, draft=True)
         all_pages = [n for n in tree['nodes']]
     except:
         all_pages = []
@@ -230,19 +231,13 @@ def publish_story(request, story_id):
     
     try:
         story = api.get_story(story_id)
-        tree = api.get_story_tree(story_id)
+        tree = api.get_story_tree(story_id, draft=True)
+        report = api.validate_story(story_id)
     except Exception as e:
         messages.error(request, f"Error loading story: {e}")
         return redirect('author:dashboard')
     
-    errors = []
-    if len(tree['nodes']) < 2:
-        errors.append("Story must have at least 2 pages")
-    endings = [n for n in tree['nodes'] if n.get('is_ending')]
-    if not endings:
-        errors.append("Story must have at least one ending page")
-    if not story.get('start_page_id'):
-        errors.append("Story must have a start page")
+    errors = report['errors']
     
     if request.method == 'POST' and not errors:
         form = StoryPublishForm(request.POST)
@@ -256,7 +251,9 @@ def publish_story(request, story_id):
     else:
         form = StoryPublishForm()
     
-    return render(request, 'author/publish.html', {'form': form, 'story': story, 'tree': tree, 'errors': errors})
+    return render(request, 'author/publish.html', {
+        'form': form, 'story': story, 'tree': tree, 'errors': errors, 'warnings': report['warnings']
+    })
 
 
 @story_owner_required
@@ -291,7 +288,7 @@ def preview_story(request, story_id):
     api = get_api_client()
     try:
         story = api.get_story(story_id)
-        start_page = api.get_start_page(story_id)
+        start_page = api.get_start_page(story_id, draft=True)
     except Exception as e:
         messages.error(request, f"Error: {e}")
         return redirect('author:edit_story', story_id=story_id)
@@ -230,65 +230,27 @@ class Command(BaseCommand):
         for story_data in stories_data:
             self.stdout.write(f"\nCreating: {story_data['title']}")
             
-            # Create story
+            # Create story, pages and choices in one transactional import
             response = requests.post(
-                f'{base_url}/stories',
+                f'{base_url}/stories/import',
                 headers=headers,
                 json={
                     'title': story_data['title'],
                     'description': story_data['description'],
                     'author_id': story_data['author_id'],
-                    'illustration_url': story_data['illustration_url']
+                    'illustration_url': story_data.get('illustration_url'),
+                    'pages': story_data['pages'],
+                    'choices': story_data['choices'],
                 }
             )
             
             if response.status_code != 201:
-                self.stdout.write(self.style.ERROR(f"  Failed to create story: {response.text}"))
+                self.stdout.write(self.style.ERROR(f"  Failed to import story: {response.text}"))
                 continue
                 
             story = response.json()
             story_id = story['id']
-            self.stdout.write(f"  Story ID: {story_id}")
-            
-            # Create pages
-            page_ids = []
-            for i, page_data in enumerate(story_data['pages']):
-                page_response = requests.post(
-                    f'{base_url}/stories/{story_id}/pages',
-                    headers=headers,
-                    json={
-                        'text': page_data['text'],
-                        'is_ending': page_data.get('is_ending', False),
-                        'ending_label': page_data.get('ending_label', ''),
-                        'illustration_url': page_data.get('illustration_url', '')
-                    }
-                )
-                
-                if page_response.status_code == 201:
-                    page = page_response.json()
-                    page_ids.append(page['id'])
-                    self.stdout.write(f"  Page {i+1}: ID {page['id']}")
-                else:
-                    self.stdout.write(self.style.ERROR(f"  Failed to create page: {page_response.text}"))
-            
-            # Create choices
-            for choice_data in story_data['choices']:
-                from_page_id = page_ids[choice_data['from_page']]
-                to_page_id = page_ids[choice_data['to_page']]
-                
-                choice_response = requests.post(
-                    f'{base_url}/pages/{from_page_id}/choices',
-                    headers=headers,
-                    json={
-                        'text': choice_data['text'],
-                        'next_page_id': to_page_id
-                    }
-                )
-                
-                if choice_response.status_code == 201:
-                    self.stdout.write(f"  Choice: {choice_data['text'][:30]}...")
-                else:
-                    self.stdout.write(self.style.ERROR(f"  Failed: {choice_response.text}"))
+            self.stdout.write(f"  Story ID: {story_id} ({story['page_count']} pages)")
             
             # Publish story
             requests.put(
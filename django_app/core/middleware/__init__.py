@@ -1,3 +1,5 @@
 from .permissions import role_required, author_required, admin_required, story_owner_required
+from .read_your_writes import ReadYourWritesMiddleware
 
-__all__ = ['role_required', 'author_required', 'admin_required', 'story_owner_required']
+__all__ = ['role_required', 'author_required', 'admin_required', 'story_owner_required',
+           'ReadYourWritesMiddleware']
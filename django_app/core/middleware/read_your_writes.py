@@ -0,0 +1,31 @@
+"""
+Per-user read-your-writes for the Flask API's read replicas.
+
+FlaskAPIClient is shared by the whole process, so the API's
+read_primary_until cookie must not live in its session: one author's write
+would keep every user's reads on the primary. This middleware keeps the
+deadline in the end user's Django session instead and hands it to the
+client only for that user's requests.
+"""
+from core.services.api_client import get_read_primary_until, set_read_primary_until
+
+SESSION_KEY = 'api_read_primary_until'
+
+
+class ReadYourWritesMiddleware:
+    """Load the user's deadline before the view, store a newer one after it"""
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        stored = request.session.get(SESSION_KEY)
+        set_read_primary_until(stored)
+        try:
+            response = self.get_response(request)
+            until = get_read_primary_until()
+            if until and until != stored:
+                request.session[SESSION_KEY] = until
+        finally:
+            set_read_primary_until(None)
+        return response
@@ -8,9 +8,56 @@ Why Singleton?
 - Thread-safe with locking mechanism
 - Easy to mock for testing
 """
+import copy
 import requests
+from collections import OrderedDict
 from django.conf import settings
-from threading import Lock
+from http.cookiejar import DefaultCookiePolicy
+from requests.auth import AuthBase
+from threading import Lock, local
+from urllib.parse import urlencode
+from urllib3.util import make_headers
+
+
+# Number of ETag-validated responses kept for conditional requests
+VALIDATOR_CACHE_SIZE = 512
+
+# Encodings urllib3 can decode here ('br' only when brotli is installed)
+ACCEPT_ENCODING = make_headers(accept_encoding=True)['accept-encoding']
+
+# The API's read-your-writes cookie (flask_api/app/replicas.py). It belongs to
+# the end user whose request made the write, not to the shared session, so it
+# is kept per thread for the current request (see ReadYourWritesMiddleware).
+READ_PRIMARY_COOKIE = 'read_primary_until'
+_end_user = local()
+
+
+def get_read_primary_until():
+    """The current end user's read-your-writes deadline, or None"""
+    return getattr(_end_user, 'read_primary_until', None)
+
+
+def set_read_primary_until(value):
+    _end_user.read_primary_until = value
+
+
+class _SharedCookiePolicy(DefaultCookiePolicy):
+    """Keeps the per-user read-your-writes cookie out of the shared cookie jar"""
+    
+    def set_ok(self, cookie, request):
+        return cookie.name != READ_PRIMARY_COOKIE and super().set_ok(cookie, request)
+
+
+class _EndUserCookies(AuthBase):
+    """Adds the current end user's read-your-writes cookie to each request"""
+    
+    def __call__(self, request):
+        until = get_read_primary_until()
+        if until:
+            cookie = f'{READ_PRIMARY_COOKIE}={until}'
+            existing = request.headers.get('Cookie')
+            request.headers['Cookie'] = f'{existing}; {cookie}' if existing else cookie
+        return request
 
 
 class FlaskAPIClient:
@@ -38,9 +85,22 @@ class FlaskAPIClient:
         self._session = requests.Session()
         self._session.headers.update({
             'X-API-KEY': settings.FLASK_API_KEY,
-            'Content-Type': 'application/json'
+            'Content-Type': 'application/json',
+            'Accept-Encoding': ACCEPT_ENCODING
         })
+        self._session.cookies.set_policy(_SharedCookiePolicy())
+        self._session.auth = _EndUserCookies()
+        self._session.hooks['response'].append(self._remember_read_primary)
         self._base_url = settings.FLASK_API_URL
+        self._validators = OrderedDict()
+        self._validators_lock = Lock()
+    
+    @staticmethod
+    def _remember_read_primary(response, *args, **kwargs):
+        """Record a read-your-writes cookie for the current end user only"""
+        until = response.cookies.get(READ_PRIMARY_COOKIE)
+        if until:
+            set_read_primary_until(until)
     
     def _handle_response(self, response):
         """Centralized response handling"""
@@ -53,20 +113,71 @@ class FlaskAPIClient:
             raise Exception(f"API Error: {error_msg}")
         return response.json()
     
+    def _conditional_get(self, path, params=None):
+        """
+        GET that revalidates a previously seen response with If-None-Match.
+        
+        On 304 the stored copy is returned instead of re-downloading it.
+        Stored copies are keyed by the URL with its encoded query string.
+        """
+        url = f'{self._base_url}{path}'
+        key = f'{url}?{urlencode(params)}' if params else url
+        with self._validators_lock:
+            cached = self._validators.get(key)
+        
+        headers = {'If-None-Match': cached[0]} if cached else {}
+        response = self._session.get(url, params=params, headers=headers)
+        
+        if response.status_code == 304 and cached:
+            with self._validators_lock:
+                if key in self._validators:
+                    self._validators.move_to_end(key)
+            # Callers annotate the dicts they get back, so never hand out the stored copy
+            return copy.deepcopy(cached[1])
+        
+        data = self._handle_response(response)
+        etag = response.headers.get('ETag')
+        if etag:
+            with self._validators_lock:
+                self._validators[key] = (etag, copy.deepcopy(data))
+                self._validators.move_to_end(key)
+                while len(self._validators) > VALIDATOR_CACHE_SIZE:
+                    self._validators.popitem(last=False)
+        return data
+    
     # ==================== STORY METHODS ====================
     
-    def get_stories(self, status='published'):
-        """Get all stories, optionally filtered by status"""
-        response = self._session.get(
-            f'{self._base_url}/stories',
-            params={'status': status} if status else {}
-        )
+    def get_stories(self, status='published', limit=None, cursor=None, fields=None, author_id=None):
+        """
+        Get stories, optionally filtered by status (None for every status).
+        
+        Without limit/cursor returns the full list. With either one, returns
+        a single keyset page: {'stories': [...], 'next_cursor': ...}.
+        `fields` limits each story to the listed keys (plus 'id') and
+        `author_id` the full list to one author's stories.
+        """
+        params = {'status': status or ''}
+        if fields:
+            params['fields'] = ','.join(fields)
+        if author_id is not None:
+            params['author_id'] = author_id
+        if limit is not None:
+            params['limit'] = limit
+        if cursor:
+            params['cursor'] = cursor
+        response = self._session.get(f'{self._base_url}/stories', params=params)
+        return self._handle_response(response)
+    
+    def search_stories(self, query, status='published', limit=12, offset=0):
+        """Ranked full-text search over titles, descriptions and page text"""
+        params = {'q': query, 'limit': limit, 'offset': offset}
+        params['status'] = status or ''
+        response = self._session.get(f'{self._base_url}/stories/search', params=params)
         return self._handle_response(response)
     
     def get_story(self, story_id):
         """Get a single story by ID"""
-        response = self._session.get(f'{self._base_url}/stories/{story_id}')
-        return self._handle_response(response)
+        return self._conditional_get(f'/stories/{story_id}')
     
     def create_story(self, data):
         """Create a new story"""
@@ -76,6 +187,14 @@ class FlaskAPIClient:
         )
         return self._handle_response(response)
     
+    def import_story(self, data):
+        """Create a story with all its pages and choices in one transaction"""
+        response = self._session.post(
+            f'{self._base_url}/stories/import',
+            json=data
+        )
+        return self._handle_response(response)
+    
     def update_story(self, story_id, data):
         """Update an existing story"""
         response = self._session.put(
@@ -89,23 +208,53 @@ class FlaskAPIClient:
         response = self._session.delete(f'{self._base_url}/stories/{story_id}')
         return self._handle_response(response)
     
-    def get_story_tree(self, story_id):
-        """Get story structure for visualization"""
-        response = self._session.get(f'{self._base_url}/stories/{story_id}/tree')
+    def get_story_tree(self, story_id, layout=None, draft=False):
+        """
+        Get story structure for visualization (layout='layered' adds x/y coordinates).
+        
+        `draft` reads the live pages of a published story instead of its
+        snapshot, for the author editor.
+        """
+        params = {}
+        if layout:
+            params['layout'] = layout
+        if draft:
+            params['draft'] = 1
+        return self._conditional_get(f'/stories/{story_id}/tree', params or None)
+    
+    def get_story_bundle(self, story_id):
+        """Get a story with all its pages and choices in one request"""
+        return self._conditional_get(f'/stories/{story_id}/bundle')
+    
+    def validate_story(self, story_id):
+        """Run the publish checks on a story's graph"""
+        response = self._session.get(f'{self._base_url}/stories/{story_id}/validate')
         return self._handle_response(response)
     
+    def get_story_analysis(self, story_id):
+        """Get the probability of reaching each ending under random play"""
+        return self._conditional_get(f'/stories/{story_id}/analysis')
+    
     # ==================== PAGE METHODS ====================
     
-    def get_page(self, page_id):
-        """Get a page with its choices"""
-        response = self._session.get(f'{self._base_url}/pages/{page_id}')
-        return self._handle_response(response)
+    def get_page(self, page_id, draft=False):
+        """Get a page with its choices (`draft` as in get_story_tree)"""
+        return self._conditional_get(f'/pages/{page_id}', {'draft': 1} if draft else None)
     
-    def get_start_page(self, story_id):
-        """Get the starting page of a story"""
-        response = self._session.get(f'{self._base_url}/stories/{story_id}/start')
+    def get_pages(self, page_ids):
+        """Get several pages with their choices in one request"""
+        if not page_ids:
+            return []
+        response = self._session.get(
+            f'{self._base_url}/pages',
+            params={'ids': ','.join(str(page_id) for page_id in page_ids)}
+        )
         return self._handle_response(response)
     
+    def get_start_page(self, story_id, draft=False):
+        """Get the starting page of a story (`draft` as in get_story_tree)"""
+        return self._conditional_get(f'/stories/{story_id}/start', {'draft': 1} if draft else None)
+    
     def create_page(self, story_id, data):
         """Create a new page in a story"""
         response = self._session.post(
@@ -127,6 +276,21 @@ class FlaskAPIClient:
         response = self._session.delete(f'{self._base_url}/pages/{page_id}')
         return self._handle_response(response)
     
+    def resolve_choice(self, page_id, choice_id):
+        """
+        Follow a choice of a page in one request.
+        
+        Returns:
+            {'choice': {...}, 'page': next page with its choices}
+        
+        Raises:
+            LookupError: If the choice is not on the page
+        """
+        response = self._session.post(
+            f'{self._base_url}/pages/{page_id}/choices/{choice_id}/resolve'
+        )
+        return self._handle_response(response)
+    
     # ==================== CHOICE METHODS ====================
     
     def create_choice(self, page_id, data):
@@ -137,6 +301,16 @@ class FlaskAPIClient:
         )
         return self._handle_response(response)
     
+    def get_choices(self, choice_ids):
+        """Get several choices in one request"""
+        if not choice_ids:
+            return []
+        response = self._session.get(
+            f'{self._base_url}/choices',
+            params={'ids': ','.join(str(choice_id) for choice_id in choice_ids)}
+        )
+        return self._handle_response(response)
+    
     def update_choice(self, choice_id, data):
         """Update an existing choice"""
         response = self._session.put(
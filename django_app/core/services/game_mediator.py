@@ -152,18 +152,12 @@ class GameMediator:
         except PlaySession.DoesNotExist:
             return {'success': False, 'error': 'Session not found'}
         
-        # Get current page to find the choice
-        current_page = self.api_client.get_page(session_data.current_page_id)
-        
-        # Find the selected choice
-        choice = None
-        for c in current_page.get('choices', []):
-            if c['id'] == choice_id:
-                choice = c
-                break
-        
-        if not choice:
+        # Check the choice against the current page and fetch where it leads
+        try:
+            resolved = self.api_client.resolve_choice(session_data.current_page_id, choice_id)
+        except LookupError:
             return {'success': False, 'error': 'Invalid choice'}
+        choice = resolved['choice']
         
         # Handle dice roll if required
         dice_result = None
@@ -179,16 +173,17 @@ class GameMediator:
             }
             
             if not success:
+                # The player stays put, so show the current page again
                 return {
                     'success': False,
                     'dice_failed': True,
                     'dice_result': dice_result,
-                    'page': current_page,
+                    'page': self.api_client.get_page(session_data.current_page_id),
                     'message': f"You rolled {roll}, but needed {min_required}. Try again!"
                 }
         
         # Navigate to next page
-        next_page = self.api_client.get_page(choice['next_page_id'])
+        next_page = resolved['page']
         
         # Update session
         session_data.add_to_path(next_page['id'])
@@ -91,7 +91,9 @@ def story_tree_data(request, story_id):
     api = get_api_client()
     
     try:
-        tree = api.get_story_tree(story_id)
+        # Only known layouts are forwarded to the API
+        layout = 'layered' if request.GET.get('layout') == 'layered' else None
+        tree = api.get_story_tree(story_id, layout=layout)
         return JsonResponse(tree)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
@@ -16,7 +16,7 @@ def dashboard(request):
     
     api = get_api_client()
     try:
-        all_stories = api.get_stories(status=None)
+        all_stories = api.get_stories(status=None, fields=['status'])
         total_stories = len(all_stories)
         suspended_stories = len([s for s in all_stories if s['status'] == 'suspended'])
     except:
@@ -102,7 +102,10 @@ def story_list(request):
     api = get_api_client()
     status_filter = request.GET.get('status', '')
     try:
-        stories = api.get_stories(status=status_filter if status_filter else None)
+        stories = api.get_stories(
+            status=status_filter if status_filter else None,
+            fields=['title', 'status', 'author_id']
+        )
     except:
         stories = []
     return render(request, 'moderation/story_list.html', {'stories': stories, 'status_filter': status_filter})
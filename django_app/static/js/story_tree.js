@@ -1,8 +1,84 @@
 /**
  * Story Tree Visualization using D3.js
- * Renders a force-directed graph of story pages and choices
+ * Renders the story pages and choices at the layered layout computed by the
+ * API (?layout=layered), falling back to a force-directed graph
  */
 
+const MARGIN = 30;
+
+function appendNodes(parent, nodes) {
+    const node = parent.append('g')
+        .selectAll('g')
+        .data(nodes)
+        .join('g')
+        .attr('class', d => {
+            if (d.is_start) return 'node start';
+            if (d.is_ending) return 'node ending';
+            return 'node normal';
+        });
+    
+    // Add circles to nodes
+    node.append('circle')
+        .attr('r', d => d.is_start ? 12 : (d.is_ending ? 10 : 8))
+        .attr('fill', d => {
+            if (d.is_start) return '#28a745';
+            if (d.is_ending) return '#dc3545';
+            return '#007bff';
+        });
+    
+    // Add labels
+    node.append('text')
+        .text(d => d.is_start ? 'Start' : (d.is_ending ? 'End' : d.id))
+        .attr('x', 15)
+        .attr('y', 4)
+        .attr('font-size', '10px')
+        .attr('fill', '#333');
+    
+    // Add tooltips
+    node.append('title')
+        .text(d => {
+            let text = `Page ${d.id}`;
+            if (d.is_start) text += ' (Start)';
+            if (d.is_ending) text += ` - ${d.ending_label || 'Ending'}`;
+            return text;
+        });
+    
+    return node;
+}
+
+function renderLayered(svg, data, width, height) {
+    // Positions are fixed by the server; fit them to the view, then allow pan/zoom
+    const scale = Math.min(
+        1,
+        (width - 2 * MARGIN) / Math.max(data.layout.width, 1),
+        (height - 2 * MARGIN) / Math.max(data.layout.height, 1)
+    );
+    const x = MARGIN + (width - 2 * MARGIN - data.layout.width * scale) / 2;
+    const view = svg.append('g');
+    const initial = d3.zoomIdentity.translate(x, MARGIN).scale(scale);
+    const zoom = d3.zoom().on('zoom', event => view.attr('transform', event.transform));
+    svg.call(zoom).call(zoom.transform, initial);
+    
+    const byId = new Map(data.nodes.map(d => [d.id, d]));
+    view.append('g')
+        .selectAll('path')
+        .data(data.edges.filter(d => byId.has(d.source) && byId.has(d.target)))
+        .join('path')
+        .attr('class', 'link')
+        .attr('fill', 'none')
+        .attr('stroke', '#999')
+        .attr('stroke-width', 1.5)
+        .attr('marker-end', 'url(#arrowhead)')
+        .attr('d', d => {
+            const source = byId.get(d.source);
+            const target = byId.get(d.target);
+            return d3.line()([[source.x, source.y], ...d.points, [target.x, target.y]]);
+        });
+    
+    appendNodes(view, data.nodes)
+        .attr('transform', d => `translate(${d.x},${d.y})`);
+}
+
 async function renderStoryTree(storyId) {
     const container = document.getElementById('story-tree');
     if (!container) return;
@@ -13,7 +89,7 @@ async function renderStoryTree(storyId) {
     // Fetch tree data
     let data;
     try {
-        const response = await fetch(`/play/${storyId}/tree/`);
+        const response = await fetch(`/play/${storyId}/tree/?layout=layered`);
         data = await response.json();
     } catch (error) {
         container.innerHTML = '<p class="text-muted text-center p-3">Could not load story map</p>';
@@ -48,6 +124,11 @@ async function renderStoryTree(storyId) {
         .attr('d', 'M 0,-5 L 10,0 L 0,5')
         .attr('fill', '#999');
     
+    if (data.layout) {
+        renderLayered(svg, data, width, height);
+        return;
+    }
+    
     // Create force simulation
     const simulation = d3.forceSimulation(data.nodes)
         .force('link', d3.forceLink(data.edges)
@@ -68,46 +149,12 @@ async function renderStoryTree(storyId) {
         .attr('marker-end', 'url(#arrowhead)');
     
     // Create nodes
-    const node = svg.append('g')
-        .selectAll('g')
-        .data(data.nodes)
-        .join('g')
-        .attr('class', d => {
-            if (d.is_start) return 'node start';
-            if (d.is_ending) return 'node ending';
-            return 'node normal';
-        })
+    const node = appendNodes(svg, data.nodes)
         .call(d3.drag()
             .on('start', dragstarted)
             .on('drag', dragged)
             .on('end', dragended));
     
-    // Add circles to nodes
-    node.append('circle')
-        .attr('r', d => d.is_start ? 12 : (d.is_ending ? 10 : 8))
-        .attr('fill', d => {
-            if (d.is_start) return '#28a745';
-            if (d.is_ending) return '#dc3545';
-            return '#007bff';
-        });
-    
-    // Add labels
-    node.append('text')
-        .text(d => d.is_start ? 'Start' : (d.is_ending ? 'End' : d.id))
-        .attr('x', 15)
-        .attr('y', 4)
-        .attr('font-size', '10px')
-        .attr('fill', '#333');
-    
-    // Add tooltips
-    node.append('title')
-        .text(d => {
-            let text = `Page ${d.id}`;
-            if (d.is_start) text += ' (Start)';
-            if (d.is_ending) text += ` - ${d.ending_label || 'Ending'}`;
-            return text;
-        });
-    
     // Update positions on tick
     simulation.on('tick', () => {
         link
@@ -1,17 +1,35 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.db.models import Avg, Count
 from core.services import get_api_client, GameMediator
 from community.models import Rating, Comment
 
 
+STORIES_PER_PAGE = 12
+
+
 def story_list(request):
     """List all published stories"""
     api = get_api_client()
+    search = request.GET.get('search', '')
+    cursor = request.GET.get('cursor')
+    next_cursor = None
+    try:
+        page = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        page = 1
+    has_next_page = False
     
     try:
-        stories = api.get_stories(status='published')
+        if search:
+            result = api.search_stories(search, limit=STORIES_PER_PAGE,
+                                        offset=(page - 1) * STORIES_PER_PAGE)
+            stories = result['stories']
+            has_next_page = result['next_offset'] is not None
+        else:
+            result = api.get_stories(status='published', limit=STORIES_PER_PAGE, cursor=cursor)
+            stories = result['stories']
+            next_cursor = result['next_cursor']
     except Exception as e:
         messages.error(request, f"Could not load stories: {e}")
         stories = []
@@ -22,20 +40,13 @@ def story_list(request):
         story['avg_rating'] = ratings.aggregate(Avg('stars'))['stars__avg'] or 0
         story['rating_count'] = ratings.count()
     
-    # Search filter
-    search = request.GET.get('search', '')
-    if search:
-        stories = [s for s in stories if search.lower() in s['title'].lower() 
-                   or search.lower() in s.get('description', '').lower()]
-    
-    # Pagination
-    paginator = Paginator(stories, 12)
-    page = request.GET.get('page', 1)
-    stories_page = paginator.get_page(page)
-    
     return render(request, 'stories/list.html', {
-        'stories': stories_page,
-        'search': search
+        'stories': stories,
+        'search': search,
+        'cursor': cursor,
+        'next_cursor': next_cursor,
+        'page': page,
+        'has_next_page': has_next_page
     })
 
 
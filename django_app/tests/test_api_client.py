@@ -1,6 +1,17 @@
+import gzip
+import io
+import json
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from threading import Thread
 from unittest.mock import patch, MagicMock
-from django.test import TestCase
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+from django.contrib.sessions.backends.db import SessionStore
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from core.middleware.read_your_writes import ReadYourWritesMiddleware, SESSION_KEY
 from core.services import FlaskAPIClient, get_api_client
+from core.services.api_client import READ_PRIMARY_COOKIE, get_read_primary_until, set_read_primary_until
 
 class FlaskAPIClientTest(TestCase):
     def test_singleton_instance(self):
@@ -28,3 +39,213 @@ class FlaskAPIClientTest(TestCase):
         
         self.assertEqual(len(stories), 1)
         self.assertEqual(stories[0]['title'], 'Test')
+    
+    @patch('core.services.api_client.requests.Session')
+    def test_conditional_get_reuses_cached_copy(self, mock_session):
+        """Test that a 304 answer returns the previously downloaded story"""
+        FlaskAPIClient._instance = None
+        
+        first = MagicMock()
+        first.status_code = 200
+        first.headers = {'ETag': '"story-1-v1"'}
+        first.json.return_value = {'id': 1, 'title': 'Test'}
+        
+        second = MagicMock()
+        second.status_code = 304
+        second.headers = {'ETag': '"story-1-v1"'}
+        
+        mock_session_instance = MagicMock()
+        mock_session_instance.get.side_effect = [first, second]
+        mock_session.return_value = mock_session_instance
+        
+        client = get_api_client()
+        client.get_story(1)
+        story = client.get_story(1)
+        
+        self.assertEqual(story['title'], 'Test')
+        _, kwargs = mock_session_instance.get.call_args
+        self.assertEqual(kwargs['headers'], {'If-None-Match': '"story-1-v1"'})
+    
+    @patch('core.services.api_client.requests.Session')
+    def test_tree_layout_is_an_encoded_query_parameter(self, mock_session):
+        """Test that the layout cannot add parameters and is part of the cache key"""
+        FlaskAPIClient._instance = None
+        
+        response = MagicMock()
+        response.status_code = 200
+        response.headers = {'ETag': '"story-1-v1"'}
+        response.json.return_value = {'nodes': [], 'edges': []}
+        
+        mock_session_instance = MagicMock()
+        mock_session_instance.get.return_value = response
+        mock_session.return_value = mock_session_instance
+        
+        client = get_api_client()
+        client.get_story_tree(1)
+        client.get_story_tree(1, layout='layered&status=draft')
+        
+        first, second = mock_session_instance.get.call_args_list
+        self.assertTrue(first.args[0].endswith('/stories/1/tree'))
+        self.assertIsNone(first.kwargs['params'])
+        self.assertEqual(first.kwargs['headers'], {})
+        self.assertTrue(second.args[0].endswith('/stories/1/tree'))
+        self.assertEqual(second.kwargs['params'], {'layout': 'layered&status=draft'})
+        self.assertEqual(second.kwargs['headers'], {})
+        self.assertIn(f'{second.args[0]}?layout=layered%26status%3Ddraft', client._validators)
+    
+    @patch('core.services.api_client.requests.Session')
+    def test_draft_reads_ask_for_live_rows(self, mock_session):
+        """Test that the author editor's reads skip published snapshots"""
+        FlaskAPIClient._instance = None
+        
+        response = MagicMock()
+        response.status_code = 200
+        response.headers = {}
+        response.json.return_value = {'id': 1}
+        
+        mock_session_instance = MagicMock()
+        mock_session_instance.get.return_value = response
+        mock_session.return_value = mock_session_instance
+        
+        client = get_api_client()
+        client.get_page(1, draft=True)
+        client.get_start_page(1, draft=True)
+        client.get_story_tree(1, layout='layered', draft=True)
+        client.get_page(1)
+        
+        self.assertEqual(
+            [(call.args[0].removeprefix(client._base_url), call.kwargs['params'])
+             for call in mock_session_instance.get.call_args_list],
+            [('/pages/1', {'draft': 1}), ('/stories/1/start', {'draft': 1}),
+             ('/stories/1/tree', {'layout': 'layered', 'draft': 1}), ('/pages/1', None)]
+        )
+    
+    @patch('gameplay.views.get_api_client')
+    def test_tree_view_only_forwards_known_layouts(self, mock_get_api_client):
+        """Test that the tree view drops layouts the API does not offer"""
+        from gameplay.views import story_tree_data
+        api = mock_get_api_client.return_value
+        api.get_story_tree.return_value = {'nodes': [], 'edges': []}
+        factory = RequestFactory()
+        
+        story_tree_data(factory.get('/tree', {'layout': 'layered&status=draft'}), 1)
+        story_tree_data(factory.get('/tree', {'layout': 'layered'}), 1)
+        
+        self.assertEqual(
+            [call.kwargs['layout'] for call in api.get_story_tree.call_args_list],
+            [None, 'layered']
+        )
+    
+    @patch('core.services.api_client.requests.Session')
+    def test_resolve_choice(self, mock_session):
+        """Test that a choice is resolved with one POST"""
+        FlaskAPIClient._instance = None
+        
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {'choice': {'id': 5}, 'page': {'id': 2, 'choices': []}}
+        mock_session_instance = MagicMock()
+        mock_session_instance.post.return_value = mock_response
+        mock_session.return_value = mock_session_instance
+        
+        resolved = get_api_client().resolve_choice(1, 5)
+        
+        self.assertEqual(resolved['page']['id'], 2)
+        args, _ = mock_session_instance.post.call_args
+        self.assertTrue(args[0].endswith('/pages/1/choices/5/resolve'))
+        FlaskAPIClient._instance = None
+    
+    def test_gzip_responses_are_advertised_and_decoded(self):
+        """Test that the client asks for gzip and reads compressed bodies"""
+        FlaskAPIClient._instance = None
+        body = gzip.compress(json.dumps([{'id': 1, 'title': 'Test'}]).encode())
+        sent = {}
+        
+        class GzipAdapter(HTTPAdapter):
+            def send(self, request, **kwargs):
+                sent.update(request.headers)
+                raw = HTTPResponse(
+                    body=io.BytesIO(body), status=200, preload_content=False,
+                    headers={'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}
+                )
+                return self.build_response(request, raw)
+        
+        client = get_api_client()
+        client._session.mount('http://', GzipAdapter())
+        client._session.mount('https://', GzipAdapter())
+        stories = client.get_stories()
+        
+        self.assertIn('gzip', sent['Accept-Encoding'])
+        self.assertEqual(stories, [{'id': 1, 'title': 'Test'}])
+        FlaskAPIClient._instance = None
+    
+    def test_read_your_writes_cookie_is_per_user(self):
+        """Test that one user's write does not pin other users' reads to the primary"""
+        FlaskAPIClient._instance = None
+        sent = []
+        
+        class Handler(BaseHTTPRequestHandler):
+            def respond(self, set_cookie=False):
+                sent.append(self.headers.get('Cookie'))
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                if set_cookie:
+                    self.send_header('Set-Cookie', f'{READ_PRIMARY_COOKIE}=1234.500; Path=/; HttpOnly')
+                self.send_header('Content-Length', '9')
+                self.end_headers()
+                self.wfile.write(b'{"id": 1}')
+            
+            def do_GET(self):
+                self.respond()
+            
+            def do_POST(self):
+                self.respond(set_cookie=True)
+            
+            def log_message(self, *args):
+                pass
+        
+        server = HTTPServer(('127.0.0.1', 0), Handler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            client = get_api_client()
+            client._base_url = f'http://127.0.0.1:{server.server_port}'
+            
+            set_read_primary_until(None)
+            client.create_story({'title': 'Mine'})
+            writer = get_read_primary_until()
+            self.assertEqual(writer, '1234.500')
+            self.assertEqual(len(client._session.cookies), 0)
+            
+            set_read_primary_until(None)
+            client.get_stories()
+            set_read_primary_until(writer)
+            client.get_stories()
+        finally:
+            server.shutdown()
+            server.server_close()
+            set_read_primary_until(None)
+            FlaskAPIClient._instance = None
+        
+        self.assertEqual(sent, [None, None, f'{READ_PRIMARY_COOKIE}=1234.500'])
+    
+    def test_read_your_writes_middleware_keeps_deadline_in_session(self):
+        """Test that the middleware stores a user's deadline and clears it after the request"""
+        def view(request):
+            self.assertIsNone(get_read_primary_until())
+            set_read_primary_until('1234.500')
+            return HttpResponse()
+        
+        request = RequestFactory().post('/author/story/new/')
+        request.session = SessionStore()
+        ReadYourWritesMiddleware(view)(request)
+        
+        self.assertEqual(request.session[SESSION_KEY], '1234.500')
+        self.assertIsNone(get_read_primary_until())
+        
+        seen = []
+        request = RequestFactory().get('/stories/')
+        request.session = SessionStore()
+        request.session[SESSION_KEY] = '1234.500'
+        ReadYourWritesMiddleware(lambda r: seen.append(get_read_primary_until()) or HttpResponse())(request)
+        self.assertEqual(seen, ['1234.500'])
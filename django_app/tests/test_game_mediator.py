@@ -0,0 +1,34 @@
+from unittest.mock import MagicMock
+from django.test import TestCase
+from core.services.game_mediator import GameMediator
+from core.services.game_memento import GameSession
+
+
+class GameMediatorTest(TestCase):
+    def setUp(self):
+        self.mediator = GameMediator()
+        self.mediator.api_client = MagicMock()
+        self.mediator.caretaker.save_session('key', GameSession(1, 10))
+    
+    def test_make_choice_resolves_in_one_call(self):
+        """Test that a choice moves the player with a single resolve request"""
+        self.mediator.api_client.resolve_choice.return_value = {
+            'choice': {'id': 3, 'next_page_id': 11, 'dice_required': False, 'min_roll': 1},
+            'page': {'id': 11, 'is_ending': False, 'choices': []}
+        }
+        
+        result = self.mediator.make_choice('key', 3)
+        
+        self.assertTrue(result['success'])
+        self.assertEqual(result['page']['id'], 11)
+        self.assertEqual(result['path'], [10, 11])
+        self.mediator.api_client.resolve_choice.assert_called_once_with(10, 3)
+        self.mediator.api_client.get_page.assert_not_called()
+    
+    def test_make_choice_rejects_foreign_choice(self):
+        """Test that a choice of another page is reported as invalid"""
+        self.mediator.api_client.resolve_choice.side_effect = LookupError('Resource not found')
+        
+        result = self.mediator.make_choice('key', 99)
+        
+        self.assertEqual(result, {'success': False, 'error': 'Invalid choice'})
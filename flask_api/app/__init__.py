@@ -2,20 +2,38 @@ from flask import Flask
 from flask_cors import CORS
 from .extensions import db, migrate
 from .config import Config
+from .middleware.response_cache import ResponseCache
+from .middleware.compression import init_compression
+from .middleware.metrics import init_metrics
+from .middleware.slow_query_log import init_slow_query_log
+from .sqlite_tuning import init_sqlite_tuning
+from .replicas import init_read_replicas
+from .story_store import init_story_store
+from .schemas.encoding import FastJSONProvider
 
 def create_app(config_class=Config):
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     app.config.from_object(config_class)
     
     # Initialize extensions
     db.init_app(app)
+    init_sqlite_tuning(app)
     migrate.init_app(app, db)
     CORS(app)
+    app.extensions['response_cache'] = ResponseCache(app.config['RESPONSE_CACHE_SIZE'])
+    init_compression(app)
+    # Replica engines first, so metrics and the slow-query log hook them too
+    init_read_replicas(app)
+    init_metrics(app)
+    init_slow_query_log(app)
+    init_story_store(app)
     
     # Register blueprints
-    from .routes import stories_bp, pages_bp, choices_bp
+    from .routes import stories_bp, pages_bp, choices_bp, system_bp
     app.register_blueprint(stories_bp)
     app.register_blueprint(pages_bp)
     app.register_blueprint(choices_bp)
+    app.register_blueprint(system_bp)
     
     return app
@@ -0,0 +1,74 @@
+"""
+Async read API - the hot read endpoints on SQLAlchemy's async engine
+(aiosqlite), served by Quart under ASGI.
+
+Models, read statements (app.services.read_queries), serializers, ETags
+and the response cache are shared with the sync Flask app. create_asgi_app
+serves both: matching GET/HEAD reads go to the async app, everything else
+(writes, search, export, analysis...) to the Flask app through asgiref.
+Response compression stays in the Flask app; put the ASGI server behind a
+compressing proxy if async reads should be compressed too.
+
+Usage:
+    uvicorn asgi:app --workers 2
+"""
+from asgiref.wsgi import WsgiToAsgi
+from quart import Quart
+from werkzeug.exceptions import HTTPException
+from app import create_app
+from app.config import Config
+from app.middleware.response_cache import ResponseCache
+from app.schemas.encoding import FastJSONProvider
+from .database import init_async_db, async_database_url
+from .routes import async_reads_bp
+
+ASYNC_METHODS = ('GET', 'HEAD')
+
+
+def create_async_app(config_class=Config, response_cache=None):
+    """Quart app serving the read endpoints"""
+    app = Quart(__name__, static_folder=None)
+    app.config.from_object(config_class)
+    app.json = FastJSONProvider(app)
+
+    init_async_db(app)
+    if response_cache is None:
+        response_cache = ResponseCache(app.config['RESPONSE_CACHE_SIZE'])
+    app.extensions['response_cache'] = response_cache
+
+    app.register_blueprint(async_reads_bp)
+    return app
+
+
+class ReadDispatcher:
+    """ASGI app sending async-served reads to one app and the rest to another"""
+
+    def __init__(self, async_app, sync_app):
+        self.async_app = async_app
+        self.sync_app = WsgiToAsgi(sync_app)
+        self.urls = async_app.url_map.bind('localhost')
+
+    def is_async_read(self, scope):
+        if scope['method'] not in ASYNC_METHODS:
+            return False
+        try:
+            self.urls.match(scope['path'], method=scope['method'])
+        except HTTPException:
+            return False
+        return True
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan' or (scope['type'] == 'http' and self.is_async_read(scope)):
+            await self.async_app(scope, receive, send)
+        else:
+            await self.sync_app(scope, receive, send)
+
+
+def create_asgi_app(config_class=Config):
+    """ASGI entry point: async reads plus the full sync API, sharing one response cache"""
+    sync_app = create_app(config_class)
+    async_app = create_async_app(config_class, sync_app.extensions['response_cache'])
+    return ReadDispatcher(async_app, sync_app)
+
+
+__all__ = ['create_async_app', 'create_asgi_app', 'ReadDispatcher', 'async_database_url', 'init_async_db']
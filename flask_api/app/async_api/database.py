@@ -0,0 +1,47 @@
+"""
+Async database access - an AsyncEngine on the same database as the sync app.
+
+sqlite:/// URLs are switched to the aiosqlite driver, relative SQLite paths
+resolve against the instance folder as in the sync app, and SQLITE_PRAGMAS
+are applied to every new connection exactly as in the sync app.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.sqlite_tuning import apply_pragmas, resolve_sqlite_url
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+
+def async_database_url(url):
+    """The async-driver equivalent of a sync database URL"""
+    url = make_url(url)
+    if url.drivername in ASYNC_DRIVERS:
+        url = url.set(drivername=ASYNC_DRIVERS[url.drivername])
+    return url
+
+
+def init_async_db(app):
+    """Create the engine and session factory in app.extensions['async_db']"""
+    url = async_database_url(resolve_sqlite_url(app.config['SQLALCHEMY_DATABASE_URI'], app.instance_path))
+    options = {}
+    if url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:'):
+        # aiosqlite defaults to NullPool: keep connections (and their PRAGMAs) open
+        options = {'poolclass': AsyncAdaptedQueuePool, 'pool_size': app.config['ASYNC_DB_POOL_SIZE']}
+    engine = create_async_engine(url, **options)
+
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    if pragmas and url.get_backend_name() == 'sqlite':
+        @event.listens_for(engine.sync_engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            apply_pragmas(dbapi_connection, pragmas)
+
+    app.extensions['async_db'] = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    @app.after_serving
+    async def dispose_engine():
+        await engine.dispose()
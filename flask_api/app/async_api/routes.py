@@ -0,0 +1,258 @@
+"""
+Async read routes - same URLs, query strings, payloads and validators as
+the sync stories/pages blueprints, built from the shared read_queries
+statements and serializers. Published snapshots are served the same way.
+"""
+from quart import Blueprint, current_app, jsonify, request
+from app.middleware.api_key_auth import api_key_problem
+from app.middleware.conditional_get import story_etag, set_validators
+from app.routes.params import parse_fields, parse_include, parse_flag
+from app.schemas.encoding import dumps, loads
+from app.services.snapshot_service import SnapshotService
+from app.services.tree_layout import LAYOUT_LAYERED, layered_layout
+from app.schemas.serializers import (
+    STORY_FIELDS, PAGE_FIELDS, serialize_story, serialize_pages, serialize_tree
+)
+from app.services import read_queries
+from app.services.story_service import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, encode_cursor, decode_cursor
+
+async_reads_bp = Blueprint('async_reads', __name__)
+
+
+def _session():
+    return current_app.extensions['async_db']()
+
+
+def _not_modified(etag, last_modified=None):
+    """304 response when If-None-Match matches, else None"""
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    return set_validators(current_app.response_class(status=304), etag, last_modified)
+
+
+def _draft_requested():
+    """
+    Whether ?draft=1 asks for the live rows instead of the published
+    snapshot, and the 401 response when the API key it needs is wrong.
+    """
+    if not parse_flag(request.args.get('draft')):
+        return False, None
+    problem = api_key_problem(request.headers.get('X-API-KEY'), current_app.config['API_KEY'])
+    if problem:
+        error, code = problem
+        return True, (jsonify({'error': error, 'code': code}), 401)
+    return True, None
+
+
+def _snapshot_response(etag, last_modified, body):
+    """Pre-encoded snapshot body, or 304 (see conditional_get.snapshot_response)"""
+    cached = _not_modified(etag, last_modified)
+    if cached:
+        return cached
+    response = current_app.response_class(body, mimetype='application/json')
+    response.headers['X-Snapshot'] = 'HIT'
+    return set_validators(response, etag, last_modified)
+
+
+async def _cached_json(key, story_id, build):
+    """Serve from the response cache, awaiting build() on a miss (see cached_json_response)"""
+    cache = current_app.extensions['response_cache']
+    body = cache.get(key)
+    status = 'HIT'
+    if body is None:
+        data = await build()
+        if data is None:
+            return None
+        body = dumps(data)
+        cache.set(key, body, story_id)
+        status = 'MISS'
+
+    response = current_app.response_class(body, mimetype='application/json')
+    response.headers['X-Cache'] = status
+    return response
+
+
+async def _page_data(session, page_id, fields=None, include_choices=True):
+    page = (await session.execute(read_queries.page(page_id, fields))).first()
+    if not page:
+        return None
+    choices = None
+    if include_choices:
+        choices = (await session.execute(read_queries.page_choices(page_id))).all()
+    return serialize_pages([page], choices, fields)[0]
+
+
+@async_reads_bp.route('/stories', methods=['GET'])
+async def get_stories():
+    """Get all stories, or one keyset page with limit/cursor (see stories.get_stories)"""
+    status = request.args.get('status', 'published')
+    author_id = request.args.get('author_id', type=int)
+    try:
+        fields = parse_fields(request.args.get('fields'), STORY_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    async with _session() as session:
+        if 'limit' in request.args or 'cursor' in request.args:
+            limit = max(1, min(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+            cursor = request.args.get('cursor')
+            try:
+                after = decode_cursor(cursor) if cursor else None
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            query = read_queries.story_keyset_page(status, limit, after, fields, author_id)
+            stories = (await session.execute(query)).all()
+            next_cursor = None
+            if len(stories) > limit:
+                stories = stories[:limit]
+                next_cursor = encode_cursor(stories[-1])
+            return jsonify({
+                'stories': [serialize_story(s, fields) for s in stories],
+                'next_cursor': next_cursor
+            })
+
+        query = read_queries.story_list(status, fields, author_id)
+        stories = (await session.execute(query)).all()
+    return jsonify([serialize_story(s, fields) for s in stories])
+
+
+@async_reads_bp.route('/stories/<int:story_id>', methods=['GET'])
+async def get_story(story_id):
+    """Get a single story by ID, optionally only some fields"""
+    try:
+        fields = parse_fields(request.args.get('fields'), STORY_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    async with _session() as session:
+        story = (await session.execute(read_queries.story_version(story_id))).first()
+        if not story:
+            return jsonify({'error': 'Story not found'}), 404
+
+        etag = story_etag('story', story_id, story.version, fields)
+        cached = _not_modified(etag, story.updated_at)
+        if cached:
+            return cached
+
+        async def build():
+            row = (await session.execute(read_queries.story(story_id, fields))).first()
+            return serialize_story(row, fields) if row else None
+
+        response = await _cached_json(('story', story_id, story.version, fields), story_id, build)
+    return set_validators(response, etag, story.updated_at)
+
+
+@async_reads_bp.route('/stories/<int:story_id>/start', methods=['GET'])
+async def get_start_page(story_id):
+    """Get the starting page of a story (?draft=1 as in stories.get_start_page)"""
+    draft, denied = _draft_requested()
+    if denied:
+        return denied
+
+    async with _session() as session:
+        story = (await session.execute(read_queries.snapshot_start(story_id))).first()
+        if not story:
+            return jsonify({'error': 'Story not found'}), 404
+        if story.snapshot_version is not None and not draft:
+            if story.body is None:
+                return jsonify({'error': 'Story has no pages'}), 404
+            return _snapshot_response(story_etag('start', story_id, story.snapshot_version),
+                                      story.published_at, story.body)
+
+        etag = story_etag('start', story_id, story.version)
+        cached = _not_modified(etag, story.updated_at)
+        if cached:
+            return cached
+
+        async def build():
+            start_page_id = story.start_page_id
+            if not start_page_id:
+                # Return first page if no start page set
+                start_page_id = (await session.execute(read_queries.first_page_id(story_id))).scalar()
+            return await _page_data(session, start_page_id) if start_page_id else None
+
+        response = await _cached_json(('start', story_id, story.version), story_id, build)
+    if response is None:
+        return jsonify({'error': 'Story has no pages'}), 404
+    return set_validators(response, etag, story.updated_at)
+
+
+@async_reads_bp.route('/stories/<int:story_id>/tree', methods=['GET'])
+async def get_story_tree(story_id):
+    """Get story structure for visualization (?layout=layered and ?draft=1 as in stories.get_story_tree)"""
+    layout = request.args.get('layout')
+    if layout not in (None, LAYOUT_LAYERED):
+        return jsonify({'error': f'Unknown layout: {layout}'}), 400
+    draft, denied = _draft_requested()
+    if denied:
+        return denied
+
+    async with _session() as session:
+        story = (await session.execute(read_queries.snapshot_tree(story_id))).first()
+        if not story:
+            return jsonify({'error': 'Story not found'}), 404
+        published = story.snapshot_version is not None and not draft
+        if published and not layout:
+            return _snapshot_response(story_etag('tree', story_id, story.snapshot_version),
+                                      story.published_at, story.body)
+
+        if published:
+            version, last_modified = story.snapshot_version, story.published_at
+        else:
+            version, last_modified = story.version, story.updated_at
+        etag = story_etag('tree-layered' if layout else 'tree', story_id, version)
+        cached = _not_modified(etag, last_modified)
+        if cached:
+            return cached
+
+        async def build():
+            if published:
+                return loads(story.body)
+            nodes = (await session.execute(read_queries.tree_nodes(story_id))).all()
+            edges = (await session.execute(read_queries.tree_edges(story_id))).all()
+            return serialize_tree(story.start_page_id, nodes, edges)
+
+        async def build_layered():
+            return layered_layout(await build())
+
+        if layout:
+            response = await _cached_json(('tree', story_id, version, LAYOUT_LAYERED), story_id, build_layered)
+        else:
+            response = await _cached_json(('tree', story_id, version), story_id, build)
+    return set_validators(response, etag, last_modified)
+
+
+@async_reads_bp.route('/pages/<int:page_id>', methods=['GET'])
+async def get_page(page_id):
+    """Get a page with its choices (?fields=...&include=choices and ?draft=1 as in pages.get_page)"""
+    try:
+        fields = parse_fields(request.args.get('fields'), PAGE_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    include_choices = fields is None or 'choices' in parse_include(request.args.get('include'))
+    include = ('choices',) if fields is not None and include_choices else ()
+    draft, denied = _draft_requested()
+    if denied:
+        return denied
+
+    async with _session() as session:
+        version = (await session.execute(read_queries.page_version(page_id))).first()
+        if not version and not draft:
+            version = (await session.execute(read_queries.snapshot_page(page_id))).first()
+        if not version:
+            return jsonify({'error': 'Page not found'}), 404
+        if version.snapshot_version is not None and not draft:
+            return _snapshot_response(story_etag('page', page_id, version.snapshot_version, fields, include),
+                                      version.published_at,
+                                      SnapshotService.page_body(version.body, fields, include_choices))
+
+        etag = story_etag('page', page_id, version.version, fields, include)
+        cached = _not_modified(etag, version.updated_at)
+        if cached:
+            return cached
+
+        response = await _cached_json(
+            ('page', page_id, version.version, fields, include_choices), version.story_id,
+            lambda: _page_data(session, page_id, fields, include_choices)
+        )
+    return set_validators(response, etag, version.updated_at)
@@ -10,3 +10,61 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///nahb_stories.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     API_KEY = os.getenv('API_KEY', 'dev-api-key')
+    # Max encoded responses kept in the in-process read cache (0 disables it)
+    RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 1024))
+    # Compress JSON responses of at least this many bytes (0 disables compression)
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 5))
+    COMPRESS_MIMETYPES = ('application/json',)
+    # Per-endpoint latency/status/SQL metrics served at GET /metrics
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    # JSON-lines log of statements slower than the threshold (empty path disables it)
+    SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', '')
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', 100))
+    SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv('SLOW_QUERY_LOG_MAX_BYTES', 10 * 1024 * 1024))
+    SLOW_QUERY_LOG_BACKUPS = int(os.getenv('SLOW_QUERY_LOG_BACKUPS', 5))
+    # Read replicas for GETs of the story/page/choice blueprints (comma-separated URLs)
+    SQLALCHEMY_REPLICA_URIS = [uri for uri in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if uri]
+    REPLICA_BLUEPRINTS = ('stories', 'pages', 'choices')
+    # Seconds a client's reads stay on the primary after its own write
+    READ_YOUR_WRITES_SECONDS = int(os.getenv('READ_YOUR_WRITES_SECONDS', 5))
+    # Directory of the mmap'd published story store (empty disables it; see app/story_store.py)
+    STORY_STORE_DIR = os.getenv('STORY_STORE_DIR', '')
+    # Connections kept open by the async read API (app/async_api)
+    ASYNC_DB_POOL_SIZE = int(os.getenv('ASYNC_DB_POOL_SIZE', 20))
+    # PRAGMAs run on every new SQLite connection (see app/sqlite_tuning.py)
+    SQLITE_PRAGMAS = {}
+
+
+class ProductionConfig(Config):
+    """
+    SQLite tuned for concurrent readers alongside a writer.
+    
+    WAL lets readers proceed while a write commits; synchronous=NORMAL is
+    durable across application crashes in WAL mode and only syncs at
+    checkpoints; readers that hit a lock wait busy_timeout ms instead of
+    failing immediately.
+    """
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,  # KiB, i.e. ~64 MB per connection
+        'mmap_size': 268435456,  # 256 MB
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY'
+    }
+    # One pooled connection per worker thread (gunicorn --threads); the
+    # overflow covers long-lived streaming responses such as /stories/export
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 8)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 8)),
+        'pool_timeout': 10,
+        'connect_args': {'check_same_thread': False}
+    }
+
+
+config_by_name = {
+    'development': Config,
+    'production': ProductionConfig
+}
@@ -2,5 +2,28 @@
 Middleware module - Request processing middleware.
 """
 from .api_key_auth import require_api_key
+from .conditional_get import story_etag, set_validators, not_modified
+from .compression import init_compression, choose_encoding, compress
+from .metrics import RequestMetrics, get_metrics, init_metrics
+from .slow_query_log import init_slow_query_log
+from .response_cache import (
+    ResponseCache, get_response_cache, invalidate_story_cache, cached_json_response
+)
 
-__all__ = ['require_api_key']
+__all__ = [
+    'require_api_key',
+    'story_etag',
+    'set_validators',
+    'not_modified',
+    'init_compression',
+    'choose_encoding',
+    'compress',
+    'RequestMetrics',
+    'get_metrics',
+    'init_metrics',
+    'init_slow_query_log',
+    'ResponseCache',
+    'get_response_cache',
+    'invalidate_story_cache',
+    'cached_json_response'
+]
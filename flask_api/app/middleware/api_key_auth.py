@@ -1,19 +1,29 @@
-
-
 from functools import wraps
 from flask import request, jsonify, current_app
 
+def api_key_problem(api_key, expected):
+    """(error, code) for an X-API-KEY header value, or None when it matches"""
+    if not api_key:
+        return 'API key required', 'MISSING_API_KEY'
+    if api_key != expected:
+        return 'Invalid API key', 'INVALID_API_KEY'
+    return None
+
+def check_api_key():
+    """401 response unless the request carries the configured API key, else None"""
+    problem = api_key_problem(request.headers.get('X-API-KEY'), current_app.config['API_KEY'])
+    if problem:
+        error, code = problem
+        return jsonify({'error': error, 'code': code}), 401
+    return None
+
 def require_api_key(f):
     """Decorator to require API key for write operations"""
     @wraps(f)
     def decorated(*args, **kwargs):
-        api_key = request.headers.get('X-API-KEY')
-        
-        if not api_key:
-            return jsonify({'error': 'API key required', 'code': 'MISSING_API_KEY'}), 401
-        
-        if api_key != current_app.config['API_KEY']:
-            return jsonify({'error': 'Invalid API key', 'code': 'INVALID_API_KEY'}), 401
+        denied = check_api_key()
+        if denied:
+            return denied
         
         return f(*args, **kwargs)
     return decorated
@@ -0,0 +1,84 @@
+"""
+Response compression - gzip (or brotli, when installed) for JSON responses
+above a size threshold, negotiated through Accept-Encoding.
+
+Compressed responses get a weak ETag: the bytes differ from the identity
+encoding, but the content is the same, so If-None-Match still matches.
+Responses served from the response cache reuse the compressed body stored
+with their entry, so only a miss pays for compression.
+"""
+import gzip
+from flask import request
+from app.middleware.response_cache import get_response_cache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encoding, available=ENCODINGS):
+    """
+    Pick the response encoding from an Accept-Encoding header.
+
+    Returns:
+        The first of `available` the client accepts (q > 0), or None
+    """
+    for encoding in available:
+        if accept_encoding[encoding] > 0:
+            return encoding
+    return None
+
+
+def compress(body, encoding, level=6, brotli_quality=5):
+    """Compress a response body with 'gzip' or 'br'"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def init_compression(app):
+    """
+    Register the after_request hook that compresses responses.
+
+    Config:
+        COMPRESS_MIN_SIZE: Smallest body (bytes) worth compressing; 0 disables
+        COMPRESS_LEVEL: gzip level (1-9)
+        COMPRESS_BROTLI_QUALITY: brotli quality (0-11)
+        COMPRESS_MIMETYPES: Mimetypes eligible for compression
+    """
+    min_size = app.config['COMPRESS_MIN_SIZE']
+    if not min_size:
+        return
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or response.direct_passthrough or response.is_streamed
+                or response.mimetype not in app.config['COMPRESS_MIMETYPES']
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        cache_key = getattr(response, 'cache_key', None)
+        body = None if cache_key is None else get_response_cache().get_encoded(cache_key, encoding)
+        if body is None:
+            body = response.get_data()
+            if len(body) < min_size:
+                return response
+            body = compress(body, encoding, app.config['COMPRESS_LEVEL'], app.config['COMPRESS_BROTLI_QUALITY'])
+            if cache_key is not None:
+                get_response_cache().set_encoded(cache_key, encoding, body)
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,66 @@
+"""
+Conditional GET helpers - ETag / Last-Modified validators built from
+Story.version (or a published snapshot's version) so unchanged content can
+be answered with 304.
+"""
+from flask import request, current_app
+
+
+def story_etag(kind, object_id, version, fields=None, include=()):
+    """
+    Build the ETag for a resource that belongs to a story at a given version.
+    
+    A sparse fieldset (as normalized by parse_fields) and include list are
+    part of the representation, so each combination gets its own ETag.
+    """
+    etag = f'{kind}-{object_id}-v{version}'
+    if fields is not None:
+        etag += '-f.' + '.'.join(fields)
+    if include:
+        etag += '-i.' + '.'.join(sorted(include))
+    return etag
+
+
+def set_validators(response, etag, last_modified=None):
+    """Attach ETag and Last-Modified headers to a response"""
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def not_modified(etag, last_modified=None):
+    """
+    Return a 304 response if the request's If-None-Match matches the ETag.
+    
+    Matching is weak, as If-None-Match requires, so validators of a
+    compressed copy (weak ETags) match too.
+    
+    Returns:
+        Empty 304 response, or None when the client copy is stale
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    response = current_app.response_class(status=304)
+    return set_validators(response, etag, last_modified)
+
+
+def snapshot_response(etag, last_modified, body, source='HIT'):
+    """
+    Respond with a pre-encoded published snapshot body, or 304 when the
+    client copy is current.
+    
+    A memoryview body (from the story store) is passed through uncopied as
+    the single chunk of the response iterable.
+    """
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+    if isinstance(body, memoryview):
+        response = current_app.response_class([body], mimetype='application/json')
+        response.content_length = len(body)
+    else:
+        response = current_app.response_class(body, mimetype='application/json')
+    response.headers['X-Snapshot'] = source
+    return set_validators(response, etag, last_modified)
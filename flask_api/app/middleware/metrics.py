@@ -0,0 +1,150 @@
+"""
+Request metrics - latency histogram, status codes and SQL statement count
+and time per blueprint/endpoint, rendered in the Prometheus text format.
+
+SQL numbers come from engine events and are attributed to the request that
+issued them. They are recorded at teardown, so streamed responses such as
+/stories/export include the statements run while streaming. Counters are
+per process; with several gunicorn workers each one reports its own.
+"""
+import time
+from threading import Lock
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from app.replicas import app_engines
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(**labels):
+    escaped = (
+        f'{name}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in labels.items()
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+class RequestMetrics:
+    """
+    Thread-safe per-endpoint counters.
+
+    Usage:
+        metrics = RequestMetrics()
+        metrics.observe('stories', 'stories.get_story', 200, 0.012, 2, 0.001)
+        text = metrics.render()
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = Lock()
+        self._endpoints = {}
+        self._statuses = {}
+
+    def observe(self, blueprint, endpoint, status, seconds, sql_count, sql_seconds):
+        """Record one finished request"""
+        key = (blueprint or '', endpoint or '')
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = {
+                    'buckets': [0] * len(self.buckets), 'count': 0, 'sum': 0.0,
+                    'sql_count': 0, 'sql_seconds': 0.0
+                }
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    stats['buckets'][i] += 1
+            stats['count'] += 1
+            stats['sum'] += seconds
+            stats['sql_count'] += sql_count
+            stats['sql_seconds'] += sql_seconds
+            status_key = key + (str(status),)
+            self._statuses[status_key] = self._statuses.get(status_key, 0) + 1
+
+    def render(self):
+        """Prometheus text exposition of every metric"""
+        with self._lock:
+            endpoints = {key: dict(stats, buckets=list(stats['buckets']))
+                         for key, stats in self._endpoints.items()}
+            statuses = dict(self._statuses)
+
+        lines = [
+            '# HELP http_requests_total Requests by blueprint, endpoint and status code.',
+            '# TYPE http_requests_total counter'
+        ]
+        for (blueprint, endpoint, status), count in sorted(statuses.items()):
+            lines.append(f'http_requests_total{_labels(blueprint=blueprint, endpoint=endpoint, status=status)} {count}')
+
+        lines += [
+            '# HELP http_request_duration_seconds Request latency by blueprint and endpoint.',
+            '# TYPE http_request_duration_seconds histogram'
+        ]
+        for (blueprint, endpoint), stats in sorted(endpoints.items()):
+            for bound, count in zip(self.buckets, stats['buckets']):
+                labels = _labels(blueprint=blueprint, endpoint=endpoint, le=f'{bound:g}')
+                lines.append(f'http_request_duration_seconds_bucket{labels} {count}')
+            labels = _labels(blueprint=blueprint, endpoint=endpoint, le='+Inf')
+            lines.append(f'http_request_duration_seconds_bucket{labels} {stats["count"]}')
+            labels = _labels(blueprint=blueprint, endpoint=endpoint)
+            lines.append(f'http_request_duration_seconds_sum{labels} {stats["sum"]:.6f}')
+            lines.append(f'http_request_duration_seconds_count{labels} {stats["count"]}')
+
+        lines += [
+            '# HELP db_statements_total SQL statements issued by blueprint and endpoint.',
+            '# TYPE db_statements_total counter'
+        ]
+        for (blueprint, endpoint), stats in sorted(endpoints.items()):
+            lines.append(f'db_statements_total{_labels(blueprint=blueprint, endpoint=endpoint)} {stats["sql_count"]}')
+
+        lines += [
+            '# HELP db_statement_seconds_total Time spent executing SQL by blueprint and endpoint.',
+            '# TYPE db_statement_seconds_total counter'
+        ]
+        for (blueprint, endpoint), stats in sorted(endpoints.items()):
+            labels = _labels(blueprint=blueprint, endpoint=endpoint)
+            lines.append(f'db_statement_seconds_total{labels} {stats["sql_seconds"]:.6f}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def get_metrics():
+    """The current app's RequestMetrics, or None when metrics are disabled"""
+    return current_app.extensions.get('metrics')
+
+
+def init_metrics(app):
+    """Register request hooks and engine events that feed app.extensions['metrics']"""
+    if not app.config['METRICS_ENABLED']:
+        return
+    metrics = app.extensions['metrics'] = RequestMetrics()
+
+    @app.before_request
+    def start_request_metrics():
+        g._metrics = {'start': time.perf_counter(), 'sql_count': 0, 'sql_seconds': 0.0, 'status': 500}
+
+    @app.after_request
+    def record_status(response):
+        if '_metrics' in g:
+            g._metrics['status'] = response.status_code
+        return response
+
+    @app.teardown_request
+    def record_request_metrics(exc):
+        stats = g.pop('_metrics', None)
+        if stats is None:
+            return
+        metrics.observe(
+            request.blueprint, request.endpoint or '(unmatched)', stats['status'],
+            time.perf_counter() - stats['start'], stats['sql_count'], stats['sql_seconds']
+        )
+
+    def start_statement(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and '_metrics' in g:
+            g._metrics['sql_count'] += 1
+            g._metrics['sql_seconds'] += time.perf_counter() - context._metrics_start
+
+    for engine in app_engines(app):
+        event.listen(engine, 'before_cursor_execute', start_statement)
+        event.listen(engine, 'after_cursor_execute', record_statement)
@@ -0,0 +1,150 @@
+"""
+Response cache - in-process LRU of encoded JSON bodies for story reads.
+
+Keys include the story version, so a stale entry can never be served after
+an edit; write routes still invalidate a story's entries to free memory.
+Compressed variants of a body are kept with its entry, one per
+Content-Encoding, so cache hits are not compressed again.
+"""
+from collections import OrderedDict
+from threading import Lock
+from flask import current_app
+from app.schemas.encoding import dumps
+
+
+class ResponseCache:
+    """
+    Bounded, thread-safe LRU mapping cache keys to encoded JSON bytes.
+    
+    Usage:
+        cache = ResponseCache(max_entries=1024)
+        cache.set(('page', 5, 3), b'{...}', story_id=1)
+        body = cache.get(('page', 5, 3))
+        cache.set_encoded(('page', 5, 3), 'gzip', gzipped)
+        gzipped = cache.get_encoded(('page', 5, 3), 'gzip')
+    """
+    
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._keys_by_story = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key):
+        """Return the cached body for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def get_encoded(self, key, encoding):
+        """Return the body for key compressed with encoding, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[2].get(encoding) if entry is not None else None
+    
+    def set(self, key, body, story_id):
+        """Store a body, evicting the least recently used entries over the limit"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (body, story_id, {})
+            self._entries.move_to_end(key)
+            self._keys_by_story.setdefault(story_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                old_key, (_, old_story_id, _) = self._entries.popitem(last=False)
+                self._discard_story_key(old_story_id, old_key)
+                self.evictions += 1
+    
+    def set_encoded(self, key, encoding, body):
+        """Store a compressed variant of a cached body (ignored once the entry is gone)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[2][encoding] = body
+    
+    def invalidate_story(self, story_id):
+        """Drop every entry belonging to a story"""
+        with self._lock:
+            for key in self._keys_by_story.pop(story_id, ()):
+                self._entries.pop(key, None)
+    
+    def clear(self):
+        """Drop everything (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_story.clear()
+    
+    def stats(self):
+        """Counters for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': sum(
+                    len(body) + sum(map(len, encoded.values()))
+                    for body, _, encoded in self._entries.values()
+                ),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+    
+    def _discard_story_key(self, story_id, key):
+        keys = self._keys_by_story.get(story_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_story[story_id]
+
+
+def get_response_cache():
+    """The ResponseCache of the current app"""
+    return current_app.extensions['response_cache']
+
+
+def invalidate_story_cache(story_id):
+    """Drop cached responses for a story after a write"""
+    if story_id is not None:
+        get_response_cache().invalidate_story(story_id)
+
+
+def cached_json_response(key, story_id, build):
+    """
+    Serve a JSON response from the cache, building and storing it on a miss.
+    
+    Args:
+        key: Cache key; must include the story version
+        story_id: Story the response belongs to (for invalidation)
+        build: Callable returning the data to serialize on a miss, or None
+            when the resource does not exist
+    
+    Returns:
+        JSON response, or None if build returned None (nothing is cached).
+        The response carries the key as `cache_key`, so compression can
+        reuse a cached encoded body.
+    """
+    cache = get_response_cache()
+    body = cache.get(key)
+    status = 'HIT'
+    if body is None:
+        data = build()
+        if data is None:
+            return None
+        body = dumps(data)
+        cache.set(key, body, story_id)
+        status = 'MISS'
+    
+    response = current_app.response_class(body, mimetype='application/json')
+    response.headers['X-Cache'] = status
+    response.cache_key = key
+    return response
@@ -0,0 +1,137 @@
+"""
+Slow-query log - opt-in engine hook that writes every statement slower than
+SLOW_QUERY_THRESHOLD_MS as one JSON line to a rotating file.
+
+Each entry has the statement, its parameters, the route and service
+function that issued it and, on SQLite, the EXPLAIN QUERY PLAN of the
+statement.
+"""
+import json
+import logging
+import os
+import sys
+import time
+import weakref
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from flask import has_request_context, request
+from sqlalchemy import event
+from app.replicas import app_engines
+
+# Longest string parameter written in full (page text can be large)
+MAX_PARAMETER_LENGTH = 200
+
+
+def _parameter(value):
+    if isinstance(value, str) and len(value) > MAX_PARAMETER_LENGTH:
+        return value[:MAX_PARAMETER_LENGTH] + '...'
+    if isinstance(value, bytes):
+        return f'<{len(value)} bytes>'
+    return value
+
+
+def _parameters(parameters, executemany):
+    if executemany:
+        return {'rows': len(parameters)}
+    if isinstance(parameters, dict):
+        return {name: _parameter(value) for name, value in parameters.items()}
+    return [_parameter(value) for value in parameters or ()]
+
+
+def explain_query_plan(cursor, statement, parameters):
+    """
+    EXPLAIN QUERY PLAN of a statement on the raw DBAPI connection, so the
+    extra query does not re-enter the engine events.
+
+    Returns:
+        List of plan detail strings, or an error string
+    """
+    explain = cursor.connection.cursor()
+    try:
+        explain.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+        return [row[-1] for row in explain.fetchall()]
+    except Exception as e:
+        return f'EXPLAIN failed: {e}'
+    finally:
+        explain.close()
+
+
+def _route():
+    if not has_request_context():
+        return None
+    return {'method': request.method, 'path': request.path, 'endpoint': request.endpoint}
+
+
+def _caller():
+    """The innermost app.services function on the stack, e.g. 'story_service.get_story_tree:412'"""
+    services = os.path.join('app', 'services') + os.sep
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if services in filename:
+            module = os.path.splitext(os.path.basename(filename))[0]
+            return f'{module}.{frame.f_code.co_name}:{frame.f_lineno}'
+        frame = frame.f_back
+    return None
+
+
+def create_slow_query_logger(path, max_bytes, backups):
+    """Logger writing bare JSON lines to a size-rotated file"""
+    logger = logging.getLogger(f'{__name__}.{path}')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    if not logger.handlers:
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+    return logger
+
+
+# Engine -> (logger, threshold in seconds, whether to EXPLAIN) of each logged engine
+_logged_engines = weakref.WeakKeyDictionary()
+
+
+def start_statement(conn, cursor, statement, parameters, context, executemany):
+    context._slow_query_start = time.perf_counter()
+
+
+def log_slow_statement(conn, cursor, statement, parameters, context, executemany):
+    logger, threshold, explain = _logged_engines[conn.engine]
+    elapsed = time.perf_counter() - context._slow_query_start
+    if elapsed < threshold:
+        return
+
+    entry = {
+        'ts': datetime.now(timezone.utc).isoformat(),
+        'duration_ms': round(elapsed * 1000, 3),
+        'statement': statement,
+        'parameters': _parameters(parameters, executemany),
+        'route': _route(),
+        'caller': _caller()
+    }
+    if explain and not executemany:
+        entry['plan'] = explain_query_plan(cursor, statement, parameters)
+    logger.info(json.dumps(entry, default=str))
+
+
+def init_slow_query_log(app):
+    """
+    Log slow statements of the app's engines (primary and replicas).
+
+    Config:
+        SLOW_QUERY_LOG: File path; empty disables the log
+        SLOW_QUERY_THRESHOLD_MS: Statements at least this slow are logged
+        SLOW_QUERY_LOG_MAX_BYTES / SLOW_QUERY_LOG_BACKUPS: Rotation settings
+    """
+    path = app.config['SLOW_QUERY_LOG']
+    if not path:
+        return
+    logger = create_slow_query_logger(
+        path, app.config['SLOW_QUERY_LOG_MAX_BYTES'], app.config['SLOW_QUERY_LOG_BACKUPS']
+    )
+
+    threshold = app.config['SLOW_QUERY_THRESHOLD_MS'] / 1000
+    for engine in app_engines(app):
+        _logged_engines[engine] = (logger, threshold, engine.dialect.name == 'sqlite')
+        event.listen(engine, 'before_cursor_execute', start_statement)
+        event.listen(engine, 'after_cursor_execute', log_slow_statement)
@@ -4,5 +4,8 @@
 from .story import Story, StoryStatus
 from .page import Page
 from .choice import Choice
+from .snapshot import StorySnapshot, PageSnapshot
+from . import versioning  # noqa: F401 - registers story version events
+from . import search_index  # noqa: F401 - registers the FTS5 table and triggers
 
-__all__ = ['Story', 'StoryStatus', 'Page', 'Choice']
+__all__ = ['Story', 'StoryStatus', 'Page', 'Choice', 'StorySnapshot', 'PageSnapshot']
@@ -1,10 +1,15 @@
 
 
 from app.extensions import db
+from app.schemas.serializers import serialize_choice
 from datetime import datetime
 
 class Choice(db.Model):
     __tablename__ = 'choices'
+    __table_args__ = (
+        db.Index('ix_choices_page_id_id', 'page_id', 'id'),
+        db.Index('ix_choices_next_page_id', 'next_page_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     page_id = db.Column(db.Integer, db.ForeignKey('pages.id'), nullable=False)
@@ -18,11 +23,4 @@ class Choice(db.Model):
     next_page = db.relationship('Page', foreign_keys=[next_page_id])
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'page_id': self.page_id,
-            'text': self.text,
-            'next_page_id': self.next_page_id,
-            'dice_required': self.dice_required,
-            'min_roll': self.min_roll
-        }
+        return serialize_choice(self)
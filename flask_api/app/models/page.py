@@ -1,10 +1,17 @@
 
 
 from app.extensions import db
+from app.schemas.serializers import serialize_page, serialize_choice
+from .story import Story
 from datetime import datetime
 
 class Page(db.Model):
     __tablename__ = 'pages'
+    __table_args__ = (
+        db.Index('ix_pages_story_id_id', 'story_id', 'id'),
+        # Never reuse the ID of a deleted page: published snapshots keep it
+        {'sqlite_autoincrement': True},
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     story_id = db.Column(db.Integer, db.ForeignKey('stories.id'), nullable=False)
@@ -15,19 +22,18 @@ class Page(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
-    choices = db.relationship('Choice', backref='page', lazy='dynamic', 
+    choices = db.relationship('Choice', backref='page', lazy='selectin', order_by='Choice.id',
                              foreign_keys='Choice.page_id', cascade='all, delete-orphan')
     
     def to_dict(self, include_choices=True):
-        data = {
-            'id': self.id,
-            'story_id': self.story_id,
-            'text': self.text,
-            'is_ending': self.is_ending,
-            'ending_label': self.ending_label,
-            'illustration_url': self.illustration_url,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
-        if include_choices:
-            data['choices'] = [c.to_dict() for c in self.choices]
-        return data
+        choices = [serialize_choice(c) for c in self.choices] if include_choices else None
+        return serialize_page(self, choices)
+
+
+# Page count as a correlated subquery so listing stories stays a single query
+Story.page_count = db.column_property(
+    db.select(db.func.count(Page.id))
+    .where(Page.story_id == Story.id)
+    .correlate_except(Page)
+    .scalar_subquery()
+)
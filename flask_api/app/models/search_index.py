@@ -0,0 +1,59 @@
+"""
+Full-text search index - an SQLite FTS5 table over story titles,
+descriptions and page text.
+
+One row per story (rowid = -story_id, title/description) and one row per
+page (rowid = page_id, text), kept in sync by triggers on the stories and
+pages tables so ORM writes, bulk inserts and set-based deletes are all
+covered. Every trigger touches rows by rowid, so maintenance cost does not
+grow with the catalogue.
+"""
+from sqlalchemy import event, DDL
+from app.extensions import db
+
+SEARCH_TABLE = 'story_search'
+
+SEARCH_INDEX_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        story_id UNINDEXED, title, description, text, tokenize = 'porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS stories_search_insert AFTER INSERT ON stories BEGIN
+        INSERT INTO {SEARCH_TABLE} (rowid, story_id, title, description, text)
+        VALUES (-new.id, new.id, new.title, coalesce(new.description, ''), '');
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS stories_search_update AFTER UPDATE OF title, description ON stories BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = -old.id;
+        INSERT INTO {SEARCH_TABLE} (rowid, story_id, title, description, text)
+        VALUES (-new.id, new.id, new.title, coalesce(new.description, ''), '');
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS stories_search_delete AFTER DELETE ON stories BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = -old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS pages_search_insert AFTER INSERT ON pages BEGIN
+        INSERT INTO {SEARCH_TABLE} (rowid, story_id, title, description, text)
+        VALUES (new.id, new.story_id, '', '', new.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS pages_search_update AFTER UPDATE OF text, story_id ON pages BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+        INSERT INTO {SEARCH_TABLE} (rowid, story_id, title, description, text)
+        VALUES (new.id, new.story_id, '', '', new.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS pages_search_delete AFTER DELETE ON pages BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+    END""",
+]
+
+REBUILD_SEARCH_INDEX_SQL = [
+    f"DELETE FROM {SEARCH_TABLE}",
+    f"""INSERT INTO {SEARCH_TABLE} (rowid, story_id, title, description, text)
+        SELECT -id, id, title, coalesce(description, ''), '' FROM stories""",
+    f"""INSERT INTO {SEARCH_TABLE} (rowid, story_id, title, description, text)
+        SELECT id, story_id, '', '', text FROM pages""",
+]
+
+
+# db.create_all() does not know about virtual tables or triggers
+for statement in SEARCH_INDEX_DDL:
+    event.listen(db.metadata, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+event.listen(db.metadata, 'before_drop',
+             DDL(f'DROP TABLE IF EXISTS {SEARCH_TABLE}').execute_if(dialect='sqlite'))
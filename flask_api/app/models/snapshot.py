@@ -0,0 +1,44 @@
+"""
+Published snapshots - the reader-facing copy of a published story.
+
+Publishing compiles the story into one StorySnapshot (start page and tree)
+plus one PageSnapshot per page, each holding the response body already
+encoded as JSON. Reader endpoints answer from these rows with a single
+primary-key lookup, so authors can keep editing the live rows of a
+published story without readers seeing it until they publish again.
+"""
+from app.extensions import db
+from .story import Story
+
+
+class StorySnapshot(db.Model):
+    __tablename__ = 'story_snapshots'
+    
+    story_id = db.Column(db.Integer, db.ForeignKey('stories.id'), primary_key=True)
+    # Story.version at publish time; ETags of snapshot responses use it
+    version = db.Column(db.Integer, nullable=False)
+    published_at = db.Column(db.DateTime, nullable=False)
+    start_page = db.Column(db.LargeBinary)
+    tree = db.Column(db.LargeBinary, nullable=False)
+    
+    story = db.relationship(Story, backref=db.backref(
+        'snapshot', uselist=False, cascade='all, delete-orphan'))
+
+
+class PageSnapshot(db.Model):
+    __tablename__ = 'page_snapshots'
+    __table_args__ = (
+        db.Index('ix_page_snapshots_page_id', 'page_id'),
+    )
+    
+    # Keyed by story as well: a published copy must never answer for another
+    # story's page. No foreign key to pages: deleting a draft page must not
+    # touch the published copy
+    story_id = db.Column(db.Integer, db.ForeignKey('stories.id'), primary_key=True)
+    page_id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False)
+    published_at = db.Column(db.DateTime, nullable=False)
+    body = db.Column(db.LargeBinary, nullable=False)
+    
+    story = db.relationship(Story, backref=db.backref(
+        'page_snapshots', cascade='all, delete-orphan'))
@@ -1,6 +1,7 @@
 
 
 from app.extensions import db
+from app.schemas.serializers import serialize_story
 from datetime import datetime
 from enum import Enum
 
@@ -11,6 +12,11 @@ class StoryStatus(str, Enum):
 
 class Story(db.Model):
     __tablename__ = 'stories'
+    __table_args__ = (
+        # Catalogue listings filter by status (or author) and order by creation
+        db.Index('ix_stories_status_created_at', 'status', 'created_at'),
+        db.Index('ix_stories_author_id_created_at', 'author_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -21,20 +27,11 @@ class Story(db.Model):
     illustration_url = db.Column(db.String(500))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Bumped on any change to the story, its pages or its choices (see versioning.py)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     
     # Relationships
-    pages = db.relationship('Page', backref='story', lazy='dynamic', cascade='all, delete-orphan')
+    pages = db.relationship('Page', backref='story', lazy='select', cascade='all, delete-orphan')
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'status': self.status,
-            'author_id': self.author_id,
-            'start_page_id': self.start_page_id,
-            'illustration_url': self.illustration_url,
-            'page_count': self.pages.count(),
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        return serialize_story(self)
@@ -0,0 +1,57 @@
+"""
+Story versioning - bumps Story.version whenever the story, one of its pages
+or one of its choices is inserted, updated or deleted.
+
+The version is what ETags are built from, so it has to change on edits that
+never touch the stories row itself (e.g. editing a choice's text).
+"""
+from datetime import datetime
+from sqlalchemy import event
+from app.extensions import db
+from .story import Story
+from .page import Page
+from .choice import Choice
+
+
+def bump_story_versions(connection, story_ids=(), page_ids=()):
+    """
+    Increment the version of the given stories and of the stories owning
+    the given pages, in one UPDATE statement.
+    """
+    story_ids = set(story_ids)
+    page_ids = set(page_ids)
+    if not story_ids and not page_ids:
+        return
+    
+    condition = Story.id.in_(story_ids)
+    if page_ids:
+        owning_stories = db.select(Page.story_id).where(Page.id.in_(page_ids))
+        condition = db.or_(condition, Story.id.in_(owning_stories))
+    
+    connection.execute(
+        db.update(Story)
+        .where(condition)
+        .values(version=Story.version + 1, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+@event.listens_for(db.session, 'after_flush')
+def _bump_versions_after_flush(session, flush_context):
+    # new/dirty/deleted still hold the pre-flush state at this point
+    changed = list(session.new) + list(session.deleted) + [
+        obj for obj in session.dirty
+        if session.is_modified(obj, include_collections=False)
+    ]
+    
+    story_ids = set()
+    page_ids = set()
+    for obj in changed:
+        if isinstance(obj, Story) and obj not in session.new:
+            story_ids.add(obj.id)
+        elif isinstance(obj, Page):
+            story_ids.add(obj.story_id)
+        elif isinstance(obj, Choice):
+            page_ids.add(obj.page_id)
+    
+    bump_story_versions(session.connection(), story_ids, page_ids)
@@ -0,0 +1,134 @@
+"""
+Read replicas - GET requests of the story, page and choice blueprints read
+from a replica database; writes (and every other request) use the primary.
+
+Each replica URL (SQLALCHEMY_REPLICA_URIS) gets its own engine in
+app.extensions['db_replicas'] and RoutingSession sends the request's reads
+to the one picked here, so services need no bind arguments. After a
+successful write the client gets a cookie that keeps its reads on the
+primary for READ_YOUR_WRITES_SECONDS, so it sees its own changes despite
+replication lag. Metrics and the slow-query log hook every engine from
+app_engines(), so replica reads are counted like primary ones. The Django app shares one API client across users, so it
+keeps this cookie per end user in their session and sends it only with
+their requests (django_app/core/middleware/read_your_writes.py).
+
+For local testing a SQLite replica is a file copy of the primary, refreshed
+with `flask replicas refresh`. Relative SQLite paths resolve against the
+instance folder, as for the primary.
+"""
+import os
+import random
+import sqlite3
+import time
+import click
+from flask import current_app, g, request
+from flask.cli import AppGroup, with_appcontext
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from app.extensions import db
+from app.sqlite_tuning import resolve_sqlite_url, tune_sqlite_engine
+
+READ_PRIMARY_COOKIE = 'read_primary_until'
+READ_METHODS = ('GET', 'HEAD')
+# POST endpoints that only read, so they may use a replica and set no cookie
+READ_ONLY_ENDPOINTS = ('pages.resolve_choice',)
+
+replicas_cli = AppGroup('replicas', help='Manage read replicas.')
+
+
+def create_replica_engines(app):
+    """One engine per SQLALCHEMY_REPLICA_URIS entry, with the primary's engine options and PRAGMAs"""
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    engines = []
+    for uri in app.config['SQLALCHEMY_REPLICA_URIS']:
+        engine = create_engine(resolve_sqlite_url(uri, app.instance_path), **options)
+        if pragmas and engine.dialect.name == 'sqlite':
+            tune_sqlite_engine(engine, pragmas)
+        engines.append(engine)
+    return engines
+
+
+def app_engines(app):
+    """The primary engine followed by the app's replica engines"""
+    with app.app_context():
+        return [db.engine, *app.extensions.get('db_replicas', ())]
+
+
+def init_read_replicas(app):
+    """Route replica-eligible GETs to a random replica, honouring the read-your-writes window"""
+    app.cli.add_command(replicas_cli)
+    engines = create_replica_engines(app)
+    app.extensions['db_replicas'] = engines
+    if not engines:
+        return
+    blueprints = set(app.config['REPLICA_BLUEPRINTS'])
+    window = app.config['READ_YOUR_WRITES_SECONDS']
+
+    def is_read():
+        return request.method in READ_METHODS or request.endpoint in READ_ONLY_ENDPOINTS
+
+    @app.before_request
+    def choose_replica():
+        g.pop('db_replica', None)
+        if not is_read() or request.blueprint not in blueprints:
+            return
+        read_primary_until = request.cookies.get(READ_PRIMARY_COOKIE, type=float)
+        if read_primary_until and read_primary_until > time.time():
+            return
+        g.db_replica = random.choice(engines)
+
+    @app.after_request
+    def pin_reads_to_primary(response):
+        if not is_read() and response.status_code < 400 and window > 0:
+            response.set_cookie(READ_PRIMARY_COOKIE, f'{time.time() + window:.3f}',
+                                max_age=window, httponly=True, samesite='Lax')
+        return response
+
+
+def copy_sqlite_database(source_uri, target_uri):
+    """
+    Copy one SQLite database file onto another with the online backup API.
+
+    Raises:
+        FileNotFoundError: If the source file does not exist (connecting
+            would create an empty database and copy that instead)
+    """
+    source_path = make_url(source_uri).database
+    if not os.path.isfile(source_path):
+        raise FileNotFoundError(f'SQLite database not found: {source_path}')
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(make_url(target_uri).database)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def refresh_sqlite_replicas(app):
+    """
+    Overwrite every SQLite file replica with a copy of the primary.
+
+    Returns:
+        List of refreshed replica URIs
+    """
+    primary = resolve_sqlite_url(app.config['SQLALCHEMY_DATABASE_URI'], app.instance_path)
+    refreshed = []
+    for uri in app.config['SQLALCHEMY_REPLICA_URIS']:
+        if make_url(uri).get_backend_name() == 'sqlite':
+            copy_sqlite_database(primary, resolve_sqlite_url(uri, app.instance_path))
+            refreshed.append(uri)
+    return refreshed
+
+
+@replicas_cli.command('refresh')
+@with_appcontext
+def refresh_command():
+    """Copy the SQLite primary onto each SQLite replica."""
+    try:
+        refreshed = refresh_sqlite_replicas(current_app)
+    except FileNotFoundError as e:
+        raise click.ClickException(str(e))
+    for uri in refreshed:
+        click.echo(f'Refreshed {uri}')
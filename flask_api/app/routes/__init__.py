@@ -3,5 +3,6 @@
 from .stories import stories_bp
 from .pages import pages_bp
 from .choices import choices_bp
+from .system import system_bp
 
-__all__ = ['stories_bp', 'pages_bp', 'choices_bp']
+__all__ = ['stories_bp', 'pages_bp', 'choices_bp', 'system_bp']
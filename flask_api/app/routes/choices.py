@@ -4,14 +4,37 @@ from flask import Blueprint, request, jsonify
 from app.extensions import db
 from app.models import Choice
 from app.middleware.api_key_auth import require_api_key
+from app.middleware.response_cache import invalidate_story_cache
+from app.services import ChoiceService
+from app.schemas.serializers import CHOICE_FIELDS
+from .params import parse_id_list, parse_fields
 
 choices_bp = Blueprint('choices', __name__, url_prefix='/choices')
 
+@choices_bp.route('', methods=['GET'])
+def get_choices():
+    """Get several choices, e.g. /choices?ids=1,2,3"""
+    try:
+        choice_ids = parse_id_list(request.args.get('ids'))
+        fields = parse_fields(request.args.get('fields'), CHOICE_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    choices = ChoiceService.get_choices_by_ids(choice_ids, fields)
+    return jsonify(choices)
+
 @choices_bp.route('/<int:choice_id>', methods=['GET'])
 def get_choice(choice_id):
-    """Get a single choice"""
-    choice = Choice.query.get_or_404(choice_id)
-    return jsonify(choice.to_dict())
+    """Get a single choice, optionally only some fields (?fields=id,next_page_id)"""
+    try:
+        fields = parse_fields(request.args.get('fields'), CHOICE_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    choice = ChoiceService.get_choice_data(choice_id, fields)
+    if choice is None:
+        return jsonify({'error': 'Choice not found'}), 404
+    return jsonify(choice)
 
 @choices_bp.route('/<int:choice_id>', methods=['PUT'])
 @require_api_key
@@ -30,6 +53,7 @@ def update_choice(choice_id):
         choice.min_roll = data['min_roll']
     
     db.session.commit()
+    invalidate_story_cache(choice.page.story_id)
     return jsonify(choice.to_dict())
 
 @choices_bp.route('/<int:choice_id>', methods=['DELETE'])
@@ -37,6 +61,8 @@ def update_choice(choice_id):
 def delete_choice(choice_id):
     """Delete a choice"""
     choice = Choice.query.get_or_404(choice_id)
+    story_id = choice.page.story_id
     db.session.delete(choice)
     db.session.commit()
+    invalidate_story_cache(story_id)
     return jsonify({'message': 'Choice deleted'})
@@ -1,16 +1,106 @@
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from app.extensions import db
 from app.models import Page, Choice
-from app.middleware.api_key_auth import require_api_key
+from app.middleware.api_key_auth import require_api_key, check_api_key
+from app.middleware.conditional_get import story_etag, set_validators, not_modified, snapshot_response
+from app.middleware.response_cache import cached_json_response, invalidate_story_cache
+from app.services import PageService, SnapshotService
+from app.schemas.encoding import dumps
+from app.schemas.serializers import PAGE_FIELDS
+from app.story_store import get_story_store
+from .params import parse_id_list, parse_fields, parse_include, parse_flag
 
 pages_bp = Blueprint('pages', __name__, url_prefix='/pages')
 
+@pages_bp.route('', methods=['GET'])
+def get_pages():
+    """Get several pages with their choices, e.g. /pages?ids=1,2,3"""
+    try:
+        page_ids = parse_id_list(request.args.get('ids'))
+        fields = parse_fields(request.args.get('fields'), PAGE_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    include_choices = fields is None or 'choices' in parse_include(request.args.get('include'))
+    pages = PageService.get_pages_by_ids(page_ids, fields, include_choices)
+    return jsonify(pages)
+
 @pages_bp.route('/<int:page_id>', methods=['GET'])
 def get_page(page_id):
-    """Get a page with its choices"""
-    page = Page.query.get_or_404(page_id)
-    return jsonify(page.to_dict())
+    """
+    Get a page with its choices.
+    
+    With `fields` only the listed columns are returned, and choices only
+    when asked for, e.g. ?fields=id,text&include=choices. Pages of a
+    published story are served from its snapshot; ?draft=1 (API key
+    required) reads the live row instead, for authors editing it.
+    """
+    try:
+        fields = parse_fields(request.args.get('fields'), PAGE_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    include_choices = fields is None or 'choices' in parse_include(request.args.get('include'))
+    include = ('choices',) if fields is not None and include_choices else ()
+    draft = parse_flag(request.args.get('draft'))
+    if draft:
+        denied = check_api_key()
+        if denied:
+            return denied
+    
+    store = get_story_store() if not draft else None
+    stored = store.page(page_id) if store else None
+    if stored:
+        return snapshot_response(story_etag('page', page_id, stored.snapshot_version, fields, include),
+                                 stored.published_at,
+                                 SnapshotService.page_body(stored.body, fields, include_choices), 'STORE')
+    
+    version = PageService.get_page_version(page_id)
+    if not version:
+        # A draft deletion leaves the published copy in place
+        version = SnapshotService.get_page(page_id) if not draft else None
+        if not version:
+            return jsonify({'error': 'Page not found'}), 404
+    
+    if version.snapshot_version is not None and not draft:
+        return snapshot_response(story_etag('page', page_id, version.snapshot_version, fields, include),
+                                 version.published_at,
+                                 SnapshotService.page_body(version.body, fields, include_choices))
+    
+    etag = story_etag('page', page_id, version.version, fields, include)
+    cached = not_modified(etag, version.updated_at)
+    if cached:
+        return cached
+    
+    response = cached_json_response(
+        ('page', page_id, version.version, fields, include_choices), version.story_id,
+        lambda: PageService.get_page_data(page_id, fields, include_choices)
+    )
+    return set_validators(response, etag, version.updated_at)
+
+@pages_bp.route('/<int:page_id>/choices/<int:choice_id>/resolve', methods=['POST'])
+def resolve_choice(page_id, choice_id):
+    """
+    Follow a choice: check it belongs to the page and return it with the
+    page it leads to (choices included) as {'choice': ..., 'page': ...}.
+    
+    Published pages resolve from their snapshot, like GET /pages/<id>.
+    Dice checks are left to the caller, which gets dice_required/min_roll
+    in `choice`.
+    """
+    try:
+        resolved = SnapshotService.resolve_choice(page_id, choice_id)
+        if resolved is None:
+            choice, page = PageService.resolve_choice(page_id, choice_id)
+            resolved = dumps(choice), dumps(page)
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 422
+    
+    choice_body, page_body = resolved
+    return current_app.response_class(b''.join([b'{"choice":', choice_body, b',"page":', page_body, b'}']),
+                                      mimetype='application/json')
 
 @pages_bp.route('/<int:page_id>', methods=['PUT'])
 @require_api_key
@@ -29,15 +119,18 @@ def update_page(page_id):
         page.illustration_url = data['illustration_url']
     
     db.session.commit()
+    invalidate_story_cache(page.story_id)
     return jsonify(page.to_dict())
 
 @pages_bp.route('/<int:page_id>', methods=['DELETE'])
 @require_api_key
 def delete_page(page_id):
-    """Delete a page"""
-    page = Page.query.get_or_404(page_id)
-    db.session.delete(page)
-    db.session.commit()
+    """Delete a page and its choices, unlinking choices that led to it"""
+    changed = PageService.delete_pages([page_id])
+    if not changed:
+        return jsonify({'error': 'Page not found'}), 404
+    for story_id in changed:
+        invalidate_story_cache(story_id)
     return jsonify({'message': 'Page deleted'})
 
 @pages_bp.route('/<int:page_id>/choices', methods=['POST'])
@@ -60,5 +153,6 @@ def create_choice(page_id):
     
     db.session.add(choice)
     db.session.commit()
+    invalidate_story_cache(page.story_id)
     
     return jsonify(choice.to_dict()), 201
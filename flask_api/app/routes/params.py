@@ -0,0 +1,62 @@
+"""
+Query-string parsing shared by the route modules.
+"""
+
+MAX_IDS_PER_REQUEST = 500
+
+
+def parse_id_list(value, max_ids=MAX_IDS_PER_REQUEST):
+    """
+    Parse a comma-separated id list such as '1,2,3'.
+    
+    Duplicates are dropped, first occurrence order is kept.
+    
+    Raises:
+        ValueError: If the list is empty, malformed or too long
+    """
+    if not value:
+        raise ValueError('ids parameter is required')
+    
+    try:
+        ids = [int(part) for part in value.split(',') if part.strip()]
+    except ValueError as e:
+        raise ValueError('ids must be a comma-separated list of integers') from e
+    
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise ValueError('ids parameter is required')
+    if len(ids) > max_ids:
+        raise ValueError(f'At most {max_ids} ids can be requested at once')
+    return ids
+
+
+def parse_fields(value, allowed):
+    """
+    Parse a sparse fieldset such as 'id,title,status'.
+    
+    'id' is always returned first; duplicates are dropped.
+    
+    Returns:
+        Tuple of field names, or None when no fieldset was requested
+    
+    Raises:
+        ValueError: If a field is not one of `allowed`
+    """
+    if not value:
+        return None
+    
+    fields = [part.strip() for part in value.split(',') if part.strip()]
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return tuple(dict.fromkeys(['id'] + fields))
+
+
+def parse_include(value):
+    """Parse a comma-separated include list such as 'choices' into a set"""
+    return {part.strip() for part in (value or '').split(',') if part.strip()}
+
+
+def parse_flag(value):
+    """Parse a boolean query flag such as draft=1 ('1', 'true' or 'yes'; anything else is False)"""
+    return (value or '').strip().lower() in ('1', 'true', 'yes')
@@ -1,72 +1,266 @@
 
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from app.extensions import db
 from app.models import Story, StoryStatus, Page
-from app.middleware.api_key_auth import require_api_key
+from app.middleware.api_key_auth import require_api_key, check_api_key
+from app.middleware.conditional_get import story_etag, set_validators, not_modified, snapshot_response
+from app.middleware.response_cache import cached_json_response, invalidate_story_cache
+from app.services import (
+    StoryService, PageService, SnapshotService, validate_story_graph, analyze_story,
+    LAYOUT_LAYERED, layered_layout
+)
+from app.services.story_service import DEFAULT_PAGE_SIZE
+from app.schemas.serializers import STORY_FIELDS, serialize_story
+from app.schemas.encoding import dumps, loads
+from app.story_store import get_story_store, sync_story_store
+from .params import parse_fields, parse_flag
 
 stories_bp = Blueprint('stories', __name__, url_prefix='/stories')
 
 @stories_bp.route('', methods=['GET'])
 def get_stories():
-    """Get all stories, optionally filtered by status"""
+    """
+    Get all stories, optionally filtered by status.
+    
+    Passing `limit` and/or `cursor` switches to keyset pagination and wraps
+    the result as {'stories': [...], 'next_cursor': ...}. `fields` selects
+    only the listed columns, e.g. ?fields=id,title,status, and `author_id`
+    restricts either form to one author.
+    """
     status = request.args.get('status', 'published')
+    author_id = request.args.get('author_id', type=int)
+    try:
+        fields = parse_fields(request.args.get('fields'), STORY_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if 'limit' in request.args or 'cursor' in request.args:
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        try:
+            stories, next_cursor = StoryService.get_stories_page(
+                status=status, limit=limit, cursor=request.args.get('cursor'), fields=fields,
+                author_id=author_id
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({
+            'stories': [serialize_story(s, fields) for s in stories],
+            'next_cursor': next_cursor
+        })
     
-    query = Story.query
-    if status:
-        query = query.filter_by(status=status)
+    stories = StoryService.get_all_stories(status=status, fields=fields, author_id=author_id)
+    return jsonify([serialize_story(s, fields) for s in stories])
+
+@stories_bp.route('/export', methods=['GET'])
+def export_stories():
+    """Stream every story with its pages and choices as NDJSON"""
+    status = request.args.get('status')
+    
+    def generate():
+        for story in StoryService.iter_export(status=status):
+            yield dumps(story) + b'\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@stories_bp.route('/search', methods=['GET'])
+def search_stories():
+    """Ranked full-text search, e.g. /stories/search?q=dragon&limit=12&offset=0"""
+    try:
+        stories, next_offset = StoryService.search_stories(
+            request.args.get('q', ''),
+            status=request.args.get('status', 'published'),
+            limit=request.args.get('limit', DEFAULT_PAGE_SIZE, type=int),
+            offset=request.args.get('offset', 0, type=int)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    stories = query.order_by(Story.created_at.desc()).all()
-    return jsonify([s.to_dict() for s in stories])
+    return jsonify({
+        'stories': [serialize_story(s) for s in stories],
+        'next_offset': next_offset
+    })
 
 @stories_bp.route('/<int:story_id>', methods=['GET'])
 def get_story(story_id):
-    """Get a single story by ID"""
-    story = Story.query.get_or_404(story_id)
-    return jsonify(story.to_dict())
+    """Get a single story by ID, optionally only some fields (?fields=id,title)"""
+    try:
+        fields = parse_fields(request.args.get('fields'), STORY_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    story = StoryService.get_story_version(story_id)
+    if not story:
+        return jsonify({'error': 'Story not found'}), 404
+    
+    etag = story_etag('story', story_id, story.version, fields)
+    cached = not_modified(etag, story.updated_at)
+    if cached:
+        return cached
+    
+    response = cached_json_response(
+        ('story', story_id, story.version, fields), story_id,
+        lambda: StoryService.get_story_data(story_id, fields)
+    )
+    return set_validators(response, etag, story.updated_at)
 
 @stories_bp.route('/<int:story_id>/start', methods=['GET'])
 def get_start_page(story_id):
-    """Get the starting page of a story"""
-    story = Story.query.get_or_404(story_id)
+    """
+    Get the starting page of a story (its published snapshot when there is
+    one; ?draft=1 with the API key reads the live pages).
+    """
+    draft = parse_flag(request.args.get('draft'))
+    if draft:
+        denied = check_api_key()
+        if denied:
+            return denied
+    
+    store = get_story_store() if not draft else None
+    stored = store.start(story_id) if store else None
+    if stored:
+        return snapshot_response(story_etag('start', story_id, stored.snapshot_version),
+                                 stored.published_at, stored.body, 'STORE')
+    
+    story = SnapshotService.get_start(story_id)
+    if not story:
+        return jsonify({'error': 'Story not found'}), 404
     
-    if not story.start_page_id:
-        # Return first page if no start page set
-        first_page = Page.query.filter_by(story_id=story_id).first()
-        if not first_page:
+    if story.snapshot_version is not None and not draft:
+        if story.body is None:
             return jsonify({'error': 'Story has no pages'}), 404
-        return jsonify(first_page.to_dict())
+        return snapshot_response(story_etag('start', story_id, story.snapshot_version),
+                                 story.published_at, story.body)
+    
+    etag = story_etag('start', story_id, story.version)
+    cached = not_modified(etag, story.updated_at)
+    if cached:
+        return cached
+    
+    def build():
+        start_page_id = story.start_page_id
+        if not start_page_id:
+            # Return first page if no start page set
+            start_page_id = PageService.get_first_page_id(story_id)
+        return PageService.get_page_data(start_page_id) if start_page_id else None
+    
+    response = cached_json_response(('start', story_id, story.version), story_id, build)
+    if response is None:
+        return jsonify({'error': 'Story has no pages'}), 404
+    return set_validators(response, etag, story.updated_at)
+
+def layered_tree_response(story_id, version, last_modified, build):
+    """Tree with layered-layout coordinates, computed once per story version"""
+    etag = story_etag('tree-layered', story_id, version)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
     
-    start_page = Page.query.get_or_404(story.start_page_id)
-    return jsonify(start_page.to_dict())
+    response = cached_json_response(
+        ('tree', story_id, version, LAYOUT_LAYERED), story_id,
+        lambda: layered_layout(build())
+    )
+    return set_validators(response, etag, last_modified)
 
 @stories_bp.route('/<int:story_id>/tree', methods=['GET'])
 def get_story_tree(story_id):
-    """Get story structure for visualization"""
-    story = Story.query.get_or_404(story_id)
-    pages = Page.query.filter_by(story_id=story_id).all()
-    
-    nodes = []
-    edges = []
-    
-    for page in pages:
-        nodes.append({
-            'id': page.id,
-            'label': f'Page {page.id}',
-            'is_start': page.id == story.start_page_id,
-            'is_ending': page.is_ending,
-            'ending_label': page.ending_label
-        })
-        
-        for choice in page.choices:
-            if choice.next_page_id:
-                edges.append({
-                    'source': page.id,
-                    'target': choice.next_page_id,
-                    'label': choice.text[:30] + '...' if len(choice.text) > 30 else choice.text
-                })
+    """
+    Get story structure for visualization (its published snapshot when there is one).
+    
+    ?layout=layered adds x/y coordinates computed on the server (see
+    services/tree_layout.py), so large stories need no layout in the browser.
+    ?draft=1 (API key required) reads the live pages and choices.
+    """
+    layout = request.args.get('layout')
+    if layout not in (None, LAYOUT_LAYERED):
+        return jsonify({'error': f'Unknown layout: {layout}'}), 400
+    draft = parse_flag(request.args.get('draft'))
+    if draft:
+        denied = check_api_key()
+        if denied:
+            return denied
+    
+    store = get_story_store() if not draft else None
+    stored = store.tree(story_id) if store else None
+    if stored:
+        if layout:
+            return layered_tree_response(story_id, stored.snapshot_version, stored.published_at,
+                                         lambda: loads(stored.body))
+        return snapshot_response(story_etag('tree', story_id, stored.snapshot_version),
+                                 stored.published_at, stored.body, 'STORE')
     
-    return jsonify({'nodes': nodes, 'edges': edges})
+    story = SnapshotService.get_tree(story_id)
+    if not story:
+        return jsonify({'error': 'Story not found'}), 404
+    
+    if story.snapshot_version is not None and not draft:
+        if layout:
+            return layered_tree_response(story_id, story.snapshot_version, story.published_at,
+                                         lambda: loads(story.body))
+        return snapshot_response(story_etag('tree', story_id, story.snapshot_version),
+                                 story.published_at, story.body)
+    
+    if layout:
+        return layered_tree_response(story_id, story.version, story.updated_at,
+                                     lambda: StoryService.get_story_tree(story_id))
+    
+    etag = story_etag('tree', story_id, story.version)
+    cached = not_modified(etag, story.updated_at)
+    if cached:
+        return cached
+    
+    response = cached_json_response(
+        ('tree', story_id, story.version), story_id,
+        lambda: StoryService.get_story_tree(story_id)
+    )
+    return set_validators(response, etag, story.updated_at)
+
+@stories_bp.route('/<int:story_id>/bundle', methods=['GET'])
+def get_story_bundle(story_id):
+    """Get a story with all its pages and choices in one response"""
+    story = StoryService.get_story_version(story_id)
+    if not story:
+        return jsonify({'error': 'Story not found'}), 404
+    
+    etag = story_etag('bundle', story_id, story.version)
+    cached = not_modified(etag, story.updated_at)
+    if cached:
+        return cached
+    
+    response = cached_json_response(
+        ('bundle', story_id, story.version), story_id,
+        lambda: StoryService.get_story_bundle(story_id)
+    )
+    return set_validators(response, etag, story.updated_at)
+
+@stories_bp.route('/<int:story_id>/validate', methods=['GET'])
+def validate_story(story_id):
+    """Check whether a story's graph is ready to publish"""
+    report = validate_story_graph(story_id)
+    if report is None:
+        return jsonify({'error': 'Story not found'}), 404
+    return jsonify(report)
+
+@stories_bp.route('/<int:story_id>/analysis', methods=['GET'])
+def get_story_analysis(story_id):
+    """Exact probability of reaching each ending under random play"""
+    story = StoryService.get_story_version(story_id)
+    if not story:
+        return jsonify({'error': 'Story not found'}), 404
+    
+    etag = story_etag('analysis', story_id, story.version)
+    cached = not_modified(etag, story.updated_at)
+    if cached:
+        return cached
+    
+    try:
+        response = cached_json_response(
+            ('analysis', story_id, story.version), story_id,
+            lambda: analyze_story(story_id)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 422
+    return set_validators(response, etag, story.updated_at)
 
 @stories_bp.route('', methods=['POST'])
 @require_api_key
@@ -90,6 +284,19 @@ def create_story():
     
     return jsonify(story.to_dict()), 201
 
+@stories_bp.route('/import', methods=['POST'])
+@require_api_key
+def import_story():
+    """Create a story with all its pages and choices in one transaction"""
+    data = request.get_json()
+    
+    try:
+        story = StoryService.import_story(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(story.to_dict()), 201
+
 @stories_bp.route('/<int:story_id>', methods=['PUT'])
 @require_api_key
 def update_story(story_id):
@@ -97,6 +304,17 @@ def update_story(story_id):
     story = Story.query.get_or_404(story_id)
     data = request.get_json()
     
+    # Publishing again recompiles the snapshot readers see, so it is validated too
+    publishing = data.get('status') == StoryStatus.PUBLISHED.value
+    if publishing:
+        report = validate_story_graph(story_id)
+        if not report['valid']:
+            return jsonify({
+                'error': 'Story is not ready to publish',
+                'code': 'INVALID_STORY_GRAPH',
+                'errors': report['errors']
+            }), 400
+    
     if 'title' in data:
         story.title = data['title']
     if 'description' in data:
@@ -107,17 +325,24 @@ def update_story(story_id):
         story.start_page_id = data['start_page_id']
     if 'illustration_url' in data:
         story.illustration_url = data['illustration_url']
+    if 'status' in data:
+        SnapshotService.sync_status(story_id, story.status)
     
     db.session.commit()
+    invalidate_story_cache(story_id)
+    if 'status' in data:
+        sync_story_store(story_id)
     return jsonify(story.to_dict())
 
 @stories_bp.route('/<int:story_id>', methods=['DELETE'])
 @require_api_key
 def delete_story(story_id):
     """Delete a story and all its pages/choices"""
-    story = Story.query.get_or_404(story_id)
-    db.session.delete(story)
-    db.session.commit()
+    deleted, changed = StoryService.delete_stories([story_id])
+    if not deleted:
+        return jsonify({'error': 'Story not found'}), 404
+    for affected in deleted + changed:
+        invalidate_story_cache(affected)
     return jsonify({'message': 'Story deleted'}), 200
 
 @stories_bp.route('/<int:story_id>/pages', methods=['POST'])
@@ -142,8 +367,9 @@ def create_page(story_id):
     db.session.commit()
     
     # Set as start page if it's the first page
-    if story.pages.count() == 1:
+    if story.page_count == 1:
         story.start_page_id = page.id
         db.session.commit()
     
+    invalidate_story_cache(story_id)
     return jsonify(page.to_dict()), 201
@@ -0,0 +1,20 @@
+
+
+from flask import Blueprint, Response, jsonify
+from app.middleware.response_cache import get_response_cache
+from app.middleware.metrics import get_metrics
+
+system_bp = Blueprint('system', __name__)
+
+@system_bp.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Hit/miss counters of the response cache"""
+    return jsonify(get_response_cache().stats())
+
+@system_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Request and SQL metrics in the Prometheus text format"""
+    collected = get_metrics()
+    if collected is None:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+    return Response(collected.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,18 @@
+"""
+Routing session - sends reads to a replica engine when the current request
+has chosen one (see app/replicas.py); flushes and DML always use the
+primary.
+"""
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+
+
+class RoutingSession(Session):
+    """db.session class honouring g.db_replica, the replica engine chosen for the request"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not getattr(clause, 'is_dml', False):
+            replica = g.get('db_replica') if has_app_context() else None
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -4,6 +4,11 @@ Schemas module - Request/Response serialization.
 from .story_schema import StoryCreateSchema, StoryUpdateSchema, StoryResponseSchema
 from .page_schema import PageCreateSchema, PageUpdateSchema, PageResponseSchema
 from .choice_schema import ChoiceCreateSchema, ChoiceUpdateSchema, ChoiceResponseSchema
+from .encoding import dumps, loads, FastJSONProvider, JSON_BACKEND
+from .serializers import (
+    STORY_FIELDS, PAGE_FIELDS, CHOICE_FIELDS, TREE_NODE_FIELDS, TREE_EDGE_FIELDS, columns,
+    serialize_fields, serialize_story, serialize_page, serialize_choice, serialize_pages, serialize_tree
+)
 
 __all__ = [
     'StoryCreateSchema',
@@ -14,5 +19,21 @@ __all__ = [
     'PageResponseSchema',
     'ChoiceCreateSchema',
     'ChoiceUpdateSchema',
-    'ChoiceResponseSchema'
+    'ChoiceResponseSchema',
+    'dumps',
+    'loads',
+    'FastJSONProvider',
+    'JSON_BACKEND',
+    'STORY_FIELDS',
+    'PAGE_FIELDS',
+    'CHOICE_FIELDS',
+    'TREE_NODE_FIELDS',
+    'TREE_EDGE_FIELDS',
+    'columns',
+    'serialize_fields',
+    'serialize_story',
+    'serialize_page',
+    'serialize_choice',
+    'serialize_pages',
+    'serialize_tree'
 ]
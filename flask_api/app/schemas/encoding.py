@@ -0,0 +1,59 @@
+"""
+JSON encoding - uses orjson when it is installed and falls back to the
+standard library otherwise.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+JSON_BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, 'value'):  # Enum members such as StoryStatus
+        return value.value
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(obj):
+    """Encode an object to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, separators=(',', ':')).encode()
+
+
+def loads(data):
+    """Decode JSON bytes, memoryview or text"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider backed by dumps(), so jsonify() uses the fast backend"""
+    
+    mimetype = 'application/json'
+    
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode()
+    
+    def loads(self, s, **kwargs):
+        if orjson is not None or not kwargs:
+            return loads(s)
+        return json.loads(s, **kwargs)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
@@ -0,0 +1,128 @@
+"""
+Row serializers - build response dicts from SQLAlchemy row tuples (or any
+object with the same attributes, such as model instances).
+
+Read paths select exactly these columns instead of loading ORM instances,
+and model to_dict() methods delegate here, so every response shape is
+defined in one place. Passing `fields` to a serializer returns only those
+keys (sparse fieldsets); the full shapes below are the default.
+"""
+from datetime import datetime
+
+STORY_FIELDS = (
+    'id', 'title', 'description', 'status', 'author_id', 'start_page_id',
+    'illustration_url', 'page_count', 'created_at', 'updated_at', 'version'
+)
+PAGE_FIELDS = ('id', 'story_id', 'text', 'is_ending', 'ending_label', 'illustration_url', 'created_at')
+CHOICE_FIELDS = ('id', 'page_id', 'text', 'next_page_id', 'dice_required', 'min_roll')
+TREE_NODE_FIELDS = ('id', 'is_ending', 'ending_label')
+TREE_EDGE_FIELDS = ('page_id', 'next_page_id', 'text')
+
+
+def columns(model, fields):
+    """Model attributes for a field list, for use in db.select(...)"""
+    return [getattr(model, field) for field in fields]
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def serialize_fields(row, fields):
+    """Row -> response dict with only the given fields"""
+    data = {}
+    for field in fields:
+        value = getattr(row, field)
+        data[field] = value.isoformat() if isinstance(value, datetime) else value
+    return data
+
+
+def serialize_story(row, fields=None):
+    """Story row -> response dict"""
+    if fields is not None:
+        return serialize_fields(row, fields)
+    return {
+        'id': row.id,
+        'title': row.title,
+        'description': row.description,
+        'status': row.status,
+        'author_id': row.author_id,
+        'start_page_id': row.start_page_id,
+        'illustration_url': row.illustration_url,
+        'page_count': row.page_count,
+        'created_at': _isoformat(row.created_at),
+        'updated_at': _isoformat(row.updated_at),
+        'version': row.version
+    }
+
+
+def serialize_page(row, choices=None, fields=None):
+    """Page row -> response dict; choices (already serialized) are nested when given"""
+    if fields is not None:
+        data = serialize_fields(row, fields)
+        if choices is not None:
+            data['choices'] = choices
+        return data
+    data = {
+        'id': row.id,
+        'story_id': row.story_id,
+        'text': row.text,
+        'is_ending': row.is_ending,
+        'ending_label': row.ending_label,
+        'illustration_url': row.illustration_url,
+        'created_at': _isoformat(row.created_at)
+    }
+    if choices is not None:
+        data['choices'] = choices
+    return data
+
+
+def serialize_choice(row, fields=None):
+    """Choice row -> response dict"""
+    if fields is not None:
+        return serialize_fields(row, fields)
+    return {
+        'id': row.id,
+        'page_id': row.page_id,
+        'text': row.text,
+        'next_page_id': row.next_page_id,
+        'dice_required': row.dice_required,
+        'min_roll': row.min_roll
+    }
+
+
+def serialize_pages(page_rows, choice_rows, fields=None):
+    """
+    Nest choice rows under their page rows.
+    
+    Args:
+        page_rows: Page rows in output order
+        choice_rows: Choice rows of those pages in output order, or None to
+            leave choices out
+        fields: Optional page fields to keep (see serialize_page)
+    """
+    if choice_rows is None:
+        return [serialize_page(row, fields=fields) for row in page_rows]
+    choices_by_page = {row.id: [] for row in page_rows}
+    for row in choice_rows:
+        choices_by_page[row.page_id].append(serialize_choice(row))
+    return [serialize_page(row, choices_by_page[row.id], fields) for row in page_rows]
+
+
+def serialize_tree(start_page_id, node_rows, edge_rows):
+    """Node/edge graph for visualization from page and choice rows"""
+    nodes = [{
+        'id': row.id,
+        'label': f'Page {row.id}',
+        'is_start': row.id == start_page_id,
+        'is_ending': row.is_ending,
+        'ending_label': row.ending_label
+    } for row in node_rows]
+    
+    edges = [{
+        'source': row.page_id,
+        'target': row.next_page_id,
+        'label': row.text[:30] + '...' if len(row.text) > 30 else row.text
+    } for row in edge_rows if row.next_page_id]
+    
+    return {'nodes': nodes, 'edges': edges}
@@ -2,5 +2,19 @@
 Services module - Business logic layer.
 """
 from .story_service import StoryService, PageService, ChoiceService
+from .snapshot_service import SnapshotService
+from .story_validator import StoryGraph, validate_story_graph
+from .story_analysis import analyze_story
+from .tree_layout import LAYOUT_LAYERED, layered_layout
 
-__all__ = ['StoryService', 'PageService', 'ChoiceService']
+__all__ = [
+    'StoryService',
+    'PageService',
+    'ChoiceService',
+    'SnapshotService',
+    'StoryGraph',
+    'validate_story_graph',
+    'analyze_story',
+    'LAYOUT_LAYERED',
+    'layered_layout'
+]
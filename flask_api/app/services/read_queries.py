@@ -0,0 +1,146 @@
+"""
+Read queries - SELECT statements of the hot read paths.
+
+The statements are plain SQLAlchemy Core selects, so the sync services run
+them with db.session.execute() and the async read API (app/async_api) with
+AsyncSession.execute(); both then feed the rows to app.schemas.serializers.
+"""
+from sqlalchemy import and_, or_, select
+from app.models import Story, Page, Choice, StorySnapshot, PageSnapshot
+from app.schemas.serializers import (
+    STORY_FIELDS, PAGE_FIELDS, CHOICE_FIELDS, TREE_NODE_FIELDS, TREE_EDGE_FIELDS, columns
+)
+
+
+def story_version(story_id):
+    """Validators of a story: version, updated_at and start_page_id"""
+    return select(Story.version, Story.updated_at, Story.start_page_id).where(Story.id == story_id)
+
+
+def page_version(page_id):
+    """
+    Validators of a page: its story_id and the story's version and
+    updated_at, plus the page's published snapshot (snapshot_version,
+    published_at, body; all None when the story has no snapshot).
+    """
+    return (select(Page.story_id, Story.version, Story.updated_at, PageSnapshot.version.label('snapshot_version'),
+                   PageSnapshot.published_at, PageSnapshot.body)
+            .join(Story, Page.story_id == Story.id)
+            .outerjoin(PageSnapshot, and_(PageSnapshot.story_id == Page.story_id, PageSnapshot.page_id == Page.id))
+            .where(Page.id == page_id))
+
+
+def story_list(status=None, fields=None, author_id=None):
+    """Stories, newest first"""
+    query = select(*columns(Story, fields or STORY_FIELDS))
+    if status:
+        query = query.where(Story.status == status)
+    if author_id is not None:
+        query = query.where(Story.author_id == author_id)
+    return query.order_by(Story.created_at.desc())
+
+
+def story_keyset_page(status=None, limit=20, after=None, fields=None, author_id=None):
+    """
+    One keyset page of stories on (created_at, id), newest first.
+
+    Selects limit + 1 rows so the caller can tell whether a next page exists.
+
+    Args:
+        after: (created_at, id) of the last story of the previous page, or None
+        fields: Optional story fields; the sort columns are always selected
+        author_id: Optional author filter
+    """
+    if fields:
+        fields = tuple(dict.fromkeys(fields + ('id', 'created_at')))
+    query = select(*columns(Story, fields or STORY_FIELDS))
+    if status:
+        query = query.where(Story.status == status)
+    if author_id is not None:
+        query = query.where(Story.author_id == author_id)
+    if after:
+        created_at, story_id = after
+        query = query.where(or_(
+            Story.created_at < created_at,
+            and_(Story.created_at == created_at, Story.id < story_id)
+        ))
+    return query.order_by(Story.created_at.desc(), Story.id.desc()).limit(limit + 1)
+
+
+def story(story_id, fields=None):
+    """One story's serialized columns"""
+    return select(*columns(Story, fields or STORY_FIELDS)).where(Story.id == story_id)
+
+
+def first_page_id(story_id):
+    """ID of a story's first page (used when no start page is set)"""
+    return select(Page.id).where(Page.story_id == story_id).order_by(Page.id).limit(1)
+
+
+def page(page_id, fields=None):
+    """One page's serialized columns"""
+    return select(*columns(Page, fields or PAGE_FIELDS)).where(Page.id == page_id)
+
+
+def page_choices(page_id):
+    """A page's choices in display order"""
+    return select(*columns(Choice, CHOICE_FIELDS)).where(Choice.page_id == page_id).order_by(Choice.id)
+
+
+def story_pages(story_id):
+    """Serialized columns of every page of a story"""
+    return select(*columns(Page, PAGE_FIELDS)).where(Page.story_id == story_id).order_by(Page.id)
+
+
+def story_choices(story_id):
+    """Serialized columns of every choice of a story"""
+    return (select(*columns(Choice, CHOICE_FIELDS))
+            .join(Page, Choice.page_id == Page.id)
+            .where(Page.story_id == story_id)
+            .order_by(Choice.id))
+
+
+def page_choice(page_id, choice_id):
+    """A choice, only if it belongs to the given page"""
+    return select(*columns(Choice, CHOICE_FIELDS)).where(Choice.id == choice_id, Choice.page_id == page_id)
+
+
+def tree_start(story_id):
+    """A story's start page ID (a row, or None when the story does not exist)"""
+    return select(Story.start_page_id).where(Story.id == story_id)
+
+
+def tree_nodes(story_id):
+    """Node columns of every page of a story"""
+    return select(*columns(Page, TREE_NODE_FIELDS)).where(Page.story_id == story_id).order_by(Page.id)
+
+
+def tree_edges(story_id):
+    """Edge columns of every choice of a story"""
+    return (select(*columns(Choice, TREE_EDGE_FIELDS))
+            .join(Page, Choice.page_id == Page.id)
+            .where(Page.story_id == story_id)
+            .order_by(Choice.page_id, Choice.id))
+
+
+def _story_snapshot(story_id, body):
+    return (select(Story.version, Story.updated_at, Story.start_page_id,
+                   StorySnapshot.version.label('snapshot_version'), StorySnapshot.published_at, body.label('body'))
+            .outerjoin(StorySnapshot, StorySnapshot.story_id == Story.id)
+            .where(Story.id == story_id))
+
+
+def snapshot_start(story_id):
+    """story_version() plus the published start page body and its snapshot validators"""
+    return _story_snapshot(story_id, StorySnapshot.start_page)
+
+
+def snapshot_tree(story_id):
+    """story_version() plus the published tree body and its snapshot validators"""
+    return _story_snapshot(story_id, StorySnapshot.tree)
+
+
+def snapshot_page(page_id):
+    """Published body of a page, with its snapshot validators (also after the live page was deleted)"""
+    return (select(PageSnapshot.version.label('snapshot_version'), PageSnapshot.published_at, PageSnapshot.body)
+            .where(PageSnapshot.page_id == page_id))
@@ -0,0 +1,146 @@
+"""
+Snapshot Service - compiles a published story into its StorySnapshot and
+PageSnapshot rows and reads them back for the reader endpoints.
+"""
+from datetime import datetime
+from app.extensions import db
+from app.models import StoryStatus, StorySnapshot, PageSnapshot
+from app.schemas.encoding import dumps, loads
+from app.schemas.serializers import serialize_pages, serialize_tree
+from app.story_store import get_story_store
+from . import read_queries
+
+
+class SnapshotService:
+    """Service class for published story snapshots"""
+    
+    @staticmethod
+    def compile_snapshot(story_id):
+        """
+        Replace a story's snapshot with one compiled from its current rows.
+        
+        Runs in the caller's transaction, so publishing and compiling
+        commit together.
+        
+        Args:
+            story_id: The story's ID
+            
+        Returns:
+            Version of the new snapshot, or None if the story does not exist
+        """
+        story = db.session.execute(read_queries.story_version(story_id)).first()
+        if not story:
+            return None
+        
+        page_rows = db.session.execute(read_queries.story_pages(story_id)).all()
+        choice_rows = db.session.execute(read_queries.story_choices(story_id)).all()
+        nodes = db.session.execute(read_queries.tree_nodes(story_id)).all()
+        edges = db.session.execute(read_queries.tree_edges(story_id)).all()
+        pages = serialize_pages(page_rows, choice_rows)
+        
+        # Same fallback as the live start endpoint: the first page
+        start_page_id = story.start_page_id or (pages[0]['id'] if pages else None)
+        bodies = {page['id']: dumps(page) for page in pages}
+        published_at = datetime.utcnow()
+        
+        SnapshotService.drop_snapshot(story_id)
+        db.session.execute(db.insert(StorySnapshot).values(
+            story_id=story_id,
+            version=story.version,
+            published_at=published_at,
+            start_page=bodies.get(start_page_id),
+            tree=dumps(serialize_tree(story.start_page_id, nodes, edges))
+        ))
+        if bodies:
+            db.session.execute(db.insert(PageSnapshot), [
+                {'page_id': page_id, 'story_id': story_id, 'version': story.version,
+                 'published_at': published_at, 'body': body}
+                for page_id, body in bodies.items()
+            ])
+        return story.version
+    
+    @staticmethod
+    def drop_snapshot(story_id):
+        """Delete a story's snapshot rows, so reads fall back to the live rows"""
+        db.session.execute(db.delete(PageSnapshot).where(PageSnapshot.story_id == story_id))
+        db.session.execute(db.delete(StorySnapshot).where(StorySnapshot.story_id == story_id))
+    
+    @staticmethod
+    def sync_status(story_id, status):
+        """Compile the snapshot when a story is (re)published, drop it when it leaves published"""
+        if status == StoryStatus.PUBLISHED.value:
+            SnapshotService.compile_snapshot(story_id)
+        else:
+            SnapshotService.drop_snapshot(story_id)
+    
+    @staticmethod
+    def get_start(story_id):
+        """
+        Story validators joined with its published start page in one lookup.
+        
+        Returns:
+            Row (version, updated_at, start_page_id, snapshot_version,
+            published_at, body) or None if the story does not exist;
+            snapshot_version is None when the story has no snapshot
+        """
+        return db.session.execute(read_queries.snapshot_start(story_id)).first()
+    
+    @staticmethod
+    def get_tree(story_id):
+        """Story validators joined with its published tree (see get_start)"""
+        return db.session.execute(read_queries.snapshot_tree(story_id)).first()
+    
+    @staticmethod
+    def get_page(page_id):
+        """Published page row (snapshot_version, published_at, body) or None"""
+        return db.session.execute(read_queries.snapshot_page(page_id)).first()
+    
+    @staticmethod
+    def resolve_choice(page_id, choice_id):
+        """
+        Follow a choice of a published page, reading the story store when it
+        has the page and the database snapshot otherwise.
+        
+        The store walks its choice table; the database snapshot is decoded.
+        
+        Returns:
+            (choice JSON, next page JSON), or None when the page has no
+            published copy
+        
+        Raises:
+            LookupError: If the choice is not on the page or its target is not published
+            ValueError: If the choice leads nowhere
+        """
+        store = get_story_store()
+        resolved = store.resolve(page_id, choice_id) if store else None
+        if resolved is not None:
+            return resolved
+        
+        current = SnapshotService.get_page(page_id)
+        if current is None:
+            return None
+        choice = next((c for c in loads(current.body)['choices'] if c['id'] == choice_id), None)
+        if choice is None:
+            raise LookupError('Choice not found on this page')
+        if choice['next_page_id'] is None:
+            raise ValueError('Choice has no next page')
+        target = SnapshotService.get_page(choice['next_page_id'])
+        if target is None:
+            raise LookupError('Page not found')
+        return dumps(choice), target.body
+    
+    @staticmethod
+    def page_body(body, fields=None, include_choices=True):
+        """
+        A published page body, cut down to a sparse fieldset when one is given.
+        
+        Returns:
+            JSON bytes
+        """
+        if fields is None:
+            return body
+        page = loads(body)
+        data = {field: page[field] for field in fields}
+        if include_choices:
+            data['choices'] = page['choices']
+        return dumps(data)
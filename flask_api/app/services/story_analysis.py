@@ -0,0 +1,203 @@
+"""
+Story Analysis - exact ending probabilities of a story treated as an
+absorbing Markov chain.
+
+A player on a page picks one of its choices uniformly at random. A dice
+choice succeeds with probability (7 - min_roll) / 6 on a d6; a failed roll
+leaves the player on the same page to choose again. Endings and pages with
+no choices absorb. Probabilities and the expected number of choices made
+come from one linear solve on (I - Q), not from simulation.
+"""
+from collections import deque
+import numpy as np
+from app.extensions import db
+from app.models import Story, Page, Choice
+
+try:
+    from scipy import sparse
+    from scipy.sparse.linalg import spsolve
+except ImportError:  # pragma: no cover - scipy is optional
+    sparse = None
+
+# Largest transient state count solved with a dense matrix (~128 MB of float64)
+MAX_DENSE_STATES = 4000
+
+DICE_SIDES = 6
+
+
+def roll_success_probability(dice_required, min_roll):
+    """Probability that a choice's roll succeeds (1.0 when no dice are needed)"""
+    min_roll = np.asarray(min_roll, dtype=float)
+    p = (DICE_SIDES + 1 - min_roll) / DICE_SIDES
+    return np.where(np.asarray(dice_required, dtype=bool), np.clip(p, 0.0, 1.0), 1.0)
+
+
+def _reachable(start_nodes, adjacency):
+    seen = set(start_nodes)
+    queue = deque(start_nodes)
+    while queue:
+        for target in adjacency.get(queue.popleft(), ()):
+            if target not in seen:
+                seen.add(target)
+                queue.append(target)
+    return seen
+
+
+def analyze_graph(start_page_id, pages, choices, use_sparse=None):
+    """
+    Compute ending probabilities for a story graph.
+    
+    Args:
+        start_page_id: ID of the page play starts on
+        pages: Iterable of (page_id, is_ending, ending_label)
+        choices: Iterable of (page_id, next_page_id, dice_required, min_roll);
+            only choices whose target is a page of the same story
+        use_sparse: Force the sparse (True) or dense (False) solver; by default
+            sparse is used when scipy is installed
+    
+    Returns:
+        Dictionary with per-ending probabilities, dead-end and trapped
+        probabilities and the expected number of choices made
+    
+    Raises:
+        ValueError: If the start page is unknown or the story is too large
+            for the dense solver
+        ImportError: If use_sparse is True and scipy is not installed
+    """
+    if use_sparse and sparse is None:
+        raise ImportError('The sparse solver needs scipy; install it or pass use_sparse=None')
+    pages = list(pages)
+    page_ids = [p[0] for p in pages]
+    index = {page_id: i for i, page_id in enumerate(page_ids)}
+    if start_page_id not in index:
+        raise ValueError('Story has no valid start page')
+    
+    n = len(pages)
+    is_ending = np.array([bool(p[1]) for p in pages], dtype=bool)
+    
+    choices = list(choices)
+    src = np.array([index[c[0]] for c in choices], dtype=np.int64)
+    dst = np.array([index[c[1]] for c in choices], dtype=np.int64)
+    success = roll_success_probability([c[2] for c in choices], [c[3] or 1 for c in choices])
+    
+    out_degree = np.bincount(src, minlength=n)
+    absorbing = is_ending | (out_degree == 0)
+    
+    # Each choice contributes a move (roll succeeded) and a stay (roll failed)
+    weight = 1.0 / np.maximum(out_degree[src], 1)
+    rows = np.concatenate([src, src])
+    cols = np.concatenate([dst, src])
+    probs = np.concatenate([weight * success, weight * (1.0 - success)])
+    live = (probs > 0) & ~absorbing[rows]
+    rows, cols, probs = rows[live], cols[live], probs[live]
+    
+    adjacency = {}
+    reverse = {}
+    for r, c in zip(rows.tolist(), cols.tolist()):
+        if r != c:
+            adjacency.setdefault(r, set()).add(c)
+            reverse.setdefault(c, set()).add(r)
+    
+    start = index[start_page_id]
+    reachable = _reachable([start], adjacency)
+    can_finish = _reachable([i for i in reachable if absorbing[i]], reverse)
+    transient = sorted(i for i in reachable if not absorbing[i] and i in can_finish)
+    trapped = np.zeros(n, dtype=bool)
+    trapped[[i for i in reachable if not absorbing[i] and i not in can_finish]] = True
+    
+    absorbed = np.zeros(n)
+    trapped_probability = 0.0
+    expected_steps = 0.0
+    solver = None
+    
+    if absorbing[start]:
+        absorbed[start] = 1.0
+    elif trapped[start]:
+        trapped_probability = 1.0
+        expected_steps = None
+    else:
+        m = len(transient)
+        position = np.full(n, -1, dtype=np.int64)
+        position[transient] = np.arange(m)
+        
+        inner = position[rows] >= 0
+        q_rows = position[rows[inner]]
+        q_cols = position[cols[inner]]
+        internal = q_cols >= 0
+        
+        rhs = np.zeros(m)
+        rhs[position[start]] = 1.0
+        solver = 'sparse' if (sparse is not None if use_sparse is None else use_sparse) else 'dense'
+        if solver == 'sparse':
+            q = sparse.csr_matrix((probs[inner][internal], (q_rows[internal], q_cols[internal])), shape=(m, m))
+            visits = spsolve((sparse.identity(m, format='csr') - q).T.tocsc(), rhs)
+        else:
+            if m > MAX_DENSE_STATES:
+                raise ValueError(f'Story has {m} playable pages; the dense solver handles at most '
+                                 f'{MAX_DENSE_STATES} (install scipy for larger stories)')
+            a = np.eye(m)
+            np.add.at(a, (q_rows[internal], q_cols[internal]), -probs[inner][internal])
+            visits = np.linalg.solve(a.T, rhs)
+        
+        # Expected visits to each playable page times its exit probabilities
+        exits = ~internal
+        targets = cols[inner][exits]
+        flow = visits[q_rows[exits]] * probs[inner][exits]
+        landed = np.bincount(targets, weights=flow, minlength=n)
+        absorbed = np.where(absorbing, landed, 0.0)
+        trapped_probability = float(landed[trapped].sum())
+        expected_steps = float(visits.sum()) if trapped_probability < 1e-12 else None
+    
+    endings = [
+        {'page_id': page_ids[i], 'ending_label': pages[i][2], 'probability': round(float(absorbed[i]), 10)}
+        for i in np.flatnonzero(is_ending)
+    ]
+    endings.sort(key=lambda e: (-e['probability'], e['page_id']))
+    dead_ends = [
+        {'page_id': page_ids[i], 'probability': round(float(absorbed[i]), 10)}
+        for i in np.flatnonzero(absorbing & ~is_ending) if absorbed[i] > 0
+    ]
+    
+    return {
+        'start_page_id': start_page_id,
+        'endings': endings,
+        'dead_ends': dead_ends,
+        'trapped_probability': round(trapped_probability, 10),
+        'expected_steps': round(expected_steps, 6) if expected_steps is not None else None,
+        'solver': solver
+    }
+
+
+def analyze_story(story_id):
+    """
+    Load a story's graph (three queries) and analyze it.
+    
+    Returns:
+        Analysis dictionary (see analyze_graph), or None if the story does not exist
+    
+    Raises:
+        ValueError: If the story cannot be analyzed
+    """
+    story = db.session.query(Story.start_page_id).filter(Story.id == story_id).first()
+    if story is None:
+        return None
+    
+    pages = (db.session.query(Page.id, Page.is_ending, Page.ending_label)
+             .filter(Page.story_id == story_id)
+             .order_by(Page.id)
+             .all())
+    if not pages:
+        raise ValueError('Story has no pages')
+    
+    source = db.aliased(Page)
+    target = db.aliased(Page)
+    choices = (db.session.query(Choice.page_id, Choice.next_page_id, Choice.dice_required, Choice.min_roll)
+               .join(source, Choice.page_id == source.id)
+               .join(target, Choice.next_page_id == target.id)
+               .filter(source.story_id == story_id, target.story_id == story_id)
+               .all())
+    
+    start_page_id = story.start_page_id or pages[0].id
+    result = analyze_graph(start_page_id, pages, choices)
+    result['story_id'] = story_id
+    return result
@@ -2,28 +2,161 @@
 Story Service - Business logic layer for story operations.
 Separates business logic from routes for cleaner code and easier testing.
 """
+import base64
+import re
+from datetime import datetime
 from app.extensions import db
-from app.models import Story, Page, Choice, StoryStatus
+from app.models import Story, Page, Choice, StoryStatus, StorySnapshot, PageSnapshot
+from app.models.versioning import bump_story_versions
+from app.models.search_index import SEARCH_TABLE
+from app.schemas.serializers import (
+    STORY_FIELDS, PAGE_FIELDS, CHOICE_FIELDS, columns,
+    serialize_story, serialize_pages, serialize_choice, serialize_tree
+)
+from app.story_store import sync_story_store
+from .story_validator import validate_story_graph
+from .snapshot_service import SnapshotService
+from . import read_queries
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(story):
+    """Encode a story's (created_at, id) sort key as an opaque cursor"""
+    raw = f'{story.created_at.isoformat()}|{story.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, story_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(story_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def story_rows(fields=None):
+    """Query selecting the serialized (or only the given) story columns as plain rows"""
+    return db.session.query(*columns(Story, fields or STORY_FIELDS))
+
+
+def page_rows(fields=None):
+    """Query selecting the serialized (or only the given) page columns as plain rows"""
+    return db.session.query(*columns(Page, fields or PAGE_FIELDS))
+
+
+def choice_rows(fields=None):
+    """Query selecting the serialized (or only the given) choice columns as plain rows"""
+    return db.session.query(*columns(Choice, fields or CHOICE_FIELDS))
 
 
 class StoryService:
     """Service class for story-related operations"""
     
     @staticmethod
-    def get_all_stories(status=None):
+    def get_all_stories(status=None, fields=None, author_id=None):
         """
-        Get all stories, optionally filtered by status.
+        Get all stories, optionally filtered by status and author.
         
         Args:
             status: Optional status filter ('draft', 'published', 'suspended')
+            fields: Optional story fields to select (default: all serialized fields)
+            author_id: Optional author filter
             
         Returns:
-            List of Story objects
+            List of story rows (see serialize_story)
         """
-        query = Story.query
-        if status:
-            query = query.filter_by(status=status)
-        return query.order_by(Story.created_at.desc()).all()
+        return db.session.execute(read_queries.story_list(status, fields, author_id)).all()
+    
+    @staticmethod
+    def get_stories_page(status=None, limit=DEFAULT_PAGE_SIZE, cursor=None, fields=None, author_id=None):
+        """
+        Get one page of stories using keyset pagination on (created_at, id).
+        
+        Args:
+            status: Optional status filter ('draft', 'published', 'suspended')
+            limit: Maximum number of stories to return (capped at MAX_PAGE_SIZE)
+            cursor: Cursor from a previous page, or None for the first page
+            fields: Optional story fields to select; the cursor columns are
+                always selected
+            author_id: Optional author filter
+            
+        Returns:
+            Tuple of (list of story rows, next cursor or None)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        after = decode_cursor(cursor) if cursor else None
+        stories = db.session.execute(read_queries.story_keyset_page(status, limit, after, fields, author_id)).all()
+        
+        next_cursor = None
+        if len(stories) > limit:
+            stories = stories[:limit]
+            next_cursor = encode_cursor(stories[-1])
+        return stories, next_cursor
+    
+    @staticmethod
+    def search_stories(text, status=StoryStatus.PUBLISHED.value, limit=DEFAULT_PAGE_SIZE, offset=0):
+        """
+        Full-text search over story titles, descriptions and page text.
+        
+        Each word must match (prefix match on the last letters typed);
+        stories are ranked by their best BM25 score, with title matches
+        weighted above description and page text.
+        
+        Args:
+            text: Free-text query
+            status: Optional status filter
+            limit: Maximum number of stories to return (capped at MAX_PAGE_SIZE)
+            offset: Number of ranked results to skip
+            
+        Returns:
+            Tuple of (list of story rows in rank order, next offset or None)
+            
+        Raises:
+            ValueError: If the query contains no searchable words
+        """
+        words = re.findall(r'\w+', text or '')
+        if not words:
+            raise ValueError('Search query is required')
+        match = ' '.join(f'"{word}"*' for word in words)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        offset = max(0, offset)
+        
+        status_filter = 'AND stories.status = :status' if status else ''
+        # bm25() cannot be aggregated directly, so score the hits in a
+        # materialized CTE and take each story's best score from it
+        rows = db.session.execute(db.text(f"""
+            WITH hits AS MATERIALIZED (
+                SELECT story_id, bm25({SEARCH_TABLE}, 0.0, 10.0, 4.0, 1.0) AS score
+                FROM {SEARCH_TABLE}
+                WHERE {SEARCH_TABLE} MATCH :match
+            )
+            SELECT matches.story_id
+            FROM (
+                SELECT story_id, MIN(score) AS rank FROM hits GROUP BY story_id
+            ) AS matches
+            JOIN stories ON stories.id = matches.story_id
+            WHERE 1 = 1 {status_filter}
+            ORDER BY matches.rank, matches.story_id
+            LIMIT :limit OFFSET :offset
+        """), {'match': match, 'status': status, 'limit': limit + 1, 'offset': offset}).all()
+        
+        story_ids = [row.story_id for row in rows[:limit]]
+        stories = {story.id: story for story in story_rows().filter(Story.id.in_(story_ids))}
+        next_offset = offset + limit if len(rows) > limit else None
+        return [stories[story_id] for story_id in story_ids], next_offset
     
     @staticmethod
     def get_story_by_id(story_id):
@@ -38,6 +171,34 @@ class StoryService:
         """
         return Story.query.get(story_id)
     
+    @staticmethod
+    def get_story_data(story_id, fields=None):
+        """
+        Get a serialized story in one query.
+        
+        Args:
+            story_id: The story's ID
+            fields: Optional story fields to select and return
+        
+        Returns:
+            Story dictionary or None
+        """
+        row = db.session.execute(read_queries.story(story_id, fields)).first()
+        return serialize_story(row, fields) if row else None
+    
+    @staticmethod
+    def get_story_version(story_id):
+        """
+        Get the validators of a story without loading it.
+        
+        Args:
+            story_id: The story's ID
+            
+        Returns:
+            Row with version, updated_at and start_page_id, or None
+        """
+        return db.session.execute(read_queries.story_version(story_id)).first()
+    
     @staticmethod
     def create_story(title, description='', author_id=0, illustration_url=None):
         """
@@ -63,6 +224,100 @@ class StoryService:
         db.session.commit()
         return story
     
+    @staticmethod
+    def import_story(data):
+        """
+        Create a story with all its pages and choices in one transaction.
+        
+        Pages are identified by a client-side `key` (their list index when
+        omitted); choices reference pages through `from_page`/`to_page`
+        keys. The start page is `start_page`, else the page flagged
+        `is_start`, else the first page.
+        
+        Args:
+            data: Dictionary with story fields plus 'pages' and 'choices' lists
+            
+        Returns:
+            Created Story object
+            
+        Raises:
+            ValueError: If the payload is invalid (nothing is written)
+        """
+        if not data.get('title'):
+            raise ValueError('Title is required')
+        
+        pages_data = data.get('pages') or []
+        choices_data = data.get('choices') or []
+        
+        keys = []
+        known_keys = set()
+        start_key = data.get('start_page')
+        for index, page_data in enumerate(pages_data):
+            if not page_data.get('text'):
+                raise ValueError(f'Page {index} text is required')
+            key = page_data.get('key', index)
+            if key in known_keys:
+                raise ValueError(f'Duplicate page key: {key}')
+            keys.append(key)
+            known_keys.add(key)
+            if start_key is None and page_data.get('is_start'):
+                start_key = key
+        if start_key is None and keys:
+            start_key = keys[0]
+        if start_key is not None and start_key not in known_keys:
+            raise ValueError(f'Unknown start page key: {start_key}')
+        
+        for index, choice_data in enumerate(choices_data):
+            if not choice_data.get('text'):
+                raise ValueError(f'Choice {index} text is required')
+            if choice_data.get('from_page') not in known_keys:
+                raise ValueError(f"Choice {index} has unknown from_page: {choice_data.get('from_page')}")
+            to_page = choice_data.get('to_page')
+            if to_page is not None and to_page not in known_keys:
+                raise ValueError(f'Choice {index} has unknown to_page: {to_page}')
+        
+        try:
+            story = Story(
+                title=data['title'],
+                description=data.get('description', ''),
+                author_id=data.get('author_id', 0),
+                status=StoryStatus.DRAFT.value,
+                illustration_url=data.get('illustration_url')
+            )
+            db.session.add(story)
+            db.session.flush()
+            
+            page_ids = {}
+            if pages_data:
+                ids = db.session.scalars(
+                    db.insert(Page).returning(Page.id, sort_by_parameter_order=True),
+                    [{
+                        'story_id': story.id,
+                        'text': page_data['text'],
+                        'is_ending': page_data.get('is_ending', False),
+                        'ending_label': page_data.get('ending_label'),
+                        'illustration_url': page_data.get('illustration_url')
+                    } for page_data in pages_data]
+                ).all()
+                page_ids = dict(zip(keys, ids))
+            
+            if choices_data:
+                db.session.execute(db.insert(Choice), [{
+                    'page_id': page_ids[choice_data['from_page']],
+                    'text': choice_data['text'],
+                    'next_page_id': page_ids.get(choice_data.get('to_page')),
+                    'dice_required': choice_data.get('dice_required', False),
+                    'min_roll': choice_data.get('min_roll', 1) if choice_data.get('dice_required') else 1
+                } for choice_data in choices_data])
+            
+            story.start_page_id = page_ids.get(start_key)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        return story
+    
     @staticmethod
     def update_story(story_id, data):
         """
@@ -89,14 +344,18 @@ class StoryService:
             story.start_page_id = data['start_page_id']
         if 'illustration_url' in data:
             story.illustration_url = data['illustration_url']
+        if 'status' in data:
+            SnapshotService.sync_status(story_id, story.status)
         
         db.session.commit()
+        if 'status' in data:
+            sync_story_store(story_id)
         return story
     
     @staticmethod
     def delete_story(story_id):
         """
-        Delete a story and all its pages/choices (cascade).
+        Delete a story and all its pages/choices.
         
         Args:
             story_id: The story's ID
@@ -104,13 +363,42 @@ class StoryService:
         Returns:
             True if deleted, False if not found
         """
-        story = Story.query.get(story_id)
-        if not story:
-            return False
+        return bool(StoryService.delete_stories([story_id])[0])
+    
+    @staticmethod
+    def delete_stories(story_ids):
+        """
+        Delete stories with their pages, choices and snapshots in one
+        transaction of set-based DELETEs, whatever the number of pages.
+        
+        Choices of other stories that led into the deleted pages are
+        unlinked (next_page_id = NULL) and their stories' versions bumped.
         
-        db.session.delete(story)
+        Args:
+            story_ids: IDs of the stories to delete
+            
+        Returns:
+            (IDs of the deleted stories, IDs of other stories that changed)
+        """
+        story_ids = list(db.session.execute(
+            db.select(Story.id).where(Story.id.in_(set(story_ids)))
+        ).scalars())
+        if not story_ids:
+            return [], []
+        
+        pages = db.select(Page.id).where(Page.story_id.in_(story_ids))
+        changed = sorted(PageService._unlink_pages(pages) - set(story_ids))
+        bump_story_versions(db.session.connection(), changed)
+        
+        db.session.execute(db.delete(Choice).where(Choice.page_id.in_(pages)))
+        db.session.execute(db.delete(PageSnapshot).where(PageSnapshot.story_id.in_(story_ids)))
+        db.session.execute(db.delete(StorySnapshot).where(StorySnapshot.story_id.in_(story_ids)))
+        db.session.execute(db.delete(Page).where(Page.story_id.in_(story_ids)))
+        db.session.execute(db.delete(Story).where(Story.id.in_(story_ids)))
         db.session.commit()
-        return True
+        
+        sync_story_store(*story_ids)
+        return story_ids, changed
     
     @staticmethod
     def publish_story(story_id):
@@ -149,71 +437,103 @@ class StoryService:
         Returns:
             Dictionary with nodes and edges for graph visualization
         """
-        story = Story.query.get(story_id)
+        story = db.session.execute(read_queries.tree_start(story_id)).first()
         if not story:
             return None
         
-        pages = Page.query.filter_by(story_id=story_id).all()
-        
-        nodes = []
-        edges = []
-        
-        for page in pages:
-            nodes.append({
-                'id': page.id,
-                'label': f'Page {page.id}',
-                'is_start': page.id == story.start_page_id,
-                'is_ending': page.is_ending,
-                'ending_label': page.ending_label
-            })
-            
-            for choice in page.choices:
-                if choice.next_page_id:
-                    edges.append({
-                        'source': page.id,
-                        'target': choice.next_page_id,
-                        'label': choice.text[:30] + '...' if len(choice.text) > 30 else choice.text
-                    })
+        nodes = db.session.execute(read_queries.tree_nodes(story_id)).all()
+        edges = db.session.execute(read_queries.tree_edges(story_id)).all()
         
-        return {'nodes': nodes, 'edges': edges}
+        return serialize_tree(story.start_page_id, nodes, edges)
     
     @staticmethod
-    def validate_story_for_publish(story_id):
+    def get_story_bundle(story_id):
         """
-        Validate that a story is ready for publication.
+        Get a story with every page and choice in one payload.
+        
+        Loads the story, its pages and their choices as plain rows with
+        three queries regardless of the number of pages.
         
         Args:
             story_id: The story's ID
             
         Returns:
-            Tuple of (is_valid, list of errors)
+            Dictionary with the story and its pages (choices nested), or None
         """
-        story = Story.query.get(story_id)
+        story = StoryService.get_story_data(story_id)
         if not story:
-            return False, ['Story not found']
+            return None
         
-        errors = []
+        pages = db.session.execute(read_queries.story_pages(story_id)).all()
+        choices = db.session.execute(read_queries.story_choices(story_id)).all()
         
-        # Check for pages
-        pages = Page.query.filter_by(story_id=story_id).all()
-        if len(pages) < 2:
-            errors.append('Story must have at least 2 pages')
+        return {'story': story, 'pages': serialize_pages(pages, choices)}
+    
+    @staticmethod
+    def iter_export(status=None, batch_size=100):
+        """
+        Yield every story with its pages and choices, one dict per story.
+        
+        Stories are read with a server-side cursor (yield_per) and their
+        pages and choices are loaded per batch of stories as plain rows, so
+        memory is bounded by one batch, not by the size of the catalogue.
         
-        # Check for start page
-        if not story.start_page_id:
-            errors.append('Story must have a start page set')
+        Args:
+            status: Optional status filter
+            batch_size: Number of stories loaded per round of queries
+            
+        Yields:
+            Story dictionaries with nested 'pages', each with 'choices'
+        """
+        story_query = db.select(*columns(Story, STORY_FIELDS)).order_by(Story.id)
+        if status:
+            story_query = story_query.where(Story.status == status)
         
-        # Check for at least one ending
-        endings = [p for p in pages if p.is_ending]
-        if not endings:
-            errors.append('Story must have at least one ending page')
+        stories = db.session.execute(story_query.execution_options(yield_per=batch_size))
+        for batch in stories.partitions():
+            story_ids = [row.id for row in batch]
+            
+            pages = db.session.execute(
+                db.select(*columns(Page, PAGE_FIELDS))
+                .where(Page.story_id.in_(story_ids))
+                .order_by(Page.story_id, Page.id)
+                .execution_options(yield_per=1000)
+            ).all()
+            choices = db.session.execute(
+                db.select(*columns(Choice, CHOICE_FIELDS))
+                .join(Page, Choice.page_id == Page.id)
+                .where(Page.story_id.in_(story_ids))
+                .order_by(Choice.id)
+                .execution_options(yield_per=1000)
+            ).all()
+            
+            pages_by_story = {story_id: [] for story_id in story_ids}
+            for page in serialize_pages(pages, choices):
+                pages_by_story[page['story_id']].append(page)
+            
+            for row in batch:
+                data = serialize_story(row)
+                data['pages'] = pages_by_story.pop(row.id)
+                yield data
+    
+    @staticmethod
+    def validate_story_for_publish(story_id):
+        """
+        Validate that a story is ready for publication.
         
-        # Check that all non-ending pages have choices
-        for page in pages:
-            if not page.is_ending and len(page.choices) == 0:
-                errors.append(f'Page {page.id} has no choices and is not an ending')
+        Runs the graph checks in story_validator (reachability, dangling
+        targets, loops without exit, ...) in O(pages + choices).
         
-        return len(errors) == 0, errors
+        Args:
+            story_id: The story's ID
+            
+        Returns:
+            Tuple of (is_valid, list of errors)
+        """
+        report = validate_story_graph(story_id)
+        if report is None:
+            return False, ['Story not found']
+        return report['valid'], report['errors']
 
 
 class PageService:
@@ -224,6 +544,84 @@ class PageService:
         """Get a single page by ID"""
         return Page.query.get(page_id)
     
+    @staticmethod
+    def get_page_data(page_id, fields=None, include_choices=True):
+        """
+        Get a serialized page with its choices in two queries.
+        
+        Args:
+            page_id: The page's ID
+            fields: Optional page fields to select and return
+            include_choices: Whether to load and nest the page's choices
+        
+        Returns:
+            Page dictionary or None
+        """
+        page = db.session.execute(read_queries.page(page_id, fields)).first()
+        if not page:
+            return None
+        choices = None
+        if include_choices:
+            choices = db.session.execute(read_queries.page_choices(page_id)).all()
+        return serialize_pages([page], choices, fields)[0]
+    
+    @staticmethod
+    def resolve_choice(page_id, choice_id):
+        """
+        Follow a choice of a page to the page it leads to, from the live rows.
+        
+        Args:
+            page_id: The page the player is on
+            choice_id: The chosen option, which must belong to that page
+        
+        Returns:
+            (choice dict, next page dict with its choices)
+        
+        Raises:
+            LookupError: If the choice is not on the page or its target is gone
+            ValueError: If the choice leads nowhere
+        """
+        choice = db.session.execute(read_queries.page_choice(page_id, choice_id)).first()
+        if not choice:
+            raise LookupError('Choice not found on this page')
+        if choice.next_page_id is None:
+            raise ValueError('Choice has no next page')
+        page = PageService.get_page_data(choice.next_page_id)
+        if page is None:
+            raise LookupError('Page not found')
+        return serialize_choice(choice), page
+    
+    @staticmethod
+    def get_pages_by_ids(page_ids, fields=None, include_choices=True):
+        """
+        Get several serialized pages (with choices) in two queries.
+        
+        Args:
+            page_ids: List of page IDs
+            fields: Optional page fields to select and return
+            include_choices: Whether to load and nest the pages' choices
+            
+        Returns:
+            List of page dictionaries in the order requested; unknown IDs are skipped
+        """
+        pages = {page.id: page for page in page_rows(fields).filter(Page.id.in_(page_ids))}
+        found = [pages[page_id] for page_id in page_ids if page_id in pages]
+        choices = None
+        if include_choices:
+            choices = choice_rows().filter(Choice.page_id.in_(pages)).order_by(Choice.id).all()
+        return serialize_pages(found, choices, fields)
+    
+    @staticmethod
+    def get_page_version(page_id):
+        """
+        Get the validators of a page (its story's version) without loading it.
+        
+        Returns:
+            Row with story_id, version and updated_at (plus the page's
+            snapshot_version, published_at and body), or None
+        """
+        return db.session.execute(read_queries.page_version(page_id)).first()
+    
     @staticmethod
     def create_page(story_id, text, is_ending=False, ending_label=None, illustration_url=None):
         """
@@ -251,7 +649,7 @@ class PageService:
         
         # If this is the first page, set it as start page
         story = Story.query.get(story_id)
-        if story and story.pages.count() == 1:
+        if story and story.page_count == 1:
             story.start_page_id = page.id
             db.session.commit()
         
@@ -279,13 +677,78 @@ class PageService:
     @staticmethod
     def delete_page(page_id):
         """Delete a page"""
-        page = Page.query.get(page_id)
-        if not page:
-            return False
+        return bool(PageService.delete_pages([page_id]))
+    
+    @staticmethod
+    def delete_pages(page_ids):
+        """
+        Delete pages and their choices in one transaction of set-based
+        DELETEs.
+        
+        Choices leading to a deleted page are unlinked and stories starting
+        at one lose their start page. Published snapshots are left alone,
+        so readers keep the published copy until the story is republished;
+        page IDs are never reused and snapshots are keyed by story, so the
+        copy cannot answer for a later page.
         
-        db.session.delete(page)
+        Args:
+            page_ids: IDs of the pages to delete
+            
+        Returns:
+            IDs of the stories that changed (empty if no page existed)
+        """
+        page_ids = set(page_ids)
+        owners = list(db.session.execute(
+            db.select(Page.story_id).where(Page.id.in_(page_ids)).distinct()
+        ).scalars())
+        if not owners:
+            return []
+        
+        changed = sorted(PageService._unlink_pages(page_ids) | set(owners))
+        bump_story_versions(db.session.connection(), changed)
+        db.session.execute(db.delete(Choice).where(Choice.page_id.in_(page_ids)))
+        db.session.execute(db.delete(Page).where(Page.id.in_(page_ids)))
         db.session.commit()
-        return True
+        return changed
+    
+    @staticmethod
+    def _unlink_pages(pages):
+        """
+        Clear the choices.next_page_id and stories.start_page_id references
+        to pages that are about to be deleted.
+        
+        Core statements bypass the versioning flush hook, so callers bump
+        the returned stories' versions themselves.
+        
+        Args:
+            pages: Page IDs, or a select of them
+        
+        Returns:
+            Set of IDs of the stories whose choices or start page changed
+        """
+        linking = db.select(Choice.page_id).where(Choice.next_page_id.in_(pages), Choice.page_id.not_in(pages))
+        changed = set(db.session.execute(
+            db.select(Page.story_id).where(Page.id.in_(linking)).distinct()
+        ).scalars())
+        changed.update(db.session.execute(
+            db.select(Story.id).where(Story.start_page_id.in_(pages))
+        ).scalars())
+        
+        db.session.execute(
+            db.update(Choice).where(Choice.next_page_id.in_(pages), Choice.page_id.not_in(pages))
+            .values(next_page_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.execute(
+            db.update(Story).where(Story.start_page_id.in_(pages)).values(start_page_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        return changed
+    
+    @staticmethod
+    def get_first_page_id(story_id):
+        """ID of a story's first page, or None when it has no pages"""
+        return db.session.execute(read_queries.first_page_id(story_id)).scalar()
     
     @staticmethod
     def get_start_page(story_id):
@@ -309,6 +772,32 @@ class ChoiceService:
         """Get a single choice by ID"""
         return Choice.query.get(choice_id)
     
+    @staticmethod
+    def get_choice_data(choice_id, fields=None):
+        """
+        Get a serialized choice in one query.
+        
+        Returns:
+            Choice dictionary or None
+        """
+        row = choice_rows(fields).filter(Choice.id == choice_id).first()
+        return serialize_choice(row, fields) if row else None
+    
+    @staticmethod
+    def get_choices_by_ids(choice_ids, fields=None):
+        """
+        Get several choices in one query.
+        
+        Args:
+            choice_ids: List of choice IDs
+            fields: Optional choice fields to select and return
+            
+        Returns:
+            List of choice dictionaries in the order requested; unknown IDs are skipped
+        """
+        choices = {choice.id: choice for choice in choice_rows(fields).filter(Choice.id.in_(choice_ids))}
+        return [serialize_choice(choices[choice_id], fields) for choice_id in choice_ids if choice_id in choices]
+    
     @staticmethod
     def create_choice(page_id, text, next_page_id=None, dice_required=False, min_roll=1):
         """
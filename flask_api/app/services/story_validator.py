@@ -0,0 +1,235 @@
+"""
+Story Validator - graph checks a story must pass before it is published.
+
+The story's adjacency is loaded with two queries (pages, then choices with
+the owner of their target page) and every check is a linear pass over that
+graph, so validation stays O(V+E) on stories with thousands of pages.
+"""
+from collections import deque
+from app.extensions import db
+from app.models import Story, Page, Choice
+
+
+class StoryGraph:
+    """
+    In-memory adjacency of one story.
+    
+    Usage:
+        graph = StoryGraph.load(story_id)
+        report = graph.validate()
+    """
+    
+    def __init__(self, story_id, start_page_id, pages, choices):
+        """
+        Args:
+            story_id: The story's ID
+            start_page_id: The story's start page ID (may be None)
+            pages: Iterable of (page_id, is_ending)
+            choices: Iterable of (choice_id, page_id, next_page_id, target_story_id)
+                where target_story_id is None when the target page does not exist
+        """
+        self.story_id = story_id
+        self.start_page_id = start_page_id
+        self.endings = set()
+        self.edges = {}
+        for page_id, is_ending in pages:
+            self.edges[page_id] = []
+            if is_ending:
+                self.endings.add(page_id)
+        
+        self.choice_count = {page_id: 0 for page_id in self.edges}
+        self.missing_targets = []
+        self.dangling_choices = []
+        self.cross_story_choices = []
+        for choice_id, page_id, next_page_id, target_story_id in choices:
+            self.choice_count[page_id] += 1
+            if next_page_id is None:
+                self.missing_targets.append(choice_id)
+            elif target_story_id is None:
+                self.dangling_choices.append(choice_id)
+            elif target_story_id != story_id:
+                self.cross_story_choices.append(choice_id)
+            else:
+                self.edges[page_id].append(next_page_id)
+    
+    @classmethod
+    def load(cls, story_id):
+        """
+        Load a story's graph with two queries after the story row.
+        
+        Returns:
+            StoryGraph, or None if the story does not exist
+        """
+        start = db.session.query(Story.start_page_id).filter(Story.id == story_id).first()
+        if start is None:
+            return None
+        
+        pages = (db.session.query(Page.id, Page.is_ending)
+                 .filter(Page.story_id == story_id)
+                 .all())
+        
+        source = db.aliased(Page)
+        target = db.aliased(Page)
+        choices = (db.session.query(Choice.id, Choice.page_id, Choice.next_page_id, target.story_id)
+                   .join(source, Choice.page_id == source.id)
+                   .outerjoin(target, Choice.next_page_id == target.id)
+                   .filter(source.story_id == story_id)
+                   .order_by(Choice.id)
+                   .all())
+        
+        return cls(story_id, start.start_page_id, pages, choices)
+    
+    def reachable_from_start(self):
+        """Pages reachable from the start page (BFS)"""
+        if self.start_page_id not in self.edges:
+            return set()
+        seen = {self.start_page_id}
+        queue = deque([self.start_page_id])
+        while queue:
+            for target in self.edges[queue.popleft()]:
+                if target not in seen:
+                    seen.add(target)
+                    queue.append(target)
+        return seen
+    
+    def can_reach_ending(self):
+        """Pages from which some path leads to an ending (reverse BFS from endings)"""
+        reverse = {page_id: [] for page_id in self.edges}
+        for source, targets in self.edges.items():
+            for target in targets:
+                reverse[target].append(source)
+        
+        seen = set(self.endings)
+        queue = deque(self.endings)
+        while queue:
+            for source in reverse[queue.popleft()]:
+                if source not in seen:
+                    seen.add(source)
+                    queue.append(source)
+        return seen
+    
+    def cycles(self, pages):
+        """
+        Strongly connected components that contain a cycle, restricted to
+        the given pages (iterative Tarjan, safe for deep graphs).
+        
+        Returns:
+            List of sorted page ID lists
+        """
+        index = {}
+        lowlink = {}
+        on_stack = set()
+        stack = []
+        components = []
+        
+        def enter(node):
+            """Number a node and return its work item: the node and an iterator over its targets"""
+            index[node] = lowlink[node] = len(index)
+            stack.append(node)
+            on_stack.add(node)
+            return node, iter([t for t in self.edges[node] if t in pages])
+        
+        for root in sorted(pages):
+            if root in index:
+                continue
+            # Each node's targets are filtered once; the iterator resumes where it left off
+            work = [enter(root)]
+            while work:
+                node, targets = work[-1]
+                for target in targets:
+                    if target not in index:
+                        work.append(enter(target))
+                        break
+                    if target in on_stack:
+                        lowlink[node] = min(lowlink[node], index[target])
+                else:
+                    work.pop()
+                    if lowlink[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        if len(component) > 1 or node in self.edges[node]:
+                            components.append(sorted(component))
+                    
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+        
+        return components
+    
+    def validate(self):
+        """
+        Run every publish check.
+        
+        Returns:
+            Dictionary with 'valid', 'errors', 'warnings' and the page/choice
+            IDs behind each finding
+        """
+        errors = []
+        warnings = []
+        
+        if len(self.edges) < 2:
+            errors.append('Story must have at least 2 pages')
+        if not self.start_page_id:
+            errors.append('Story must have a start page set')
+        elif self.start_page_id not in self.edges:
+            errors.append(f'Start page {self.start_page_id} does not belong to this story')
+        if not self.endings:
+            errors.append('Story must have at least one ending page')
+        
+        dead_ends = sorted(p for p, count in self.choice_count.items()
+                           if count == 0 and p not in self.endings)
+        for page_id in dead_ends:
+            errors.append(f'Page {page_id} has no choices and is not an ending')
+        for choice_id in self.missing_targets:
+            errors.append(f'Choice {choice_id} has no target page')
+        for choice_id in self.dangling_choices:
+            errors.append(f'Choice {choice_id} points to a page that does not exist')
+        for choice_id in self.cross_story_choices:
+            errors.append(f'Choice {choice_id} points to a page in another story')
+        
+        reachable = self.reachable_from_start()
+        unreachable = sorted(set(self.edges) - reachable)
+        if unreachable and reachable:
+            warnings.append(f'{len(unreachable)} page(s) cannot be reached from the start page')
+        
+        # Reachable pages from which no ending can be reached trap the player
+        trapped = reachable - self.can_reach_ending()
+        cycles_without_exit = self.cycles(trapped)
+        if cycles_without_exit:
+            errors.append(f'{len(cycles_without_exit)} loop(s) have no path to an ending')
+        trapped_pages = sorted(trapped - set(dead_ends))
+        if trapped_pages:
+            errors.append(f'{len(trapped_pages)} reachable page(s) cannot lead to an ending')
+        
+        return {
+            'valid': not errors,
+            'errors': errors,
+            'warnings': warnings,
+            'page_count': len(self.edges),
+            'reachable_pages': len(reachable),
+            'unreachable_pages': unreachable,
+            'dead_end_pages': dead_ends,
+            'trapped_pages': sorted(trapped),
+            'cycles_without_exit': cycles_without_exit,
+            'missing_target_choices': self.missing_targets,
+            'dangling_choices': self.dangling_choices,
+            'cross_story_choices': self.cross_story_choices
+        }
+
+
+def validate_story_graph(story_id):
+    """
+    Validate a story's graph for publishing.
+    
+    Returns:
+        Validation report (see StoryGraph.validate), or None if not found
+    """
+    graph = StoryGraph.load(story_id)
+    if graph is None:
+        return None
+    return graph.validate()
@@ -0,0 +1,165 @@
+"""
+Tree Layout - layered (Sugiyama-style) coordinates for a story tree, so the
+browser can draw large stories without running a force simulation.
+
+1. Layers: BFS depth from the start page; pages it cannot reach are laid
+   out from the lowest unvisited page ID in the same way.
+2. Edges spanning several layers (from pages reached by a later root) are
+   split with dummy nodes so every edge in the ordering graph joins
+   adjacent layers. Edges that point back up (loops) or stay within a
+   layer are drawn but not used for ordering.
+3. Crossing reduction: alternating down/up barycenter sweeps, keeping the
+   ordering with the fewest crossings.
+4. Coordinates: y from the layer, x from the position in the layer, each
+   layer centred on the widest one. Split edges get their dummy nodes'
+   coordinates as bend points.
+"""
+from collections import deque
+from itertools import count
+
+LAYOUT_LAYERED = 'layered'
+LAYER_SPACING = 100
+NODE_SPACING = 60
+SWEEPS = 8
+
+
+def assign_layers(node_ids, start_id, adjacency):
+    """BFS depth of every node, from the start page first, then from unvisited nodes"""
+    layers = {}
+    roots = ([start_id] if start_id in adjacency else []) + list(node_ids)
+    for root in roots:
+        if root in layers:
+            continue
+        layers[root] = 0
+        queue = deque([root])
+        while queue:
+            node = queue.popleft()
+            for target in adjacency[node]:
+                if target not in layers:
+                    layers[target] = layers[node] + 1
+                    queue.append(target)
+    return layers
+
+
+def count_crossings(upper, lower, edges):
+    """Crossings between two adjacent layers, counted as inversions with a Fenwick tree"""
+    upper_position = {node: i for i, node in enumerate(upper)}
+    lower_position = {node: i for i, node in enumerate(lower)}
+    targets = sorted((upper_position[u], lower_position[v]) for u, v in edges)
+    tree = [0] * (len(lower) + 1)
+    crossings = 0
+    for inserted, (_, target) in enumerate(targets):
+        # Edges already inserted whose target lies right of this one cross it
+        index, not_greater = target + 1, 0
+        while index > 0:
+            not_greater += tree[index]
+            index -= index & -index
+        crossings += inserted - not_greater
+        index = target + 1
+        while index <= len(lower):
+            tree[index] += 1
+            index += index & -index
+    return crossings
+
+
+def _total_crossings(order, edges_between):
+    return sum(count_crossings(order[i], order[i + 1], edges_between[i]) for i in range(len(order) - 1))
+
+
+def _sweep(order, neighbours, layer_indexes):
+    """Reorder each layer in layer_indexes by the barycenter of its neighbours in the previous one"""
+    for i in layer_indexes:
+        fixed = {node: position for position, node in enumerate(order[i - 1 if layer_indexes.step > 0 else i + 1])}
+
+        def barycenter(item):
+            position, node = item
+            linked = [fixed[n] for n in neighbours[node] if n in fixed]
+            return sum(linked) / len(linked) if linked else position
+
+        order[i] = [node for _, node in sorted(enumerate(order[i]), key=barycenter)]
+
+
+def layered_layout(tree):
+    """
+    Add x/y coordinates to a story tree (see StoryService.get_story_tree).
+
+    Args:
+        tree: {'nodes': [...], 'edges': [...]} as served by /stories/<id>/tree
+
+    Returns:
+        The same tree with x, y and layer on every node, bend `points` on
+        every edge and a `layout` summary
+    """
+    nodes, edges = tree['nodes'], tree['edges']
+    node_ids = [node['id'] for node in nodes]
+    adjacency = {node_id: [] for node_id in node_ids}
+    for edge in edges:
+        if edge['source'] in adjacency and edge['target'] in adjacency:
+            adjacency[edge['source']].append(edge['target'])
+
+    start_id = next((node['id'] for node in nodes if node['is_start']), node_ids[0] if node_ids else None)
+    layers = assign_layers(node_ids, start_id, adjacency)
+    layer_count = max(layers.values(), default=-1) + 1
+
+    # Initial order: BFS discovery order within each layer
+    order = [[] for _ in range(layer_count)]
+    for node_id in layers:
+        order[layers[node_id]].append(node_id)
+
+    # Split long downward edges with dummy nodes (negative IDs)
+    up = {node_id: [] for node_id in node_ids}
+    down = {node_id: [] for node_id in node_ids}
+    edges_between = [[] for _ in range(max(layer_count - 1, 0))]
+    chains = []
+    dummy_ids = count(-1, -1)
+    for edge in edges:
+        source, target = edge['source'], edge['target']
+        if source not in layers or target not in layers or layers[target] <= layers[source]:
+            chains.append([])
+            continue
+        chain = []
+        for layer in range(layers[source] + 1, layers[target]):
+            dummy = next(dummy_ids)
+            up[dummy], down[dummy] = [], []
+            order[layer].append(dummy)
+            chain.append(dummy)
+        path = [source, *chain, target]
+        for step, (u, v) in enumerate(zip(path, path[1:])):
+            down[u].append(v)
+            up[v].append(u)
+            edges_between[layers[source] + step].append((u, v))
+        chains.append(chain)
+
+    best, fewest = [list(layer) for layer in order], _total_crossings(order, edges_between)
+    for sweep in range(SWEEPS):
+        if fewest == 0:
+            break
+        if sweep % 2 == 0:
+            _sweep(order, up, range(1, layer_count))
+        else:
+            _sweep(order, down, range(layer_count - 2, -1, -1))
+        crossings = _total_crossings(order, edges_between)
+        if crossings < fewest:
+            best, fewest = [list(layer) for layer in order], crossings
+
+    widest = max((len(layer) for layer in best), default=0)
+    coordinates = {}
+    for layer_index, layer in enumerate(best):
+        offset = (widest - len(layer)) / 2
+        for position, node_id in enumerate(layer):
+            coordinates[node_id] = ((offset + position) * NODE_SPACING, layer_index * LAYER_SPACING)
+
+    for node in nodes:
+        node['x'], node['y'] = coordinates[node['id']]
+        node['layer'] = layers[node['id']]
+    for edge, chain in zip(edges, chains):
+        edge['points'] = [list(coordinates[dummy]) for dummy in chain]
+
+    tree['layout'] = {
+        'type': LAYOUT_LAYERED,
+        'layers': layer_count,
+        'width': max(widest - 1, 0) * NODE_SPACING,
+        'height': max(layer_count - 1, 0) * LAYER_SPACING,
+        'crossings': fewest
+    }
+    return tree
@@ -0,0 +1,59 @@
+"""
+SQLite tuning - PRAGMAs applied to every new DBAPI connection.
+
+SQLite keeps most settings per connection, so they are set from a
+SQLAlchemy 'connect' event rather than once at startup. The PRAGMAs come
+from the SQLITE_PRAGMAS config mapping (see ProductionConfig).
+"""
+import os
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from app.extensions import db
+
+
+def resolve_sqlite_url(url, instance_path):
+    """
+    A database URL with a relative SQLite file path made absolute against
+    instance_path, as Flask-SQLAlchemy does for the app's own engine, so
+    other engines open the same file. Other URLs are returned unchanged.
+    """
+    url = make_url(url)
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return url
+    is_uri = url.query.get('uri', False)
+    path = url.database[5:] if is_uri else url.database
+    if os.path.isabs(path):
+        return url
+    os.makedirs(instance_path, exist_ok=True)
+    path = os.path.join(instance_path, path)
+    return url.set(database=f'file:{path}' if is_uri else path)
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    """Run `PRAGMA name = value` for each configured setting"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    finally:
+        cursor.close()
+
+
+def tune_sqlite_engine(engine, pragmas):
+    """Apply the PRAGMAs to each new connection of a SQLite engine"""
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, pragmas)
+
+
+def init_sqlite_tuning(app):
+    """Apply app.config['SQLITE_PRAGMAS'] to each connection of a SQLite engine"""
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    if not pragmas:
+        return
+
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name != 'sqlite':
+            return
+        tune_sqlite_engine(engine, pragmas)
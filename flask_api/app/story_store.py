@@ -0,0 +1,416 @@
+"""
+Story store - published stories as compact binary files, mmap'd read-only
+by every worker process.
+
+Each published story is one file, story-<id>.bin, written from its snapshot
+(see app/models/snapshot.py) after the publish commits. A page index,
+pages.idx, maps page IDs to story IDs. Both are replaced atomically with
+os.replace(), and readers remap a file when its inode changes. A publish
+rewrites only its own story's index entries, holding an flock on
+pages.idx.lock so workers publishing at once keep each other's entries. The OS page
+cache holds a single copy of the data for all workers. Page bodies are
+returned as memoryview slices of the mapping, so a lookup neither copies
+the body nor touches the database. Following a choice walks the choice
+table and jumps to the target's page index, without decoding any JSON.
+
+Layout (little-endian; pages sorted by ID, choices grouped by page):
+
+    header   magic, format, story_id, version, start_page_id (0 = none),
+             published_at (µs since epoch), page_count, choice_count,
+             tree_offset, tree_length
+    pages    page_id, first_choice, choice_count, body_offset, body_length
+    choices  choice_id, next_page (index into pages, NO_PAGE = none,
+             UNPUBLISHED_PAGE = not in the story), min_roll, dice_required,
+             body_offset, body_length
+    bodies   tree JSON, then each page's JSON followed by its choices' JSON
+
+Files of another format are ignored (reads fall back to the database
+snapshots) until `flask story-store rebuild` rewrites them.
+"""
+import mmap
+import os
+import struct
+import tempfile
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+from app.extensions import db
+from app.models import StorySnapshot, PageSnapshot
+from app.schemas.encoding import dumps, loads
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - no flock on Windows; use one writer there
+    fcntl = None
+
+MAGIC = b'CYOA'
+FORMAT = 2
+NO_PAGE = 0xFFFFFFFF
+UNPUBLISHED_PAGE = 0xFFFFFFFE
+EPOCH = datetime(1970, 1, 1)
+
+HEADER = struct.Struct('<4sHxxIIIqIIII')
+PAGE = struct.Struct('<IIIII')
+CHOICE = struct.Struct('<IIH?xII')
+INDEX_HEADER = struct.Struct('<4sHxxI')
+INDEX_ENTRY = struct.Struct('<II')
+
+INDEX_FILE = 'pages.idx'
+INDEX_LOCK_FILE = 'pages.idx.lock'
+
+# Shaped like the snapshot rows so routes answer both the same way
+StoredBody = namedtuple('StoredBody', ['snapshot_version', 'published_at', 'body'])
+StoredChoice = namedtuple('StoredChoice', ['id', 'next_page_id', 'dice_required', 'min_roll'])
+
+story_store_cli = AppGroup('story-store', help='Manage the published story store.')
+
+
+def _bisect(buffer, offset, count, entry, key):
+    """Index of the entry whose first field equals key, or None"""
+    low, high = 0, count
+    while low < high:
+        middle = (low + high) // 2
+        value = struct.unpack_from('<I', buffer, offset + middle * entry.size)[0]
+        if value < key:
+            low = middle + 1
+        elif value > key:
+            high = middle
+        else:
+            return middle
+    return None
+
+
+class StoredStory:
+    """Read-only view of one story file"""
+
+    def __init__(self, mapping):
+        (magic, file_format, self.story_id, self.version, start_page_id, published_us,
+         self.page_count, self.choice_count, self.tree_offset, self.tree_length) = HEADER.unpack_from(mapping)
+        if magic != MAGIC or file_format != FORMAT:
+            raise ValueError('Not a story store file')
+        self.start_page_id = start_page_id or None
+        self.published_at = EPOCH + timedelta(microseconds=published_us)
+        self.view = memoryview(mapping)
+        self.pages_offset = HEADER.size
+        self.choices_offset = self.pages_offset + self.page_count * PAGE.size
+
+    def _page(self, index):
+        return PAGE.unpack_from(self.view, self.pages_offset + index * PAGE.size)
+
+    def page_index(self, page_id):
+        """Position of a page in the page table, or None"""
+        return _bisect(self.view, self.pages_offset, self.page_count, PAGE, page_id)
+
+    def page_body(self, page_id):
+        """A page's JSON as a memoryview into the mapping, or None"""
+        index = self.page_index(page_id)
+        if index is None:
+            return None
+        _, _, _, offset, length = self._page(index)
+        return self.view[offset:offset + length]
+
+    def tree_body(self):
+        return self.view[self.tree_offset:self.tree_offset + self.tree_length]
+
+    def choices(self, page_id):
+        """A page's choices in display order (None if the page is not in the story)"""
+        index = self.page_index(page_id)
+        if index is None:
+            return None
+        _, first, count, _, _ = self._page(index)
+        choices = []
+        for position in range(first, first + count):
+            choice_id, next_page, min_roll, dice_required, _, _ = self._choice(position)
+            next_page_id = self._page(next_page)[0] if next_page < UNPUBLISHED_PAGE else None
+            choices.append(StoredChoice(choice_id, next_page_id, dice_required, min_roll))
+        return choices
+    
+    def _choice(self, position):
+        return CHOICE.unpack_from(self.view, self.choices_offset + position * CHOICE.size)
+    
+    def resolve(self, page_id, choice_id):
+        """
+        Follow a choice through the choice table.
+        
+        Returns:
+            (choice JSON, next page JSON) as memoryviews, or None if the
+            page is not in this story
+        
+        Raises:
+            LookupError: If the choice is not on the page or its target is not published
+            ValueError: If the choice leads nowhere
+        """
+        index = self.page_index(page_id)
+        if index is None:
+            return None
+        _, first, count, _, _ = self._page(index)
+        for position in range(first, first + count):
+            found, next_page, _, _, offset, length = self._choice(position)
+            if found == choice_id:
+                break
+        else:
+            raise LookupError('Choice not found on this page')
+        if next_page == NO_PAGE:
+            raise ValueError('Choice has no next page')
+        if next_page == UNPUBLISHED_PAGE:
+            raise LookupError('Page not found')
+        _, _, _, page_offset, page_length = self._page(next_page)
+        return self.view[offset:offset + length], self.view[page_offset:page_offset + page_length]
+
+
+def encode_story(story_id, version, published_at, start_page_id, pages, tree):
+    """
+    Build a story file.
+
+    Args:
+        pages: (page_id, body, choices) tuples, choices being serialized
+            choice dicts in display order (stored as JSON for resolve())
+        tree: The tree response body
+    """
+    pages = sorted(pages, key=lambda page: page[0])
+    positions = {page_id: index for index, (page_id, _, _) in enumerate(pages)}
+    choice_count = sum(len(choices) for _, _, choices in pages)
+    tree_offset = HEADER.size + len(pages) * PAGE.size + choice_count * CHOICE.size
+
+    page_table, choice_table, bodies = [], [], [tree]
+    offset = tree_offset + len(tree)
+    for page_id, body, choices in pages:
+        page_table.append(PAGE.pack(page_id, len(choice_table), len(choices), offset, len(body)))
+        bodies.append(body)
+        offset += len(body)
+        for choice in choices:
+            if choice['next_page_id'] is None:
+                next_page = NO_PAGE
+            else:
+                next_page = positions.get(choice['next_page_id'], UNPUBLISHED_PAGE)
+            choice_body = dumps(choice)
+            choice_table.append(CHOICE.pack(choice['id'], next_page, choice['min_roll'] or 1,
+                                            bool(choice['dice_required']), offset, len(choice_body)))
+            bodies.append(choice_body)
+            offset += len(choice_body)
+
+    published_us = (published_at - EPOCH) // timedelta(microseconds=1)
+    header = HEADER.pack(MAGIC, FORMAT, story_id, version, start_page_id or 0, published_us,
+                         len(pages), choice_count, tree_offset, len(tree))
+    return b''.join([header, *page_table, *choice_table, *bodies])
+
+
+class StoryStore:
+    """Directory of story files plus the page index, mapped on first use"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        # path -> (inode, mapping, parsed view)
+        self._mapped = {}
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _map(self, name, parse):
+        path = self._path(name)
+        try:
+            inode = os.stat(path).st_ino
+        except FileNotFoundError:
+            self._mapped.pop(path, None)
+            return None
+        cached = self._mapped.get(path)
+        if cached and cached[0] == inode:
+            return cached[2]
+        with open(path, 'rb') as f:
+            # Older mappings stay valid while responses still reference them
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            view = parse(mapping)
+        except ValueError:
+            # Another file format: serve from the database until rebuilt
+            mapping.close()
+            view = mapping = None
+        self._mapped[path] = (inode, mapping, view)
+        return view
+
+    def story(self, story_id):
+        """The StoredStory of a published story, or None"""
+        return self._map(f'story-{story_id}.bin', StoredStory)
+
+    def story_id_for_page(self, page_id):
+        index = self._map(INDEX_FILE, memoryview)
+        if index is None:
+            return None
+        count = INDEX_HEADER.unpack_from(index)[2]
+        position = _bisect(index, INDEX_HEADER.size, count, INDEX_ENTRY, page_id)
+        if position is None:
+            return None
+        return INDEX_ENTRY.unpack_from(index, INDEX_HEADER.size + position * INDEX_ENTRY.size)[1]
+
+    def page(self, page_id):
+        """StoredBody of a published page, or None"""
+        story_id = self.story_id_for_page(page_id)
+        story = self.story(story_id) if story_id is not None else None
+        body = story.page_body(page_id) if story else None
+        if body is None:
+            return None
+        return StoredBody(story.version, story.published_at, body)
+
+    def start(self, story_id):
+        """StoredBody of a published story's start page, or None"""
+        story = self.story(story_id)
+        body = story.page_body(story.start_page_id) if story and story.start_page_id else None
+        if body is None:
+            return None
+        return StoredBody(story.version, story.published_at, body)
+
+    def resolve(self, page_id, choice_id):
+        """
+        (choice JSON, next page JSON) of a choice on a published page, or
+        None when the page is not in the store (see StoredStory.resolve)
+        """
+        story_id = self.story_id_for_page(page_id)
+        story = self.story(story_id) if story_id is not None else None
+        return story.resolve(page_id, choice_id) if story else None
+    
+    def tree(self, story_id):
+        """StoredBody of a published story's tree, or None"""
+        story = self.story(story_id)
+        if story is None:
+            return None
+        return StoredBody(story.version, story.published_at, story.tree_body())
+
+    def _replace(self, name, data):
+        """Write a file next to its destination, then rename it into place"""
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=f'.{name}.')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self._path(name))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def write_story(self, story_id, data):
+        self._replace(f'story-{story_id}.bin', data)
+
+    def remove_story(self, story_id):
+        try:
+            os.unlink(self._path(f'story-{story_id}.bin'))
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def index_lock(self):
+        """Hold the exclusive lock that serializes page index rewrites across processes"""
+        with open(self._path(INDEX_LOCK_FILE), 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def read_index(self):
+        """The (page_id, story_id) pairs of the page index, or None when there is no readable index"""
+        try:
+            with open(self._path(INDEX_FILE), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if len(data) < INDEX_HEADER.size:
+            return None
+        magic, file_format, count = INDEX_HEADER.unpack_from(data)
+        if magic != MAGIC or file_format != FORMAT or len(data) != INDEX_HEADER.size + count * INDEX_ENTRY.size:
+            return None
+        return list(INDEX_ENTRY.iter_unpack(memoryview(data)[INDEX_HEADER.size:]))
+
+    def write_index(self, entries):
+        """Replace the page index with (page_id, story_id) pairs (call holding index_lock)"""
+        entries = sorted(entries)
+        self._replace(INDEX_FILE, INDEX_HEADER.pack(MAGIC, FORMAT, len(entries))
+                      + b''.join(INDEX_ENTRY.pack(*entry) for entry in entries))
+
+    def update_index(self, story_ids, entries, rebuild):
+        """
+        Replace the index entries of some stories under the index lock.
+
+        Args:
+            story_ids: Stories whose entries are replaced
+            entries: Their new (page_id, story_id) pairs
+            rebuild: Callable returning every pair, used when there is no
+                readable index yet
+        """
+        with self.index_lock():
+            current = self.read_index()
+            if current is None:
+                self.write_index(rebuild())
+                return
+            changed = set(story_ids)
+            self.write_index([entry for entry in current if entry[1] not in changed] + list(entries))
+
+
+def init_story_store(app):
+    """Open the store in STORY_STORE_DIR (an empty setting disables it)"""
+    app.cli.add_command(story_store_cli)
+    directory = app.config['STORY_STORE_DIR']
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    app.extensions['story_store'] = StoryStore(directory) if directory else None
+
+
+def get_story_store():
+    """The app's StoryStore, or None when it is disabled"""
+    return current_app.extensions.get('story_store')
+
+
+def _write_story(store, story_id):
+    snapshot = db.session.get(StorySnapshot, story_id)
+    if snapshot is None:
+        store.remove_story(story_id)
+        return
+
+    page_snapshots = db.session.execute(
+        db.select(PageSnapshot.page_id, PageSnapshot.body).where(PageSnapshot.story_id == story_id)
+    ).all()
+    start_page_id = loads(snapshot.start_page)['id'] if snapshot.start_page else None
+    pages = [(row.page_id, row.body, loads(row.body)['choices']) for row in page_snapshots]
+    store.write_story(story_id, encode_story(story_id, snapshot.version, snapshot.published_at,
+                                             start_page_id, pages, snapshot.tree))
+
+
+def _index_entries(story_ids=None):
+    """(page_id, story_id) pairs of the published pages, of some stories or all"""
+    query = db.select(PageSnapshot.page_id, PageSnapshot.story_id)
+    if story_ids is not None:
+        query = query.where(PageSnapshot.story_id.in_(story_ids))
+    return [tuple(row) for row in db.session.execute(query)]
+
+
+def sync_story_store(*story_ids):
+    """
+    Bring the store in line with the committed snapshots of the given
+    stories: write the published ones, remove the rest. Call after commit.
+    """
+    store = get_story_store()
+    if store is None:
+        return
+    for story_id in story_ids:
+        _write_story(store, story_id)
+    store.update_index(story_ids, _index_entries(story_ids), _index_entries)
+
+
+@story_store_cli.command('rebuild')
+@with_appcontext
+def rebuild_command():
+    """Rewrite the store from every published snapshot."""
+    store = get_story_store()
+    if store is None:
+        raise click.ClickException('STORY_STORE_DIR is not set')
+
+    story_ids = set(db.session.execute(db.select(StorySnapshot.story_id)).scalars())
+    for name in os.listdir(store.directory):
+        if name.startswith('story-') and name.endswith('.bin') and int(name[6:-4]) not in story_ids:
+            store.remove_story(int(name[6:-4]))
+    for story_id in story_ids:
+        _write_story(store, story_id)
+    with store.index_lock():
+        store.write_index(_index_entries())
+    click.echo(f'Wrote {len(story_ids)} stories')
@@ -0,0 +1,5 @@
+import os
+from app.async_api import create_asgi_app
+from app.config import Config, config_by_name
+
+app = create_asgi_app(config_by_name.get(os.getenv('FLASK_ENV'), Config))
@@ -0,0 +1,133 @@
+"""
+Async read benchmark - requests/second at 200 concurrent connections against
+the sync app (gunicorn, threaded worker) and the ASGI app (uvicorn), both
+with one worker process on the same SQLite file and the response cache off.
+
+The load mixes story, start, tree and page reads of a few stories.
+
+Usage (from flask_api/):
+    python -m benchmarks.bench_async_reads [--connections 200] [--seconds 10]
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from app import create_app
+from app.config import ProductionConfig
+from app.extensions import db
+from benchmarks.bench_serialization import build_story
+
+FLASK_API = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def populate(path, stories, pages):
+    class SeedConfig(ProductionConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+
+    app = create_app(SeedConfig)
+    with app.app_context():
+        db.create_all()
+        story_ids = [build_story(pages) for _ in range(stories)]
+        page_ids = [row.id for row in db.session.execute(db.text('SELECT id FROM pages'))]
+        db.engine.dispose()
+    return story_ids, page_ids
+
+
+def wait_until_up(url, timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f'{url} did not come up')
+
+
+async def load(base_url, urls, connections, seconds):
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        stop = time.perf_counter() + seconds
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < stop:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(random.choice(urls))
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(connections)))
+    latencies.sort()
+    return {
+        'rps': len(latencies) / seconds,
+        'p50': latencies[len(latencies) // 2] * 1000,
+        'p99': latencies[int(len(latencies) * 0.99)] * 1000,
+        'errors': errors
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--connections', type=int, default=200)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--threads', type=int, default=8, help='gunicorn threads for the sync app')
+    parser.add_argument('--stories', type=int, default=5)
+    parser.add_argument('--pages', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        story_ids, page_ids = populate(path, args.stories, args.pages)
+        urls = ([f'/stories/{i}' for i in story_ids] + [f'/stories/{i}/start' for i in story_ids]
+                + [f'/stories/{i}/tree' for i in story_ids] + [f'/pages/{i}' for i in page_ids[:200]])
+
+        env = dict(os.environ, DATABASE_URL=f'sqlite:///{path}', FLASK_ENV='production',
+                   RESPONSE_CACHE_SIZE='0', METRICS_ENABLED='false', COMPRESS_MIN_SIZE='0')
+        servers = {
+            'sync (gunicorn)': lambda port: [
+                sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', '1',
+                '--threads', str(args.threads), '--log-level', 'warning', 'run:app'],
+            'async (uvicorn)': lambda port: [
+                sys.executable, '-m', 'uvicorn', '--port', str(port), '--workers', '1',
+                '--log-level', 'warning', 'asgi:app'],
+        }
+
+        print(f'{args.connections} connections, {args.seconds:g}s, {len(urls)} URLs')
+        print(f'{"server":<18} {"req/s":>8} {"p50 ms":>8} {"p99 ms":>8} {"errors":>7}')
+        for name, command in servers.items():
+            port = free_port()
+            process = subprocess.Popen(command(port), cwd=FLASK_API, env=env)
+            try:
+                base_url = f'http://127.0.0.1:{port}'
+                wait_until_up(base_url + urls[0])
+                result = asyncio.run(load(base_url, urls, args.connections, args.seconds))
+            finally:
+                process.terminate()
+                process.wait()
+            print(f'{name:<18} {result["rps"]:>8.0f} {result["p50"]:>8.1f} '
+                  f'{result["p99"]:>8.1f} {result["errors"]:>7}')
+
+
+if __name__ == '__main__':
+    main()
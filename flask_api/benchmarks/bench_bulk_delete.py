@@ -0,0 +1,68 @@
+"""
+Delete benchmark - deleting a large story through the ORM cascade (load
+every page and choice, one DELETE per row) against the set-based
+StoryService.delete_stories, on a SQLite file.
+
+The write transaction is open for the whole delete, so the time below is
+also how long other writers wait for the lock.
+
+Usage (from flask_api/):
+    python -m benchmarks.bench_bulk_delete [--pages 1000 5000] [--repeat 3]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models import Story
+from app.services import StoryService
+from benchmarks.bench_serialization import build_story
+
+
+def orm_delete(story_id):
+    db.session.delete(db.session.get(Story, story_id))
+    db.session.commit()
+
+
+def bulk_delete(story_id):
+    StoryService.delete_stories([story_id])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, nargs='+', default=[1000, 5000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        class DeleteConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.join(tmp, "delete.db")}'
+
+        app = create_app(DeleteConfig)
+        with app.app_context():
+            db.create_all()
+            # A second story keeps the tables (and the FTS index) non-trivial
+            build_story(1000)
+
+            print(f'{"pages":>6} {"orm cascade ms":>15} {"set-based ms":>13}')
+            for pages in args.pages:
+                timings = {}
+                for name, delete in (('orm', orm_delete), ('bulk', bulk_delete)):
+                    runs = []
+                    for _ in range(args.repeat):
+                        story_id = build_story(pages)
+                        db.session.expire_all()
+                        start = time.perf_counter()
+                        delete(story_id)
+                        runs.append(time.perf_counter() - start)
+                    timings[name] = statistics.median(runs) * 1000
+                print(f'{pages:>6} {timings["orm"]:>15.0f} {timings["bulk"]:>13.0f}')
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Compression benchmark - bytes on the wire and CPU time per gzip level (and
+brotli quality, when installed) for the tree and bundle of a large story.
+
+Usage (from flask_api/):
+    python -m benchmarks.bench_compression [--pages 1000] [--repeat 10]
+"""
+import argparse
+import gzip
+import time
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.middleware.compression import brotli, compress
+from app.schemas.encoding import dumps
+from app.services import StoryService
+from benchmarks.bench_serialization import build_story
+
+
+class CompressionConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+
+def timed(fn, repeat):
+    """Best-of-N wall time in milliseconds and the last result"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    app = create_app(CompressionConfig)
+    with app.app_context():
+        db.create_all()
+        story_id = build_story(args.pages)
+        payloads = {
+            'tree': dumps(StoryService.get_story_tree(story_id)),
+            'bundle': dumps(StoryService.get_story_bundle(story_id)),
+        }
+
+    settings = [('gzip', level) for level in range(1, 10)]
+    if brotli is not None:
+        settings += [('br', quality) for quality in (1, 4, 5, 6, 9, 11)]
+
+    print(f'{args.pages} pages, best of {args.repeat}')
+    print(f'{"payload":<8} {"encoding":<10} {"bytes":>10} {"ratio":>7} {"compress ms":>12} {"decompress ms":>14}')
+    for name, body in payloads.items():
+        print(f'{name:<8} {"identity":<10} {len(body):>10} {1:>7.1f} {0:>12.2f} {0:>14.2f}')
+        for encoding, level in settings:
+            ms, packed = timed(lambda: compress(body, encoding, level, level), args.repeat)
+            unpack = brotli.decompress if encoding == 'br' else gzip.decompress
+            unpack_ms, _ = timed(lambda: unpack(packed), args.repeat)
+            label = f'{encoding}-{level}'
+            print(f'{name:<8} {label:<10} {len(packed):>10} {len(body) / len(packed):>7.1f} '
+                  f'{ms:>12.2f} {unpack_ms:>14.2f}')
+
+
+if __name__ == '__main__':
+    main()
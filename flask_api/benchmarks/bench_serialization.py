@@ -0,0 +1,112 @@
+"""
+Serialization benchmark - ORM + to_dict() + stdlib json against row tuples
++ serializers, with both JSON backends, on a story with 1,000 pages.
+
+Usage (from flask_api/):
+    python -m benchmarks.bench_serialization [--pages 1000] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.config import Config  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models import Story, Page  # noqa: E402
+from app.schemas import encoding  # noqa: E402
+from app.services import StoryService  # noqa: E402
+
+
+class BenchConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+
+def build_story(pages):
+    """Import a linear story of `pages` pages with two choices per page"""
+    data = {
+        'title': 'Benchmark story',
+        'description': 'x' * 200,
+        'start_page': 'p0',
+        'pages': [{
+            'key': f'p{i}',
+            'text': f'Page {i} ' + 'lorem ipsum ' * 40,
+            'is_ending': i == pages - 1,
+            'ending_label': 'The end' if i == pages - 1 else None
+        } for i in range(pages)],
+        'choices': []
+    }
+    for i in range(pages - 1):
+        data['choices'].append({'from_page': f'p{i}', 'to_page': f'p{i + 1}', 'text': f'Go on from page {i}'})
+        data['choices'].append({'from_page': f'p{i}', 'to_page': f'p{min(i + 2, pages - 1)}',
+                                'text': f'Roll from page {i}', 'dice_required': True, 'min_roll': 4})
+    return StoryService.import_story(data).id
+
+
+def orm_tree(story_id):
+    story = db.session.get(Story, story_id)
+    pages = Page.query.filter_by(story_id=story_id).order_by(Page.id).all()
+    nodes = [{'id': p.id, 'label': f'Page {p.id}', 'is_start': p.id == story.start_page_id,
+              'is_ending': p.is_ending, 'ending_label': p.ending_label} for p in pages]
+    edges = [{'source': p.id, 'target': c.next_page_id,
+              'label': c.text[:30] + '...' if len(c.text) > 30 else c.text}
+             for p in pages for c in p.choices if c.next_page_id]
+    return {'nodes': nodes, 'edges': edges}
+
+
+def orm_bundle(story_id):
+    story = db.session.get(Story, story_id)
+    pages = Page.query.filter_by(story_id=story_id).order_by(Page.id).all()
+    return {'story': story.to_dict(), 'pages': [p.to_dict() for p in pages]}
+
+
+def stdlib_dumps(obj):
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+def timed(fn, repeat):
+    """Best-of-N wall time in milliseconds; the session is reset every run"""
+    best = float('inf')
+    for _ in range(repeat):
+        db.session.expire_all()
+        start = time.perf_counter()
+        body = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        story_id = build_story(args.pages)
+
+        cases = [
+            ('tree', 'orm + to_dict + json', lambda: stdlib_dumps(orm_tree(story_id))),
+            ('tree', 'rows + json', lambda: stdlib_dumps(StoryService.get_story_tree(story_id))),
+            ('bundle', 'orm + to_dict + json', lambda: stdlib_dumps(orm_bundle(story_id))),
+            ('bundle', 'rows + json', lambda: stdlib_dumps(StoryService.get_story_bundle(story_id))),
+        ]
+        if encoding.orjson is not None:
+            cases += [
+                ('tree', 'rows + orjson', lambda: encoding.dumps(StoryService.get_story_tree(story_id))),
+                ('bundle', 'rows + orjson', lambda: encoding.dumps(StoryService.get_story_bundle(story_id))),
+            ]
+
+        print(f'{args.pages} pages, best of {args.repeat}')
+        print(f'{"payload":<8} {"path":<22} {"ms":>8} {"bytes":>10}')
+        for payload, name, fn in sorted(cases, key=lambda c: c[0], reverse=True):
+            ms, size = timed(fn, args.repeat)
+            print(f'{payload:<8} {name:<22} {ms:>8.2f} {size:>10}')
+
+
+if __name__ == '__main__':
+    main()
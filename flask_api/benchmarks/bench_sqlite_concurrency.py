@@ -0,0 +1,101 @@
+"""
+SQLite concurrency benchmark - N reader threads and one writer thread
+against a file database, with the default settings and with the
+ProductionConfig PRAGMAs and pool.
+
+Readers fetch random pages, the writer keeps editing page text (each edit
+is a commit that also bumps the story version). The response cache is off
+so every read reaches the database.
+
+Usage (from flask_api/):
+    python -m benchmarks.bench_sqlite_concurrency [--readers 8] [--seconds 5]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+from app import create_app
+from app.config import Config, ProductionConfig
+from app.extensions import db
+from benchmarks.bench_serialization import build_story
+
+API_KEY = 'bench-api-key'
+
+
+def make_config(base, path):
+    class BenchConfig(base):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        RESPONSE_CACHE_SIZE = 0
+        COMPRESS_MIN_SIZE = 0
+        API_KEY = API_KEY
+    return BenchConfig
+
+
+def run(base, readers, seconds, pages):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(make_config(base, os.path.join(tmp, 'bench.db')))
+        with app.app_context():
+            db.create_all()
+            build_story(pages)
+            page_ids = [row.id for row in db.session.execute(db.text('SELECT id FROM pages'))]
+
+        counts = {'reads': 0, 'writes': 0, 'errors': 0}
+        lock = threading.Lock()
+        stop = time.perf_counter() + seconds
+
+        def count(key):
+            with lock:
+                counts[key] += 1
+
+        def reader():
+            client = app.test_client()
+            while time.perf_counter() < stop:
+                response = client.get(f'/pages/{random.choice(page_ids)}')
+                count('reads' if response.status_code == 200 else 'errors')
+
+        def writer():
+            client = app.test_client()
+            headers = {'X-API-KEY': API_KEY, 'Content-Type': 'application/json'}
+            n = 0
+            while time.perf_counter() < stop:
+                n += 1
+                try:
+                    response = client.put(f'/pages/{random.choice(page_ids)}',
+                                          data=json.dumps({'text': f'Edit {n}'}), headers=headers)
+                    count('writes' if response.status_code == 200 else 'errors')
+                except Exception:  # "database is locked" surfaces as an exception
+                    count('errors')
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        threads.append(threading.Thread(target=writer))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with app.app_context():
+            db.engine.dispose()
+        return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--pages', type=int, default=500)
+    args = parser.parse_args()
+
+    print(f'{args.readers} readers + 1 writer, {args.seconds:g}s, {args.pages} pages')
+    print(f'{"profile":<12} {"reads/s":>10} {"writes/s":>10} {"errors":>8}')
+    for name, base in (('default', Config), ('production', ProductionConfig)):
+        counts = run(base, args.readers, args.seconds, args.pages)
+        print(f'{name:<12} {counts["reads"] / args.seconds:>10.0f} '
+              f'{counts["writes"] / args.seconds:>10.0f} {counts["errors"]:>8}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Story store benchmark - per-worker memory and page lookup latency of the
+mmap'd story store against the ORM read path with its per-worker response
+cache, for several worker processes reading every page of a catalogue.
+
+RSS counts the mapped store in every worker; PSS splits shared pages
+between the workers that map them, so it is the better per-worker figure.
+
+Usage (from flask_api/):
+    python -m benchmarks.bench_story_store [--workers 4] [--stories 20] [--pages 500]
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.services import PageService, SnapshotService
+from app.story_store import get_story_store, sync_story_store
+from benchmarks.bench_serialization import build_story
+
+
+def make_config(path, store_dir=''):
+    class WorkerConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        STORY_STORE_DIR = store_dir
+        RESPONSE_CACHE_SIZE = 1_000_000
+        METRICS_ENABLED = False
+        COMPRESS_MIN_SIZE = 0
+    return WorkerConfig
+
+
+def populate(tmp, stories, pages):
+    """An unpublished catalogue (ORM path) and a published copy with its store"""
+    orm_path = os.path.join(tmp, 'orm.db')
+    store_path = os.path.join(tmp, 'store.db')
+    store_dir = os.path.join(tmp, 'store')
+
+    app = create_app(make_config(orm_path))
+    with app.app_context():
+        db.create_all()
+        story_ids = [build_story(pages) for _ in range(stories)]
+        page_ids = db.session.execute(db.text('SELECT id FROM pages ORDER BY id')).scalars().all()
+        db.engine.dispose()
+    shutil.copy(orm_path, store_path)
+
+    app = create_app(make_config(store_path, store_dir))
+    with app.app_context():
+        for story_id in story_ids:
+            SnapshotService.compile_snapshot(story_id)
+        db.session.commit()
+        sync_story_store(*story_ids)
+        db.engine.dispose()
+    return orm_path, store_path, store_dir, page_ids
+
+
+def memory_kib():
+    """(RSS, PSS) of this process in KiB"""
+    values = {}
+    for name in ('/proc/self/status', '/proc/self/smaps_rollup'):
+        with open(name) as f:
+            for line in f:
+                key, _, rest = line.partition(':')
+                if key in ('VmRSS', 'Pss'):
+                    values[key] = int(rest.split()[0])
+    return values.get('VmRSS', 0), values.get('Pss', 0)
+
+
+def worker(args):
+    mode, path, store_dir, page_ids, barrier = args
+    app = create_app(make_config(path, store_dir if mode == 'store' else ''))
+    with app.app_context():
+        client = app.test_client()
+        if mode == 'store':
+            store = get_story_store()
+            lookup = lambda page_id: store.page(page_id).body
+        else:
+            lookup = lambda page_id: PageService.get_page_data(page_id)
+
+        for page_id in page_ids:  # warm the response cache / page cache
+            client.get(f'/pages/{page_id}')
+        barrier.wait()
+
+        requests = []
+        for page_id in page_ids:
+            start = time.perf_counter()
+            client.get(f'/pages/{page_id}')
+            requests.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for page_id in page_ids:
+            lookup(page_id)
+        lookup_us = (time.perf_counter() - start) / len(page_ids) * 1e6
+
+        rss, pss = memory_kib()
+        barrier.wait()  # keep every worker's mappings alive while the others measure
+        db.engine.dispose()
+    requests.sort()
+    return rss, pss, requests[len(requests) // 2] * 1e6, requests[int(len(requests) * 0.99)] * 1e6, lookup_us
+
+
+def run(mode, path, store_dir, page_ids, workers):
+    context = multiprocessing.get_context('spawn')
+    with context.Manager() as manager:
+        barrier = manager.Barrier(workers)
+        with context.Pool(workers) as pool:
+            results = pool.map(worker, [(mode, path, store_dir, page_ids, barrier)] * workers)
+    return [statistics.mean(column) for column in zip(*results)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--stories', type=int, default=20)
+    parser.add_argument('--pages', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        orm_path, store_path, store_dir, page_ids = populate(tmp, args.stories, args.pages)
+        store_bytes = sum(os.path.getsize(os.path.join(store_dir, name)) for name in os.listdir(store_dir))
+        print(f'{args.workers} workers, {len(page_ids)} pages, store {store_bytes / 2**20:.1f} MiB on disk')
+        print(f'{"path":<8} {"RSS MiB":>9} {"PSS MiB":>9} {"req p50 us":>11} {"req p99 us":>11} {"lookup us":>10}')
+        for mode, path in (('orm', orm_path), ('store', store_path)):
+            rss, pss, p50, p99, lookup_us = run(mode, path, store_dir, page_ids, args.workers)
+            print(f'{mode:<8} {rss / 1024:>9.1f} {pss / 1024:>9.1f} {p50:>11.0f} {p99:>11.0f} {lookup_us:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+"""Add story version stamp
+
+Revision ID: 3c1f9a7b2d40
+Revises: 08fae1d345b6
+Create Date: 2026-10-18 10:12:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f9a7b2d40'
+down_revision = '08fae1d345b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('stories', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('stories', schema=None) as batch_op:
+        batch_op.drop_column('version')
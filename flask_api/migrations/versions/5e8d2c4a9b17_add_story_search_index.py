@@ -0,0 +1,29 @@
+"""Add FTS5 story search index
+
+Revision ID: 5e8d2c4a9b17
+Revises: 3c1f9a7b2d40
+Create Date: 2026-10-18 14:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.models.search_index import SEARCH_INDEX_DDL, REBUILD_SEARCH_INDEX_SQL, SEARCH_TABLE
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8d2c4a9b17'
+down_revision = '3c1f9a7b2d40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for statement in SEARCH_INDEX_DDL + REBUILD_SEARCH_INDEX_SQL:
+        op.execute(statement)
+
+
+def downgrade():
+    for trigger in ('stories_search_insert', 'stories_search_update', 'stories_search_delete',
+                    'pages_search_insert', 'pages_search_update', 'pages_search_delete'):
+        op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    op.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
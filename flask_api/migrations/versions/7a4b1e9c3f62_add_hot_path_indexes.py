@@ -0,0 +1,42 @@
+"""Add indexes for story, page and choice lookups
+
+Revision ID: 7a4b1e9c3f62
+Revises: 5e8d2c4a9b17
+Create Date: 2026-10-18 15:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a4b1e9c3f62'
+down_revision = '5e8d2c4a9b17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('stories', schema=None) as batch_op:
+        batch_op.create_index('ix_stories_status_created_at', ['status', 'created_at'], unique=False)
+        batch_op.create_index('ix_stories_author_id_created_at', ['author_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('pages', schema=None) as batch_op:
+        batch_op.create_index('ix_pages_story_id_id', ['story_id', 'id'], unique=False)
+
+    with op.batch_alter_table('choices', schema=None) as batch_op:
+        batch_op.create_index('ix_choices_page_id_id', ['page_id', 'id'], unique=False)
+        batch_op.create_index('ix_choices_next_page_id', ['next_page_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('choices', schema=None) as batch_op:
+        batch_op.drop_index('ix_choices_next_page_id')
+        batch_op.drop_index('ix_choices_page_id_id')
+
+    with op.batch_alter_table('pages', schema=None) as batch_op:
+        batch_op.drop_index('ix_pages_story_id_id')
+
+    with op.batch_alter_table('stories', schema=None) as batch_op:
+        batch_op.drop_index('ix_stories_author_id_created_at')
+        batch_op.drop_index('ix_stories_status_created_at')
@@ -0,0 +1,47 @@
+"""Add published story and page snapshots
+
+Revision ID: b81d4f2e6a05
+Revises: 7a4b1e9c3f62
+Create Date: 2026-10-18 19:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81d4f2e6a05'
+down_revision = '7a4b1e9c3f62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('story_snapshots',
+    sa.Column('story_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('published_at', sa.DateTime(), nullable=False),
+    sa.Column('start_page', sa.LargeBinary(), nullable=True),
+    sa.Column('tree', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['story_id'], ['stories.id'], ),
+    sa.PrimaryKeyConstraint('story_id')
+    )
+    op.create_table('page_snapshots',
+    sa.Column('page_id', sa.Integer(), nullable=False),
+    sa.Column('story_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('published_at', sa.DateTime(), nullable=False),
+    sa.Column('body', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['story_id'], ['stories.id'], ),
+    sa.PrimaryKeyConstraint('page_id')
+    )
+    with op.batch_alter_table('page_snapshots', schema=None) as batch_op:
+        batch_op.create_index('ix_page_snapshots_story_id', ['story_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('page_snapshots', schema=None) as batch_op:
+        batch_op.drop_index('ix_page_snapshots_story_id')
+
+    op.drop_table('page_snapshots')
+    op.drop_table('story_snapshots')
@@ -0,0 +1,65 @@
+"""Key page snapshots by story and page, never reuse page IDs
+
+Revision ID: c4e7a2d91b38
+Revises: b81d4f2e6a05
+Create Date: 2026-10-18 21:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.models.search_index import SEARCH_INDEX_DDL
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e7a2d91b38'
+down_revision = 'b81d4f2e6a05'
+branch_labels = None
+depends_on = None
+
+
+def _key_page_snapshots(primary_key, index, index_columns):
+    """Rebuild page_snapshots with another primary key and lookup index"""
+    op.create_table('_page_snapshots_new',
+    sa.Column('page_id', sa.Integer(), nullable=False),
+    sa.Column('story_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('published_at', sa.DateTime(), nullable=False),
+    sa.Column('body', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['story_id'], ['stories.id'], ),
+    sa.PrimaryKeyConstraint(*primary_key)
+    )
+    op.execute('INSERT OR IGNORE INTO _page_snapshots_new (page_id, story_id, version, published_at, body) '
+               'SELECT page_id, story_id, version, published_at, body FROM page_snapshots')
+    op.drop_table('page_snapshots')
+    op.rename_table('_page_snapshots_new', 'page_snapshots')
+    with op.batch_alter_table('page_snapshots', schema=None) as batch_op:
+        batch_op.create_index(index, index_columns, unique=False)
+
+
+def _rebuild_pages(autoincrement):
+    """Recreate the pages table, then the search triggers the rebuild dropped"""
+    with op.batch_alter_table('pages', schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': autoincrement}):
+        pass
+    for statement in SEARCH_INDEX_DDL:
+        op.execute(statement)
+
+
+def upgrade():
+    _key_page_snapshots(['story_id', 'page_id'], 'ix_page_snapshots_page_id', ['page_id'])
+
+    _rebuild_pages(True)
+
+    # Start after every ID ever handed out, including deleted pages that
+    # still have a published copy
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DELETE FROM sqlite_sequence WHERE name = 'pages'")
+        op.execute("INSERT INTO sqlite_sequence (name, seq) SELECT 'pages', MAX("
+                   "COALESCE((SELECT MAX(id) FROM pages), 0), "
+                   "COALESCE((SELECT MAX(page_id) FROM page_snapshots), 0))")
+
+
+def downgrade():
+    _rebuild_pages(False)
+
+    _key_page_snapshots(['page_id'], 'ix_page_snapshots_story_id', ['story_id'])
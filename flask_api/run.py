@@ -1,7 +1,9 @@
 
+import os
 from app import create_app
+from app.config import Config, config_by_name
 
-app = create_app()
+app = create_app(config_by_name.get(os.getenv('FLASK_ENV'), Config))
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
@@ -1,4 +1,6 @@
 import pytest
+from contextlib import contextmanager
+from sqlalchemy import event
 from app import create_app
 from app.extensions import db
 from app.config import Config
@@ -23,3 +25,34 @@ def client(app):
 @pytest.fixture
 def auth_headers():
     return {'X-API-KEY': 'test-api-key', 'Content-Type': 'application/json'}
+
+@pytest.fixture
+def query_budget(app):
+    """
+    Context manager that fails the test when the wrapped block issues more
+    SQL statements than its budget.
+    
+    Usage:
+        with query_budget(2) as issued:
+            client.get('/pages/1')
+        # issued now holds the SQL of the wrapped block
+    """
+    statements = []
+    
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(db.engine, 'before_cursor_execute', count_statement)
+    
+    @contextmanager
+    def budget(max_queries):
+        start = len(statements)
+        issued = []
+        yield issued
+        issued.extend(statements[start:])
+        assert len(issued) <= max_queries, (
+            f'{len(issued)} queries issued, budget is {max_queries}:\n' + '\n'.join(issued)
+        )
+    
+    yield budget
+    event.remove(db.engine, 'before_cursor_execute', count_statement)
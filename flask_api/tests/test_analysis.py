@@ -0,0 +1,79 @@
+import json
+import pytest
+from app.services import story_analysis
+from app.services.story_analysis import analyze_graph
+
+
+DICE_STORY = {
+    'title': 'Odds',
+    'pages': [
+        {'text': 'Start'},
+        {'text': 'Safe', 'is_ending': True, 'ending_label': 'Safe'},
+        {'text': 'Lucky', 'is_ending': True, 'ending_label': 'Lucky'},
+    ],
+    'choices': [
+        {'from_page': 0, 'to_page': 1, 'text': 'Walk'},
+        {'from_page': 0, 'to_page': 2, 'text': 'Jump', 'dice_required': True, 'min_roll': 4},
+    ]
+}
+
+
+def test_story_analysis_with_dice(client, auth_headers):
+    """Test exact probabilities when a failed roll sends the player back"""
+    client.post('/stories/import', data=json.dumps(DICE_STORY), headers=auth_headers)
+    
+    response = client.get('/stories/1/analysis')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    probabilities = {e['ending_label']: e['probability'] for e in data['endings']}
+    assert probabilities['Safe'] == pytest.approx(2 / 3)
+    assert probabilities['Lucky'] == pytest.approx(1 / 3)
+    assert data['expected_steps'] == pytest.approx(4 / 3)
+    
+    assert client.get('/stories/1/analysis').headers['X-Cache'] == 'HIT'
+
+
+@pytest.mark.parametrize('use_sparse', [True, False])
+def test_trapped_loop_and_dead_end(use_sparse):
+    """Test that loops without exit and dead ends take their share of probability"""
+    if use_sparse:
+        pytest.importorskip('scipy')
+    pages = [(1, False, None), (2, False, None), (3, False, None), (4, True, 'End'), (5, False, None)]
+    choices = [
+        (1, 2, False, 1), (1, 4, False, 1), (1, 5, False, 1),
+        (2, 3, False, 1), (3, 2, False, 1),
+    ]
+    result = analyze_graph(1, pages, choices, use_sparse=use_sparse)
+    assert result['endings'][0]['probability'] == pytest.approx(1 / 3)
+    assert result['dead_ends'] == [{'page_id': 5, 'probability': pytest.approx(1 / 3)}]
+    assert result['trapped_probability'] == pytest.approx(1 / 3)
+    assert result['expected_steps'] is None
+
+
+def test_solvers_agree_on_branching_story():
+    """Test the sparse and dense solvers on a story with many converging paths"""
+    pytest.importorskip('scipy')
+    size = 300
+    pages = [(i, i >= size - 3, f'End {i}' if i >= size - 3 else None) for i in range(size)]
+    choices = []
+    for i in range(size - 3):
+        choices.append((i, i + 1, False, 1))
+        choices.append((i, min(i + 2, size - 1), True, 5))
+        choices.append((i, max(i - 1, 0), False, 1))
+    
+    dense = analyze_graph(0, pages, choices, use_sparse=False)
+    sparse = analyze_graph(0, pages, choices, use_sparse=True)
+    assert sum(e['probability'] for e in dense['endings']) == pytest.approx(1.0)
+    for a, b in zip(dense['endings'], sparse['endings']):
+        assert a['probability'] == pytest.approx(b['probability'])
+    assert dense['expected_steps'] == pytest.approx(sparse['expected_steps'])
+
+
+def test_forced_sparse_solver_needs_scipy(monkeypatch):
+    """Test that asking for the sparse solver without scipy fails clearly"""
+    monkeypatch.setattr(story_analysis, 'sparse', None)
+    pages = [(1, False, None), (2, True, 'End')]
+    
+    with pytest.raises(ImportError, match='scipy'):
+        analyze_graph(1, pages, [(1, 2, False, 1)], use_sparse=True)
+    assert analyze_graph(1, pages, [(1, 2, False, 1)])['solver'] == 'dense'
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import os
+import pytest
+from app import create_app
+from app.async_api import ReadDispatcher, create_async_app
+from app.extensions import db
+from tests.conftest import TestConfig
+
+
+@pytest.fixture
+def apps(tmp_path):
+    """Sync and async apps on the same file database (both share one cache)"""
+    database = tmp_path / 'async.db'
+    
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{database}'
+    
+    sync_app = create_app(FileConfig)
+    async_app = create_async_app(FileConfig, sync_app.extensions['response_cache'])
+    with sync_app.app_context():
+        db.create_all()
+        client = sync_app.test_client()
+        client.post('/stories/import',
+            data=json.dumps({
+                'title': 'Async',
+                'pages': [{'text': 'Start'}, {'text': 'End', 'is_ending': True}],
+                'choices': [{'from_page': 0, 'to_page': 1, 'text': 'Go', 'dice_required': True, 'min_roll': 3}]
+            }),
+            headers={'X-API-KEY': 'test-api-key', 'Content-Type': 'application/json'})
+        yield sync_app, async_app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def async_get(app, url, headers=None):
+    async def fetch():
+        response = await app.test_client().get(url, headers=headers)
+        return response.status_code, await response.get_json(), response.headers
+    return asyncio.run(fetch())
+
+
+@pytest.mark.parametrize('url', [
+    '/stories?status=',
+    '/stories?status=&limit=1&fields=title',
+    '/stories?status=&limit=5&author_id=0',
+    '/stories/1',
+    '/stories/1?fields=title,status',
+    '/stories/1/start',
+    '/stories/1/tree',
+    '/stories/1/tree?layout=layered',
+    '/pages/1',
+    '/pages/1?fields=text&include=choices',
+    '/stories/99',
+    '/pages/99',
+])
+def test_async_reads_match_sync_app(apps, url):
+    """Test that every async read returns what the sync route returns"""
+    sync_app, async_app = apps
+    expected = sync_app.test_client().get(url)
+    
+    status, data, headers = async_get(async_app, url)
+    assert status == expected.status_code
+    assert data == expected.get_json()
+    assert headers.get('ETag') == expected.headers.get('ETag')
+
+
+@pytest.mark.parametrize('url', ['/stories/1/start', '/stories/1/tree', '/pages/2', '/pages/1?fields=text'])
+def test_async_reads_published_snapshot(apps, url):
+    """Test that the async app serves the same published snapshot as the sync app"""
+    sync_app, async_app = apps
+    client = sync_app.test_client()
+    headers = {'X-API-KEY': 'test-api-key', 'Content-Type': 'application/json'}
+    client.put('/stories/1', data=json.dumps({'status': 'published'}), headers=headers)
+    client.put('/pages/1', data=json.dumps({'text': 'Draft edit'}), headers=headers)
+    expected = client.get(url)
+    
+    status, data, response_headers = async_get(async_app, url)
+    assert status == expected.status_code == 200
+    assert data == expected.get_json()
+    assert response_headers['X-Snapshot'] == 'HIT'
+    assert response_headers['ETag'] == expected.headers['ETag']
+
+
+@pytest.mark.parametrize('url', ['/stories/1/start?draft=1', '/stories/1/tree?draft=1', '/pages/1?draft=1'])
+def test_async_draft_reads_match_sync_app(apps, url):
+    """Test that ?draft=1 reads the live rows of a published story in both apps"""
+    sync_app, async_app = apps
+    client = sync_app.test_client()
+    headers = {'X-API-KEY': 'test-api-key', 'Content-Type': 'application/json'}
+    client.put('/stories/1', data=json.dumps({'status': 'published'}), headers=headers)
+    client.put('/pages/1', data=json.dumps({'text': 'Draft edit'}), headers=headers)
+    expected = client.get(url, headers=headers)
+    
+    status, data, response_headers = async_get(async_app, url, headers)
+    assert status == expected.status_code == 200
+    assert data == expected.get_json()
+    assert 'X-Snapshot' not in response_headers
+    assert async_get(async_app, url)[0] == 401
+
+
+def test_async_conditional_get(apps):
+    """Test that the async app answers a matching If-None-Match with 304"""
+    sync_app, async_app = apps
+    etag = sync_app.test_client().get('/stories/1/tree').headers['ETag']
+    
+    status, _, _ = async_get(async_app, '/stories/1/tree', {'If-None-Match': etag})
+    assert status == 304
+
+
+def test_dispatcher_routes_only_async_reads(apps):
+    """Test that writes and other reads fall through to the sync app"""
+    sync_app, async_app = apps
+    dispatcher = ReadDispatcher(async_app, sync_app)
+    scope = lambda method, path: {'type': 'http', 'method': method, 'path': path}
+    
+    assert dispatcher.is_async_read(scope('GET', '/stories/1/tree'))
+    assert dispatcher.is_async_read(scope('GET', '/pages/3'))
+    assert not dispatcher.is_async_read(scope('PUT', '/pages/3'))
+    assert not dispatcher.is_async_read(scope('GET', '/stories/1/bundle'))
+    assert not dispatcher.is_async_read(scope('GET', '/stories/search'))
+
+
+def test_async_app_resolves_relative_sqlite_path(tmp_path, monkeypatch):
+    """Test that a relative SQLite URI opens the sync app's instance-folder file"""
+    monkeypatch.chdir(tmp_path)
+    name = f'async-relative-{os.getpid()}.db'
+    
+    class RelativeConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{name}'
+    
+    sync_app = create_app(RelativeConfig)
+    async_app = create_async_app(RelativeConfig, sync_app.extensions['response_cache'])
+    path = os.path.join(sync_app.instance_path, name)
+    try:
+        with sync_app.app_context():
+            db.create_all()
+            sync_app.test_client().post('/stories',
+                data=json.dumps({'title': 'Relative'}),
+                headers={'X-API-KEY': 'test-api-key', 'Content-Type': 'application/json'})
+            db.engine.dispose()
+        
+        status, data, _ = async_get(async_app, '/stories/1')
+        assert status == 200
+        assert data['title'] == 'Relative'
+        assert not (tmp_path / name).exists()
+    finally:
+        os.remove(path)
@@ -0,0 +1,94 @@
+import gzip
+import json
+import pytest
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+from app.middleware.compression import choose_encoding, compress
+
+
+@pytest.fixture
+def story_id(client, auth_headers):
+    response = client.post('/stories/import',
+        data=json.dumps({
+            'title': 'Long',
+            'pages': [{'text': f'Page {i} ' + 'words ' * 50, 'is_ending': i == 29} for i in range(30)],
+            'choices': [{'from_page': i, 'to_page': i + 1, 'text': 'Onward'} for i in range(29)]
+        }),
+        headers=auth_headers)
+    return response.get_json()['id']
+
+
+def test_large_json_is_gzipped(client, story_id):
+    """Test that responses above the threshold are compressed when accepted"""
+    plain = client.get(f'/stories/{story_id}/bundle')
+    response = client.get(f'/stories/{story_id}/bundle', headers={'Accept-Encoding': 'gzip'})
+    
+    assert 'Content-Encoding' not in plain.headers
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert len(response.data) * 5 < len(plain.data)
+    assert json.loads(gzip.decompress(response.data)) == plain.get_json()
+
+
+def test_small_json_is_not_compressed(client, story_id):
+    """Test that bodies below the threshold are sent as-is"""
+    response = client.get('/choices/1', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_compressed_etag_still_validates(client, story_id):
+    """Test that the weak ETag of a compressed copy is answered with 304"""
+    headers = {'Accept-Encoding': 'gzip'}
+    response = client.get(f'/stories/{story_id}/tree', headers=headers)
+    etag = response.headers['ETag']
+    assert etag.startswith('W/')
+    
+    response = client.get(f'/stories/{story_id}/tree', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+
+
+def test_cache_hits_reuse_the_compressed_body(client, story_id, monkeypatch):
+    """Test that a cached response is compressed once per encoding, not per hit"""
+    from app.middleware import compression
+    calls = []
+    
+    def counting_compress(body, encoding, *args):
+        calls.append(encoding)
+        return compress(body, encoding, *args)
+    
+    monkeypatch.setattr(compression, 'compress', counting_compress)
+    headers = {'Accept-Encoding': 'gzip'}
+    first = client.get(f'/stories/{story_id}/bundle', headers=headers)
+    second = client.get(f'/stories/{story_id}/bundle', headers=headers)
+    plain = client.get(f'/stories/{story_id}/bundle')
+    
+    assert (first.headers['X-Cache'], second.headers['X-Cache']) == ('MISS', 'HIT')
+    assert calls == ['gzip']
+    assert second.headers['Content-Encoding'] == 'gzip'
+    assert second.data == first.data
+    assert json.loads(gzip.decompress(second.data)) == plain.get_json()
+
+
+def test_edit_drops_the_compressed_body(client, auth_headers, story_id):
+    """Test that a new story version is compressed afresh"""
+    headers = {'Accept-Encoding': 'gzip'}
+    before = client.get(f'/stories/{story_id}/bundle', headers=headers)
+    client.put(f'/stories/{story_id}', data=json.dumps({'title': 'Longer'}), headers=auth_headers)
+    after = client.get(f'/stories/{story_id}/bundle', headers=headers)
+    
+    assert after.headers['X-Cache'] == 'MISS'
+    assert after.data != before.data
+    assert json.loads(gzip.decompress(after.data))['story']['title'] == 'Longer'
+
+
+@pytest.mark.parametrize('header,available,expected', [
+    ('gzip, deflate', ('br', 'gzip'), 'gzip'),
+    ('br;q=1.0, gzip;q=0.5', ('br', 'gzip'), 'br'),
+    ('br, gzip', ('gzip',), 'gzip'),
+    ('gzip;q=0', ('gzip',), None),
+    ('*', ('gzip',), 'gzip'),
+    ('identity', ('gzip',), None),
+])
+def test_choose_encoding(header, available, expected):
+    """Test Accept-Encoding negotiation"""
+    assert choose_encoding(parse_accept_header(header, Accept), available) == expected
@@ -0,0 +1,66 @@
+import json
+import pytest
+
+
+@pytest.fixture
+def story(client, auth_headers):
+    client.post('/stories',
+        data=json.dumps({'title': 'Versioned', 'author_id': 1}),
+        headers=auth_headers)
+    client.post('/stories/1/pages',
+        data=json.dumps({'text': 'Start page'}),
+        headers=auth_headers)
+    client.post('/stories/1/pages',
+        data=json.dumps({'text': 'The end', 'is_ending': True}),
+        headers=auth_headers)
+    client.post('/pages/1/choices',
+        data=json.dumps({'text': 'Go on', 'next_page_id': 2}),
+        headers=auth_headers)
+    return 1
+
+
+@pytest.mark.parametrize('url', ['/stories/1', '/stories/1/tree', '/stories/1/start', '/pages/1'])
+def test_if_none_match_returns_304(client, story, url):
+    """Test that a matching ETag is answered with an empty 304"""
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers['ETag']
+    assert response.headers['Last-Modified']
+    
+    response = client.get(url, headers={'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
+    assert response.data == b''
+
+
+def test_choice_edit_changes_story_etags(client, auth_headers, story):
+    """Test that editing a choice invalidates the story's ETags"""
+    before = {url: client.get(url).headers['ETag'] for url in ('/stories/1', '/pages/2')}
+    
+    client.put('/choices/1',
+        data=json.dumps({'text': 'Keep going'}),
+        headers=auth_headers)
+    
+    for url, etag in before.items():
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+
+@pytest.mark.parametrize('urls', [
+    ['/stories/1', '/stories/1?fields=id', '/stories/1?fields=title,id'],
+    ['/pages/1', '/pages/1?fields=id', '/pages/1?fields=id&include=choices'],
+])
+def test_fieldsets_have_their_own_etags(client, story, urls):
+    """Test that an ETag from one fieldset does not validate another"""
+    etags = [client.get(url).headers['ETag'] for url in urls]
+    assert len(set(etags)) == len(urls)
+    
+    for url in urls[1:]:
+        response = client.get(url, headers={'If-None-Match': etags[0]})
+        assert response.status_code == 200
+
+
+def test_fieldset_etag_ignores_field_order(client, story):
+    """Test that the same fieldset listed in another order keeps its ETag"""
+    etag = client.get('/stories/1?fields=title,id').headers['ETag']
+    assert client.get('/stories/1?fields=id,title', headers={'If-None-Match': etag}).status_code == 304
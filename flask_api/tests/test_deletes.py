@@ -0,0 +1,99 @@
+import json
+import pytest
+from app.extensions import db
+from app.models import Story, Page, Choice, PageSnapshot
+
+
+def import_story(client, auth_headers, pages):
+    """Linear story of `pages` pages, one choice per page"""
+    response = client.post('/stories/import',
+        data=json.dumps({
+            'title': 'Deletable',
+            'pages': [{'text': f'Page {i}', 'is_ending': i == pages - 1} for i in range(pages)],
+            'choices': [{'from_page': i, 'to_page': i + 1, 'text': 'Next'} for i in range(pages - 1)]
+        }),
+        headers=auth_headers)
+    return json.loads(response.data)['id']
+
+
+@pytest.mark.parametrize('pages', [2, 200])
+def test_delete_story_query_count_is_constant(client, auth_headers, query_budget, pages):
+    """Test that deleting a story issues the same statements however big it is"""
+    story_id = import_story(client, auth_headers, pages)
+    
+    with query_budget(10):
+        response = client.delete(f'/stories/{story_id}', headers=auth_headers)
+    assert response.status_code == 200
+    assert Page.query.count() == 0
+    assert Choice.query.count() == 0
+    assert client.get(f'/stories/{story_id}').status_code == 404
+
+
+def test_delete_story_unlinks_other_stories(client, auth_headers):
+    """Test that choices of another story leading into a deleted story are cleared"""
+    doomed = import_story(client, auth_headers, 2)
+    other = import_story(client, auth_headers, 2)
+    client.post(f'/pages/3/choices', data=json.dumps({'text': 'Portal', 'next_page_id': 1}), headers=auth_headers)
+    version = db.session.get(Story, other).version
+    etag = client.get('/pages/3').headers['ETag']
+    
+    client.delete(f'/stories/{doomed}', headers=auth_headers)
+    
+    db.session.expire_all()
+    portal = Choice.query.filter_by(text='Portal').one()
+    assert portal.next_page_id is None
+    assert db.session.get(Story, other).version == version + 1
+    assert client.get('/pages/3', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_delete_story_removes_search_rows_and_snapshot(client, auth_headers):
+    """Test that the set-based delete reaches the search index and snapshots"""
+    story_id = import_story(client, auth_headers, 2)
+    client.put(f'/stories/{story_id}', data=json.dumps({'status': 'published'}), headers=auth_headers)
+    
+    client.delete(f'/stories/{story_id}', headers=auth_headers)
+    
+    assert PageSnapshot.query.count() == 0
+    assert json.loads(client.get('/stories/search?status=&q=page').data)['stories'] == []
+
+
+def test_delete_page_unlinks_choices_and_start(client, auth_headers):
+    """Test that deleting a page clears choices and the start page pointing at it"""
+    story_id = import_story(client, auth_headers, 3)
+    version = db.session.get(Story, story_id).version
+    
+    assert client.delete('/pages/1', headers=auth_headers).status_code == 200
+    assert client.delete('/pages/2', headers=auth_headers).status_code == 200
+    
+    db.session.expire_all()
+    story = db.session.get(Story, story_id)
+    assert story.start_page_id is None
+    assert story.version == version + 2
+    assert Choice.query.count() == 0
+    assert [page.id for page in Page.query.all()] == [3]
+
+
+def test_delete_missing_returns_404(client, auth_headers):
+    """Test JSON 404s for unknown stories and pages"""
+    assert client.delete('/stories/99', headers=auth_headers).status_code == 404
+    assert client.delete('/pages/99', headers=auth_headers).status_code == 404
+
+
+def test_deleted_published_page_keeps_its_own_copy(client, auth_headers):
+    """Test that pages created after deleting a published page read their own content"""
+    published = import_story(client, auth_headers, 2)
+    client.put(f'/stories/{published}', data=json.dumps({'status': 'published'}), headers=auth_headers)
+    client.delete('/pages/2', headers=auth_headers)
+    
+    other = import_story(client, auth_headers, 2)
+    response = client.put(f'/stories/{other}', data=json.dumps({'status': 'published'}), headers=auth_headers)
+    assert response.status_code == 200
+    response = client.post(f'/stories/{published}/pages', data=json.dumps({'text': 'Recreated'}), headers=auth_headers)
+    recreated = json.loads(response.data)['id']
+    
+    assert recreated not in (1, 2, 3, 4)
+    assert json.loads(client.get('/pages/2').data)['text'] == 'Page 1'
+    for page_id in (3, 4):
+        assert json.loads(client.get(f'/pages/{page_id}').data)['story_id'] == other
+    page = json.loads(client.get(f'/pages/{recreated}').data)
+    assert (page['story_id'], page['text']) == (published, 'Recreated')
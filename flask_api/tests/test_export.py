@@ -0,0 +1,39 @@
+import json
+from app.services import StoryService
+
+
+def test_export_streams_ndjson(client, auth_headers):
+    """Test that every story is exported as one JSON line with its graph"""
+    for i in range(3):
+        client.post('/stories/import',
+            data=json.dumps({
+                'title': f'Story {i}',
+                'pages': [{'text': 'Start'}, {'text': 'End', 'is_ending': True}],
+                'choices': [{'from_page': 0, 'to_page': 1, 'text': 'Go', 'dice_required': True, 'min_roll': 3}]
+            }),
+            headers=auth_headers)
+    
+    response = client.get('/stories/export')
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'application/x-ndjson'
+    
+    lines = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [story['title'] for story in lines] == ['Story 0', 'Story 1', 'Story 2']
+    assert [len(story['pages']) for story in lines] == [2, 2, 2]
+    choice = lines[1]['pages'][0]['choices'][0]
+    assert choice['next_page_id'] == lines[1]['pages'][1]['id']
+    assert choice['min_roll'] == 3
+
+
+def test_export_batches_stories(app, client, auth_headers, query_budget):
+    """Test that queries grow with the number of batches, not of stories"""
+    for i in range(10):
+        client.post('/stories/import',
+            data=json.dumps({'title': f'Story {i}', 'pages': [{'text': 'Only page'}]}),
+            headers=auth_headers)
+    
+    with query_budget(1 + 2 * 4):
+        stories = list(StoryService.iter_export(batch_size=3))
+    assert len(stories) == 10
+    assert all(len(story['pages']) == 1 for story in stories)
@@ -0,0 +1,73 @@
+import json
+import pytest
+
+
+@pytest.fixture
+def story(client, auth_headers):
+    response = client.post('/stories/import',
+        data=json.dumps({
+            'title': 'Sparse',
+            'description': 'A long description',
+            'pages': [{'text': 'Start'}, {'text': 'End', 'is_ending': True}],
+            'choices': [{'from_page': 0, 'to_page': 1, 'text': 'Go'}]
+        }),
+        headers=auth_headers)
+    return response.get_json()
+
+
+def test_story_list_selects_only_requested_columns(client, story, query_budget):
+    """Test that ?fields= skips unrequested columns and the page count subquery"""
+    with query_budget(1) as issued:
+        response = client.get('/stories?status=&fields=title,status')
+    
+    assert response.status_code == 200
+    assert response.get_json() == [{'id': story['id'], 'title': 'Sparse', 'status': 'draft'}]
+    sql = issued[0].lower()
+    assert 'description' not in sql
+    assert 'count(' not in sql
+
+
+def test_story_page_with_fields_keeps_cursor(client, auth_headers, story):
+    """Test that keyset pages still return a cursor when created_at is not requested"""
+    client.post('/stories', data=json.dumps({'title': 'Second'}), headers=auth_headers)
+    
+    response = client.get('/stories?status=&limit=1&fields=title')
+    data = response.get_json()
+    assert list(data['stories'][0]) == ['id', 'title']
+    assert data['next_cursor']
+    
+    response = client.get(f"/stories?status=&limit=1&fields=title&cursor={data['next_cursor']}")
+    assert response.get_json()['stories'] == [{'id': story['id'], 'title': 'Sparse'}]
+
+
+def test_story_detail_fields_are_cached_separately(client, story):
+    """Test that a sparse response does not replace the full one in the cache"""
+    sparse = client.get(f"/stories/{story['id']}?fields=title")
+    full = client.get(f"/stories/{story['id']}")
+    
+    assert sparse.get_json() == {'id': story['id'], 'title': 'Sparse'}
+    assert full.get_json()['description'] == 'A long description'
+    assert full.headers['X-Cache'] == 'MISS'
+
+
+def test_page_fields_and_include_choices(client, story):
+    """Test that choices are only nested when included"""
+    page_id = story['start_page_id']
+    
+    data = client.get(f'/pages/{page_id}?fields=text').get_json()
+    assert data == {'id': page_id, 'text': 'Start'}
+    
+    data = client.get(f'/pages/{page_id}?fields=text&include=choices').get_json()
+    assert data['text'] == 'Start'
+    assert [c['text'] for c in data['choices']] == ['Go']
+    
+    data = client.get(f'/pages?ids={page_id}&fields=is_ending').get_json()
+    assert data == [{'id': page_id, 'is_ending': False}]
+
+
+@pytest.mark.parametrize('url', ['/stories?fields=title,secret', '/pages/1?fields=nope', '/choices/1?fields=x'])
+def test_unknown_field_is_rejected(client, story, url):
+    """Test that unknown fields return 400"""
+    response = client.get(url)
+    assert response.status_code == 400
+    assert 'Unknown field' in response.get_json()['error']
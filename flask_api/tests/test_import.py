@@ -0,0 +1,57 @@
+import json
+from app.models import Story, Page, Choice
+
+
+STORY = {
+    'title': 'Imported',
+    'author_id': 1,
+    'pages': [
+        {'key': 'start', 'text': 'You stand at a fork.'},
+        {'key': 'left', 'text': 'A dragon!', 'is_ending': True, 'ending_label': 'Eaten'},
+        {'key': 'right', 'text': 'Treasure!', 'is_ending': True, 'ending_label': 'Rich'},
+    ],
+    'choices': [
+        {'from_page': 'start', 'to_page': 'left', 'text': 'Go left'},
+        {'from_page': 'start', 'to_page': 'right', 'text': 'Go right', 'dice_required': True, 'min_roll': 4},
+    ]
+}
+
+
+def test_import_story(client, auth_headers):
+    """Test importing a whole story graph"""
+    response = client.post('/stories/import', data=json.dumps(STORY), headers=auth_headers)
+    assert response.status_code == 201
+    story = json.loads(response.data)
+    assert story['page_count'] == 3
+    
+    start = json.loads(client.get(f"/stories/{story['id']}/start").data)
+    assert start['id'] == story['start_page_id']
+    assert start['text'] == 'You stand at a fork.'
+    assert [c['text'] for c in start['choices']] == ['Go left', 'Go right']
+    assert start['choices'][1]['min_roll'] == 4
+    
+    target = json.loads(client.get(f"/pages/{start['choices'][1]['next_page_id']}").data)
+    assert target['ending_label'] == 'Rich'
+
+
+def test_import_story_with_index_keys(client, auth_headers):
+    """Test that pages default to their list index as key"""
+    data = {
+        'title': 'Indexed',
+        'pages': [{'text': 'One'}, {'text': 'Two', 'is_start': True}],
+        'choices': [{'from_page': 1, 'to_page': 0, 'text': 'Back'}]
+    }
+    response = client.post('/stories/import', data=json.dumps(data), headers=auth_headers)
+    story = json.loads(response.data)
+    start = json.loads(client.get(f"/stories/{story['id']}/start").data)
+    assert start['text'] == 'Two'
+
+
+def test_import_story_invalid_is_atomic(client, auth_headers):
+    """Test that an invalid graph is rejected without writing anything"""
+    data = dict(STORY, choices=STORY['choices'] + [{'from_page': 'start', 'to_page': 'nowhere', 'text': 'Oops'}])
+    response = client.post('/stories/import', data=json.dumps(data), headers=auth_headers)
+    assert response.status_code == 400
+    assert Story.query.count() == 0
+    assert Page.query.count() == 0
+    assert Choice.query.count() == 0
@@ -0,0 +1,55 @@
+"""
+Query plans for the hot filters - each must be answered from an index,
+never by a full scan of stories, pages or choices.
+"""
+from datetime import datetime
+import pytest
+from app.extensions import db
+from app.models import Story, Page, Choice
+
+
+def query_plan(statement):
+    """EXPLAIN QUERY PLAN details of a SQLAlchemy statement"""
+    compiled = statement.compile(dialect=db.engine.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + str(compiled), params).all()
+    return [row[-1] for row in rows]
+
+
+HOT_QUERIES = {
+    'pages of a story': lambda: db.select(Page.id).where(Page.story_id == 1).order_by(Page.id),
+    'choices of a page': lambda: db.select(Choice).where(Choice.page_id == 1).order_by(Choice.id),
+    'choices leading to a page': lambda: db.select(Choice.id).where(Choice.next_page_id == 1),
+    'stories by status': lambda: (db.select(Story.id)
+                                  .where(Story.status == 'published')
+                                  .order_by(Story.created_at.desc())),
+    'stories by status, keyset page': lambda: (
+        db.select(Story.id)
+        .where(Story.status == 'published', db.or_(
+            Story.created_at < datetime(2024, 1, 1),
+            db.and_(Story.created_at == datetime(2024, 1, 1), Story.id < 10)
+        ))
+        .order_by(Story.created_at.desc(), Story.id.desc())
+        .limit(21)
+    ),
+    'stories by author': lambda: (db.select(Story.id)
+                                  .where(Story.author_id == 1)
+                                  .order_by(Story.created_at.desc())),
+    'story with page count': lambda: db.select(Story.id, Story.page_count).where(Story.id == 1),
+    'choices of a story': lambda: (db.select(Choice.id)
+                                   .join(Page, Choice.page_id == Page.id)
+                                   .where(Page.story_id == 1)),
+}
+
+
+@pytest.mark.parametrize('name', HOT_QUERIES)
+def test_hot_query_uses_index(app, name):
+    """Test that the hot query neither scans a table nor sorts in a temp b-tree"""
+    with app.app_context():
+        plan = query_plan(HOT_QUERIES[name]())
+    
+    for detail in plan:
+        assert detail not in ('SCAN stories', 'SCAN pages', 'SCAN choices'), plan
+        assert 'TEMP B-TREE' not in detail, plan
+    assert any('USING' in detail for detail in plan), plan
@@ -0,0 +1,46 @@
+import json
+import re
+from app.middleware.metrics import RequestMetrics
+
+
+def metric(text, name, **labels):
+    """Value of one sample in a Prometheus text exposition"""
+    wanted = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf'^{re.escape(name)}\{{{re.escape(wanted)}\}} (\S+)$', text, re.M)
+    return float(match.group(1)) if match else None
+
+
+def test_metrics_count_requests_statuses_and_sql(client, auth_headers):
+    """Test that each endpoint reports its requests, status codes and SQL"""
+    client.post('/stories', data=json.dumps({'title': 'Counted'}), headers=auth_headers)
+    client.get('/stories/1')
+    client.get('/stories/1')
+    client.get('/stories/999')
+    
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.data.decode()
+    
+    labels = {'blueprint': 'stories', 'endpoint': 'stories.get_story'}
+    assert metric(text, 'http_requests_total', **labels, status='200') == 2
+    assert metric(text, 'http_requests_total', **labels, status='404') == 1
+    assert metric(text, 'http_request_duration_seconds_count', **labels) == 3
+    assert metric(text, 'http_request_duration_seconds_bucket', **labels, le='+Inf') == 3
+    # Version lookup on every request, the story itself once (then cached)
+    assert metric(text, 'db_statements_total', **labels) == 4
+    assert metric(text, 'db_statement_seconds_total', **labels) > 0
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test bucket counts and label escaping in the exposition"""
+    metrics = RequestMetrics(buckets=(0.1, 1.0))
+    metrics.observe('bp', 'bp.view"x', 200, 0.05, 1, 0.01)
+    metrics.observe('bp', 'bp.view"x', 200, 0.5, 1, 0.01)
+    text = metrics.render()
+    
+    labels = {'blueprint': 'bp', 'endpoint': 'bp.view\\"x'}
+    assert metric(text, 'http_request_duration_seconds_bucket', **labels, le='0.1') == 1
+    assert metric(text, 'http_request_duration_seconds_bucket', **labels, le='1') == 2
+    assert metric(text, 'http_request_duration_seconds_bucket', **labels, le='+Inf') == 2
+    assert metric(text, 'db_statements_total', **labels) == 2
@@ -0,0 +1,14 @@
+from app import create_app
+from tests.conftest import TestConfig
+
+
+def test_migrations_match_models(tmp_path):
+    """Test that the migrated schema matches the models, search index included"""
+    class MigratedConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "migrated.db"}'
+    
+    runner = create_app(MigratedConfig).test_cli_runner()
+    assert runner.invoke(args=['db', 'upgrade']).exit_code == 0
+    
+    result = runner.invoke(args=['db', 'check'])
+    assert result.exit_code == 0, result.output
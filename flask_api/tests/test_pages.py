@@ -0,0 +1,73 @@
+import json
+import pytest
+
+
+@pytest.fixture
+def story(client, auth_headers):
+    client.post('/stories/import',
+        data=json.dumps({
+            'title': 'Pages',
+            'pages': [{'text': 'One'}, {'text': 'Two'}, {'text': 'Three', 'is_ending': True}],
+            'choices': [
+                {'from_page': 0, 'to_page': 1, 'text': 'To two'},
+                {'from_page': 1, 'to_page': 2, 'text': 'To three'},
+            ]
+        }),
+        headers=auth_headers)
+    return 1
+
+
+def test_get_pages_by_ids(client, story):
+    """Test fetching several pages in the requested order"""
+    response = client.get('/pages?ids=3,1,99,1')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [p['id'] for p in data] == [3, 1]
+    assert data[1]['choices'][0]['text'] == 'To two'
+
+
+def test_get_choices_by_ids(client, story):
+    """Test fetching several choices at once"""
+    data = json.loads(client.get('/choices?ids=2,1').data)
+    assert [c['text'] for c in data] == ['To three', 'To two']
+
+
+@pytest.mark.parametrize('query', ['', '?ids=', '?ids=1,a'])
+def test_get_pages_bad_ids(client, query):
+    """Test that a missing or malformed id list is rejected"""
+    assert client.get('/pages' + query).status_code == 400
+
+
+def test_resolve_choice(client, story, query_budget):
+    """Test that resolving a choice returns it with the next page and its choices"""
+    with query_budget(4):
+        response = client.post('/pages/1/choices/1/resolve')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['choice']['text'] == 'To two'
+    assert data['page']['id'] == 2
+    assert data['page']['choices'][0]['next_page_id'] == 3
+
+
+def test_resolve_choice_from_snapshot(client, auth_headers, story, query_budget):
+    """Test that a published page resolves from its snapshot, ignoring draft edits"""
+    client.put('/stories/1', data=json.dumps({'status': 'published'}), headers=auth_headers)
+    client.put('/pages/2', data=json.dumps({'text': 'Draft'}), headers=auth_headers)
+    
+    with query_budget(2):
+        response = client.post('/pages/1/choices/1/resolve')
+    assert json.loads(response.data)['page']['text'] == 'Two'
+
+
+@pytest.mark.parametrize('url', ['/pages/1/choices/2/resolve', '/pages/99/choices/1/resolve'])
+def test_resolve_choice_not_on_page(client, story, url):
+    """Test that a choice of another page is rejected"""
+    response = client.post(url)
+    assert response.status_code == 404
+    assert json.loads(response.data)['error'] == 'Choice not found on this page'
+
+
+def test_resolve_choice_without_target(client, auth_headers, story):
+    """Test that a choice leading nowhere is reported"""
+    client.put('/choices/1', data=json.dumps({'next_page_id': None}), headers=auth_headers)
+    assert client.post('/pages/1/choices/1/resolve').status_code == 422
@@ -0,0 +1,52 @@
+"""
+Query budgets for read endpoints - each must issue a fixed number of SQL
+statements no matter how many stories, pages or choices exist.
+"""
+import json
+import pytest
+from app.extensions import db
+from app.models import Story, Page, Choice
+
+
+@pytest.fixture
+def catalogue(app):
+    """20 published stories with 10 pages and 2 choices per page"""
+    for s in range(20):
+        story = Story(title=f'Story {s}', author_id=1, status='published')
+        db.session.add(story)
+        db.session.flush()
+        pages = [Page(story_id=story.id, text=f'Page {i}', is_ending=(i == 9)) for i in range(10)]
+        db.session.add_all(pages)
+        db.session.flush()
+        story.start_page_id = pages[0].id
+        for i, page in enumerate(pages[:-1]):
+            db.session.add(Choice(page_id=page.id, text='Next', next_page_id=pages[i + 1].id))
+            db.session.add(Choice(page_id=page.id, text='Skip', next_page_id=pages[-1].id))
+    db.session.commit()
+    db.session.expunge_all()
+
+
+@pytest.mark.parametrize('url,budget', [
+    ('/stories', 1),
+    ('/stories?status=', 1),
+    ('/stories/1', 2),
+    ('/stories/1/start', 3),
+    ('/stories/1/tree', 4),
+    ('/stories/1/bundle', 4),
+    ('/pages/1', 3),
+    ('/choices/1', 1),
+    ('/pages?ids=' + ','.join(str(i) for i in range(1, 201)), 2),
+    ('/choices?ids=' + ','.join(str(i) for i in range(1, 201)), 1),
+])
+def test_read_endpoint_query_budget(client, catalogue, query_budget, url, budget):
+    """Read endpoints stay within a fixed query budget"""
+    with query_budget(budget):
+        response = client.get(url)
+    assert response.status_code == 200
+
+
+def test_story_list_page_count(client, catalogue):
+    """page_count is aggregated in the list query"""
+    stories = json.loads(client.get('/stories').data)
+    assert len(stories) == 20
+    assert all(s['page_count'] == 10 for s in stories)
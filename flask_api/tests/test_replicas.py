@@ -0,0 +1,120 @@
+import json
+import logging
+import sqlite3
+import pytest
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.middleware import slow_query_log
+from app.replicas import READ_PRIMARY_COOKIE, refresh_sqlite_replicas
+from tests.test_metrics import metric
+
+
+@pytest.fixture
+def replicated_app(tmp_path):
+    class ReplicaConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "primary.db"}'
+        SQLALCHEMY_REPLICA_URIS = [f'sqlite:///{tmp_path / "replica.db"}']
+        API_KEY = 'test-api-key'
+        RESPONSE_CACHE_SIZE = 0
+        SLOW_QUERY_LOG = str(tmp_path / 'slow.jsonl')
+        SLOW_QUERY_THRESHOLD_MS = 0
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        db.create_all()
+    refresh_sqlite_replicas(app)
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+    for engine in app.extensions['db_replicas']:
+        engine.dispose()
+    logger = logging.getLogger(f"{slow_query_log.__name__}.{app.config['SLOW_QUERY_LOG']}")
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def _titles(response):
+    return sorted(story['title'] for story in response.get_json())
+
+
+def test_reads_use_replica_and_writes_use_primary(replicated_app, auth_headers):
+    """Test that GETs read the replica while POSTs land on the primary"""
+    writer = replicated_app.test_client()
+    response = writer.post('/stories', json={'title': 'Fresh'}, headers=auth_headers)
+    assert response.status_code == 201
+
+    reader = replicated_app.test_client()
+    assert reader.get('/stories?status=draft').get_json() == []
+
+    refresh_sqlite_replicas(replicated_app)
+    assert _titles(reader.get('/stories?status=draft')) == ['Fresh']
+
+
+def test_writer_reads_its_own_writes(replicated_app, auth_headers):
+    """Test that the read-your-writes cookie keeps the writer on the primary"""
+    writer = replicated_app.test_client()
+    response = writer.post('/stories', json={'title': 'Mine'}, headers=auth_headers)
+    assert READ_PRIMARY_COOKIE in response.headers['Set-Cookie']
+
+    assert _titles(writer.get('/stories?status=draft')) == ['Mine']
+    assert replicated_app.test_client().get('/stories?status=draft').get_json() == []
+
+
+def test_refresh_cli_command(replicated_app):
+    """Test that `flask replicas refresh` copies the primary"""
+    result = replicated_app.test_cli_runner().invoke(args=['replicas', 'refresh'])
+    assert result.exit_code == 0
+    assert 'replica.db' in result.output
+
+
+@pytest.fixture
+def relative_app(tmp_path, monkeypatch):
+    """An app with relative SQLite paths, its instance folder in tmp_path/instance"""
+    class RelativeConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///primary.db'
+        SQLALCHEMY_REPLICA_URIS = ['sqlite:///replica.db']
+
+    monkeypatch.chdir(tmp_path)
+    app = create_app(RelativeConfig)
+    app.instance_path = str(tmp_path / 'instance')
+    (tmp_path / 'instance').mkdir()
+    return app
+
+
+def test_refresh_resolves_relative_paths(relative_app, tmp_path):
+    """Test that relative SQLite paths refer to the instance folder, as for the primary"""
+    sqlite3.connect(tmp_path / 'instance' / 'primary.db').execute('CREATE TABLE marker (id INTEGER)')
+
+    result = relative_app.test_cli_runner().invoke(args=['replicas', 'refresh'])
+    assert result.exit_code == 0
+    replica = sqlite3.connect(tmp_path / 'instance' / 'replica.db')
+    assert replica.execute("SELECT name FROM sqlite_master WHERE name = 'marker'").fetchone()
+    assert not (tmp_path / 'primary.db').exists() and not (tmp_path / 'replica.db').exists()
+
+
+def test_refresh_fails_without_primary(relative_app, tmp_path):
+    """Test that a missing primary is an error rather than an empty copy"""
+    result = relative_app.test_cli_runner().invoke(args=['replicas', 'refresh'])
+    assert result.exit_code != 0
+    assert 'not found' in result.output
+    assert list((tmp_path / 'instance').iterdir()) == []
+
+
+def test_replica_reads_are_measured(replicated_app, auth_headers):
+    """Test that statements run on a replica reach the metrics and the slow-query log"""
+    replicated_app.test_client().post('/stories', json={'title': 'Measured'}, headers=auth_headers)
+    refresh_sqlite_replicas(replicated_app)
+    
+    reader = replicated_app.test_client()
+    assert reader.get('/stories/1').status_code == 200
+    
+    text = reader.get('/metrics').data.decode()
+    assert metric(text, 'db_statements_total', blueprint='stories', endpoint='stories.get_story') > 0
+    
+    with open(replicated_app.config['SLOW_QUERY_LOG']) as log:
+        entries = [json.loads(line) for line in log]
+    assert any(entry['route'] and entry['route']['endpoint'] == 'stories.get_story' for entry in entries)
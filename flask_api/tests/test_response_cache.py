@@ -0,0 +1,64 @@
+import json
+import pytest
+from app.middleware.response_cache import ResponseCache
+
+
+@pytest.fixture
+def story(client, auth_headers):
+    client.post('/stories/import',
+        data=json.dumps({
+            'title': 'Cached',
+            'pages': [{'text': 'One'}, {'text': 'Two', 'is_ending': True}],
+            'choices': [{'from_page': 0, 'to_page': 1, 'text': 'Onward'}]
+        }),
+        headers=auth_headers)
+    return 1
+
+
+@pytest.mark.parametrize('url', ['/stories/1', '/stories/1/start', '/stories/1/tree', '/pages/1'])
+def test_second_read_is_a_hit(client, story, query_budget, url):
+    """Test that a repeated read is served from the cache after a version lookup"""
+    first = client.get(url)
+    assert first.headers['X-Cache'] == 'MISS'
+    
+    with query_budget(1):
+        second = client.get(url)
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.data == first.data
+
+
+def test_write_invalidates_story_entries(client, auth_headers, story):
+    """Test that editing a choice drops and refreshes cached pages"""
+    client.get('/pages/1')
+    client.put('/choices/1', data=json.dumps({'text': 'Forward'}), headers=auth_headers)
+    
+    response = client.get('/pages/1')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert json.loads(response.data)['choices'][0]['text'] == 'Forward'
+
+
+def test_cache_stats(client, story):
+    """Test hit/miss counters"""
+    client.get('/pages/1')
+    client.get('/pages/1')
+    stats = json.loads(client.get('/cache/stats').data)
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['entries'] == 1
+
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted first"""
+    cache = ResponseCache(max_entries=2)
+    cache.set('a', b'1', story_id=1)
+    cache.set('b', b'2', story_id=1)
+    cache.get('a')
+    cache.set('c', b'3', story_id=2)
+    
+    assert cache.get('b') is None
+    assert cache.get('a') == b'1'
+    assert cache.evictions == 1
+    
+    cache.invalidate_story(1)
+    assert cache.get('a') is None
+    assert cache.get('c') == b'3'
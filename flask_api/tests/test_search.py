@@ -0,0 +1,66 @@
+import json
+
+
+def import_story(client, auth_headers, title, description, pages):
+    client.post('/stories/import',
+        data=json.dumps({
+            'title': title,
+            'description': description,
+            'pages': [{'text': text} for text in pages]
+        }),
+        headers=auth_headers)
+
+
+def search(client, query):
+    response = client.get(f'/stories/search?status=&{query}')
+    assert response.status_code == 200
+    return json.loads(response.data)
+
+
+def test_search_ranks_titles_first(client, auth_headers):
+    """Test that page text is searched and title matches rank higher"""
+    import_story(client, auth_headers, 'Harbor Lights', 'A quiet town', ['A dragon sleeps in the bay.'])
+    import_story(client, auth_headers, 'Dragon Quest', 'Slay the beast', ['The cave is dark.'])
+    import_story(client, auth_headers, 'Space Station', 'Alarms', ['Nothing here.'])
+    
+    data = search(client, 'q=dragon')
+    assert [s['title'] for s in data['stories']] == ['Dragon Quest', 'Harbor Lights']
+    
+    data = search(client, 'q=drag')
+    assert len(data['stories']) == 2
+
+
+def test_search_follows_edits_and_deletes(client, auth_headers):
+    """Test that the index tracks page edits and story deletion"""
+    import_story(client, auth_headers, 'Story', 'Plain', ['Nothing special.'])
+    assert search(client, 'q=wizard')['stories'] == []
+    
+    client.put('/pages/1', data=json.dumps({'text': 'A wizard appears.'}), headers=auth_headers)
+    assert [s['id'] for s in search(client, 'q=wizard')['stories']] == [1]
+    
+    client.delete('/stories/1', headers=auth_headers)
+    assert search(client, 'q=wizard')['stories'] == []
+
+
+def test_search_pagination(client, auth_headers):
+    """Test limit/offset paging over ranked results"""
+    for i in range(5):
+        import_story(client, auth_headers, f'Forest {i}', '', ['Trees.'])
+    
+    first = search(client, 'q=forest&limit=3')
+    second = search(client, f"q=forest&limit=3&offset={first['next_offset']}")
+    assert len(first['stories']) == 3
+    assert len(second['stories']) == 2
+    assert second['next_offset'] is None
+
+
+def test_search_published_only_by_default(client, auth_headers):
+    """Test that drafts are hidden unless another status is asked for"""
+    import_story(client, auth_headers, 'Secret Draft', '', ['Hidden.'])
+    data = json.loads(client.get('/stories/search?q=secret').data)
+    assert data['stories'] == []
+
+
+def test_search_requires_query(client):
+    """Test that an empty query is rejected"""
+    assert client.get('/stories/search?q=%22%22').status_code == 400
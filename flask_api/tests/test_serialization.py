@@ -0,0 +1,40 @@
+import json
+from datetime import datetime
+from app.models import Story, Page
+from app.schemas import encoding
+from app.services import StoryService, PageService
+
+
+def import_story(client, auth_headers):
+    response = client.post('/stories/import',
+        data=json.dumps({
+            'title': 'Rows',
+            'pages': [{'text': 'Start'}, {'text': 'End', 'is_ending': True, 'ending_label': 'Done'}],
+            'choices': [{'from_page': 0, 'to_page': 1, 'text': 'Go', 'dice_required': True, 'min_roll': 5}]
+        }),
+        headers=auth_headers)
+    return response.get_json()['id']
+
+
+def test_row_serializers_match_to_dict(app, client, auth_headers):
+    """Test that row-based reads produce the same dicts as the models"""
+    story_id = import_story(client, auth_headers)
+
+    with app.app_context():
+        story = Story.query.get(story_id)
+        pages = Page.query.filter_by(story_id=story_id).order_by(Page.id).all()
+
+        assert StoryService.get_story_data(story_id) == story.to_dict()
+        assert StoryService.get_story_bundle(story_id)['pages'] == [p.to_dict() for p in pages]
+        assert PageService.get_page_data(pages[0].id) == pages[0].to_dict()
+        assert PageService.get_pages_by_ids([pages[1].id, pages[0].id]) == [pages[1].to_dict(), pages[0].to_dict()]
+
+
+def test_dumps_handles_datetimes_with_both_backends(monkeypatch):
+    """Test that the stdlib fallback encodes the same bytes as orjson"""
+    data = {'at': datetime(2024, 1, 2, 3, 4, 5), 'n': [1, 2.5, None, True], 'text': 'é'}
+    fast = encoding.dumps(data)
+
+    monkeypatch.setattr(encoding, 'orjson', None)
+    assert json.loads(encoding.dumps(data)) == json.loads(fast)
+    assert json.loads(fast)['at'] == '2024-01-02T03:04:05'
@@ -0,0 +1,67 @@
+import json
+import logging
+import pytest
+from sqlalchemy import event
+from app import create_app
+from app.extensions import db
+from app.middleware import slow_query_log
+from tests.conftest import TestConfig
+
+
+@pytest.fixture
+def logged_app(tmp_path):
+    log_path = tmp_path / 'slow.jsonl'
+    
+    class SlowLogConfig(TestConfig):
+        SLOW_QUERY_LOG = str(log_path)
+        SLOW_QUERY_THRESHOLD_MS = 0
+    
+    app = create_app(SlowLogConfig)
+    with app.app_context():
+        db.create_all()
+        yield app, log_path
+        db.drop_all()
+    logger = logging.getLogger(f'{slow_query_log.__name__}.{log_path}')
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def test_slow_statements_are_logged_with_route_and_plan(logged_app):
+    """Test that each entry carries parameters, route, caller and query plan"""
+    app, log_path = logged_app
+    client = app.test_client()
+    client.post('/stories', data=json.dumps({'title': 'Slow'}),
+                headers={'X-API-KEY': 'test-api-key', 'Content-Type': 'application/json'})
+    client.get('/stories/1/tree')
+    
+    entries = [json.loads(line) for line in log_path.read_text().splitlines()]
+    tree = [e for e in entries if e['route'] and e['route']['endpoint'] == 'stories.get_story_tree']
+    assert tree
+    nodes = next(e for e in tree if 'FROM pages' in e['statement'] and 'JOIN' not in e['statement'])
+    assert nodes['route'] == {'method': 'GET', 'path': '/stories/1/tree', 'endpoint': 'stories.get_story_tree'}
+    assert nodes['caller'].startswith('story_service.get_story_tree:')
+    assert nodes['parameters'] == [1]
+    assert any('USING' in detail for detail in nodes['plan'])
+    assert nodes['duration_ms'] >= 0
+
+
+def test_slow_query_log_hooks_only_configured_engines(app, logged_app):
+    """Test that no engine hook or log handler is installed unless a log path is configured"""
+    logged, log_path = logged_app
+    assert app.config['SLOW_QUERY_LOG'] == ''
+    
+    with app.app_context():
+        engine = db.engine
+    with logged.app_context():
+        logged_engine = db.engine
+    for name, listener in (('before_cursor_execute', slow_query_log.start_statement),
+                           ('after_cursor_execute', slow_query_log.log_slow_statement)):
+        assert event.contains(logged_engine, name, listener)
+        assert not event.contains(engine, name, listener)
+    
+    # Only the configured file's logger has a handler
+    prefix = f'{slow_query_log.__name__}.'
+    handled = [name for name, logger in logging.Logger.manager.loggerDict.items()
+               if name.startswith(prefix) and getattr(logger, 'handlers', None)]
+    assert handled == [f'{prefix}{log_path}']
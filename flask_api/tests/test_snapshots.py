@@ -0,0 +1,131 @@
+import json
+from datetime import datetime
+import pytest
+from app.extensions import db
+from app.models import Page, PageSnapshot
+
+
+@pytest.fixture
+def published(client, auth_headers):
+    """A two-page story, published"""
+    client.post('/stories/import',
+        data=json.dumps({
+            'title': 'Snapshot',
+            'pages': [{'text': 'Start'}, {'text': 'End', 'is_ending': True}],
+            'choices': [{'from_page': 0, 'to_page': 1, 'text': 'Finish'}]
+        }),
+        headers=auth_headers)
+    client.put('/stories/1', data=json.dumps({'status': 'published'}), headers=auth_headers)
+    return 1
+
+
+def test_published_reads_come_from_snapshot(client, published, query_budget):
+    """Test that start, page and tree are answered by one snapshot lookup"""
+    for url in ['/stories/1/start', '/pages/2', '/stories/1/tree']:
+        with query_budget(1):
+            response = client.get(url)
+        assert response.status_code == 200
+        assert response.headers['X-Snapshot'] == 'HIT'
+    
+    start = json.loads(client.get('/stories/1/start').data)
+    assert start['text'] == 'Start'
+    assert start['choices'][0]['next_page_id'] == 2
+
+
+def test_draft_edits_are_hidden_until_republish(client, auth_headers, published):
+    """Test that editing a published story leaves readers on the snapshot"""
+    client.put('/pages/1', data=json.dumps({'text': 'Rewritten'}), headers=auth_headers)
+    client.post('/stories/1/pages', data=json.dumps({'text': 'New end', 'is_ending': True}), headers=auth_headers)
+    client.put('/choices/1', data=json.dumps({'next_page_id': 3}), headers=auth_headers)
+    client.delete('/pages/2', headers=auth_headers)
+    
+    assert json.loads(client.get('/pages/1').data)['text'] == 'Start'
+    assert json.loads(client.get('/pages/2').data)['text'] == 'End'
+    assert json.loads(client.get('/stories/1/start').data)['choices'][0]['next_page_id'] == 2
+    
+    response = client.put('/stories/1', data=json.dumps({'status': 'published'}), headers=auth_headers)
+    assert response.status_code == 200
+    
+    assert json.loads(client.get('/pages/1').data)['text'] == 'Rewritten'
+    assert client.get('/pages/2').status_code == 404
+    tree = json.loads(client.get('/stories/1/tree').data)
+    assert sorted(node['id'] for node in tree['nodes']) == [1, 3]
+
+
+def test_draft_reads_show_live_rows_to_authors(client, auth_headers, published):
+    """Test that ?draft=1 with the API key skips the snapshot of a published story"""
+    client.put('/pages/1', data=json.dumps({'text': 'Edited'}), headers=auth_headers)
+    client.post('/stories/1/pages', data=json.dumps({'text': 'New end', 'is_ending': True}), headers=auth_headers)
+    
+    page = client.get('/pages/1?draft=1', headers=auth_headers)
+    assert 'X-Snapshot' not in page.headers
+    assert json.loads(page.data)['text'] == 'Edited'
+    assert json.loads(client.get('/stories/1/start?draft=1', headers=auth_headers).data)['text'] == 'Edited'
+    assert json.loads(client.get('/pages/3?draft=1', headers=auth_headers).data)['text'] == 'New end'
+    for url in ['/stories/1/tree?draft=1', '/stories/1/tree?draft=1&layout=layered']:
+        tree = json.loads(client.get(url, headers=auth_headers).data)
+        assert sorted(node['id'] for node in tree['nodes']) == [1, 2, 3]
+    
+    assert client.get('/pages/1?draft=1').status_code == 401
+    assert json.loads(client.get('/pages/1').data)['text'] == 'Start'
+
+
+def test_snapshot_etag_changes_on_republish(client, auth_headers, published):
+    """Test conditional GETs against the snapshot version"""
+    etag = client.get('/pages/1').headers['ETag']
+    assert client.get('/pages/1', headers={'If-None-Match': etag}).status_code == 304
+    
+    client.put('/pages/1', data=json.dumps({'text': 'Edited'}), headers=auth_headers)
+    assert client.get('/pages/1', headers={'If-None-Match': etag}).status_code == 304
+    
+    client.put('/stories/1', data=json.dumps({'status': 'published'}), headers=auth_headers)
+    assert client.get('/pages/1', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_snapshot_honours_sparse_fieldsets(client, published):
+    """Test ?fields and ?include against a snapshot page"""
+    data = json.loads(client.get('/pages/1?fields=id,text').data)
+    assert data == {'id': 1, 'text': 'Start'}
+    
+    data = json.loads(client.get('/pages/1?fields=id&include=choices').data)
+    assert data['choices'][0]['text'] == 'Finish'
+
+
+def test_unpublish_and_delete_drop_snapshot(client, auth_headers, published):
+    """Test that leaving published or deleting the story removes its snapshot"""
+    client.put('/stories/1', data=json.dumps({'status': 'suspended'}), headers=auth_headers)
+    assert 'X-Snapshot' not in client.get('/pages/1').headers
+    
+    client.put('/stories/1', data=json.dumps({'status': 'published'}), headers=auth_headers)
+    client.delete('/stories/1', headers=auth_headers)
+    assert PageSnapshot.query.count() == 0
+    assert client.get('/stories/1/start').status_code == 404
+
+
+def test_deleted_page_ids_are_not_served_for_other_stories(client, auth_headers, published):
+    """Test that a new page never picks up another story's published copy"""
+    client.delete('/pages/2', headers=auth_headers)
+    client.post('/stories/import',
+        data=json.dumps({
+            'title': 'Other',
+            'pages': [{'text': 'Other start'}, {'text': 'Other end', 'is_ending': True}],
+            'choices': [{'from_page': 0, 'to_page': 1, 'text': 'On'}]
+        }),
+        headers=auth_headers)
+    
+    # The deleted ID is not handed out again
+    other_pages = [page.id for page in Page.query.filter_by(story_id=2).order_by(Page.id)]
+    assert other_pages == [3, 4]
+    assert json.loads(client.get('/pages/3').data)['text'] == 'Other start'
+    
+    response = client.put('/stories/2', data=json.dumps({'status': 'published'}), headers=auth_headers)
+    assert response.status_code == 200
+    assert json.loads(client.get('/pages/2').data)['text'] == 'End'
+    assert json.loads(client.get('/pages/4').data)['text'] == 'Other end'
+    
+    # Even a colliding snapshot row only answers for its own story's page
+    db.session.add(PageSnapshot(story_id=1, page_id=5, version=1, published_at=datetime.utcnow(), body=b'{}'))
+    db.session.commit()
+    response = client.post('/stories/2/pages', data=json.dumps({'text': 'Draft'}), headers=auth_headers)
+    assert json.loads(response.data)['id'] == 5
+    assert json.loads(client.get('/pages/5').data)['text'] == 'Draft'
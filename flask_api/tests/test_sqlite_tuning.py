@@ -0,0 +1,23 @@
+from app import create_app
+from app.config import ProductionConfig
+from app.extensions import db
+
+
+def test_production_pragmas_are_applied(tmp_path):
+    """Test that every pooled connection gets the production PRAGMAs"""
+    database = tmp_path / 'tuned.db'
+    
+    class TunedConfig(ProductionConfig):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{database}'
+    
+    app = create_app(TunedConfig)
+    with app.app_context():
+        with db.engine.connect() as conn:
+            pragma = lambda name: conn.exec_driver_sql(f'PRAGMA {name}').scalar()
+            assert pragma('journal_mode') == 'wal'
+            assert pragma('synchronous') == 1  # NORMAL
+            assert pragma('cache_size') == -64000
+            assert pragma('busy_timeout') == 5000
+        assert db.engine.pool.size() == ProductionConfig.SQLALCHEMY_ENGINE_OPTIONS['pool_size']
+        db.engine.dispose()
@@ -34,3 +34,72 @@ def test_get_story(client, auth_headers):
     assert response.status_code == 200
     data = json.loads(response.data)
     assert data['title'] == 'Test'
+
+def test_get_story_bundle(client, auth_headers):
+    """Test getting a story with all pages and choices in one call"""
+    client.post('/stories',
+        data=json.dumps({'title': 'Bundle', 'author_id': 1}),
+        headers=auth_headers)
+    client.post('/stories/1/pages',
+        data=json.dumps({'text': 'Start page'}),
+        headers=auth_headers)
+    client.post('/stories/1/pages',
+        data=json.dumps({'text': 'The end', 'is_ending': True}),
+        headers=auth_headers)
+    client.post('/pages/1/choices',
+        data=json.dumps({'text': 'Go on', 'next_page_id': 2}),
+        headers=auth_headers)
+    
+    response = client.get('/stories/1/bundle')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['story']['title'] == 'Bundle'
+    assert [p['id'] for p in data['pages']] == [1, 2]
+    assert data['pages'][0]['choices'][0]['next_page_id'] == 2
+    assert data['pages'][1]['choices'] == []
+
+def test_get_story_bundle_not_found(client):
+    """Test bundle for a missing story"""
+    response = client.get('/stories/99/bundle')
+    assert response.status_code == 404
+
+def test_get_stories_cursor_pagination(client, auth_headers):
+    """Test walking the story list with limit/cursor"""
+    for i in range(5):
+        client.post('/stories',
+            data=json.dumps({'title': f'Story {i}', 'author_id': 1}),
+            headers=auth_headers)
+    
+    seen = []
+    cursor = None
+    while True:
+        url = '/stories?status=draft&limit=2' + (f'&cursor={cursor}' if cursor else '')
+        data = json.loads(client.get(url).data)
+        assert len(data['stories']) <= 2
+        seen.extend(s['id'] for s in data['stories'])
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+    
+    assert seen == [5, 4, 3, 2, 1]
+
+def test_get_stories_invalid_cursor(client):
+    """Test that a malformed cursor is rejected"""
+    response = client.get('/stories?cursor=not-a-cursor')
+    assert response.status_code == 400
+
+def test_get_stories_by_author(client, auth_headers):
+    """Test filtering the story list by author"""
+    for author_id in (1, 2, 1):
+        client.post('/stories',
+            data=json.dumps({'title': f'By {author_id}', 'author_id': author_id}),
+            headers=auth_headers)
+    
+    data = json.loads(client.get('/stories?status=&author_id=1').data)
+    assert [s['author_id'] for s in data] == [1, 1]
+    
+    page = json.loads(client.get('/stories?status=&author_id=1&limit=1').data)
+    assert [s['author_id'] for s in page['stories']] == [1]
+    page = json.loads(client.get(f"/stories?status=&author_id=1&limit=1&cursor={page['next_cursor']}").data)
+    assert [s['author_id'] for s in page['stories']] == [1]
+    assert page['next_cursor'] is None
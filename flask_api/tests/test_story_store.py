@@ -0,0 +1,204 @@
+import json
+import mmap
+import time
+from threading import Thread
+import pytest
+from datetime import datetime
+from app import create_app
+from app.extensions import db
+from app.models import PageSnapshot
+from app.story_store import StoryStore, StoredStory, encode_story
+from tests.conftest import TestConfig
+
+
+@pytest.fixture
+def store_app(tmp_path):
+    class StoreConfig(TestConfig):
+        STORY_STORE_DIR = str(tmp_path / 'store')
+    
+    app = create_app(StoreConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def published(store_app, auth_headers):
+    client = store_app.test_client()
+    client.post('/stories/import',
+        data=json.dumps({
+            'title': 'Stored',
+            'pages': [{'text': 'Start'}, {'text': 'End', 'is_ending': True}],
+            'choices': [{'from_page': 0, 'to_page': 1, 'text': 'Roll', 'dice_required': True, 'min_roll': 4}]
+        }),
+        headers=auth_headers)
+    client.put('/stories/1', data=json.dumps({'status': 'published'}), headers=auth_headers)
+    return client
+
+
+def test_draft_reads_skip_the_store(published, auth_headers):
+    """Test that authors reading ?draft=1 see edits the store does not have yet"""
+    published.put('/pages/1', data=json.dumps({'text': 'Edited'}), headers=auth_headers)
+    
+    assert published.get('/pages/1').headers['X-Snapshot'] == 'STORE'
+    response = published.get('/pages/1?draft=1', headers=auth_headers)
+    assert 'X-Snapshot' not in response.headers
+    assert json.loads(response.data)['text'] == 'Edited'
+
+
+def test_encode_round_trip():
+    """Test that an encoded story reads back page bodies and integer-linked choices"""
+    published_at = datetime(2026, 10, 18, 12, 30, 15, 123456)
+    choices = [{'id': 7, 'next_page_id': 20, 'dice_required': True, 'min_roll': 5},
+               {'id': 8, 'next_page_id': None, 'dice_required': False, 'min_roll': 1},
+               {'id': 9, 'next_page_id': 40, 'dice_required': False, 'min_roll': 1}]
+    data = encode_story(3, 9, published_at, 10, [(20, b'{"id":20}', []), (10, b'{"id":10}', choices)], b'{}')
+    
+    mapping = mmap.mmap(-1, len(data))
+    mapping.write(data)
+    story = StoredStory(mapping)
+    assert (story.story_id, story.version, story.start_page_id) == (3, 9, 10)
+    assert story.published_at == published_at
+    assert bytes(story.page_body(20)) == b'{"id":20}'
+    assert story.page_body(30) is None
+    assert story.choices(10) == [(7, 20, True, 5), (8, None, False, 1), (9, None, False, 1)]
+    assert bytes(story.tree_body()) == b'{}'
+    
+    choice, page = story.resolve(10, 7)
+    assert json.loads(bytes(choice)) == choices[0]
+    assert bytes(page) == b'{"id":20}'
+    assert story.resolve(30, 7) is None
+    with pytest.raises(LookupError):
+        story.resolve(10, 99)
+    with pytest.raises(ValueError):
+        story.resolve(10, 8)
+    with pytest.raises(LookupError):
+        story.resolve(10, 9)
+
+
+def test_reads_come_from_store_without_sql(published, query_budget):
+    """Test that start, page and tree are served from the mapped store"""
+    for url in ['/stories/1/start', '/pages/2', '/stories/1/tree']:
+        with query_budget(0):
+            response = published.get(url)
+        assert response.status_code == 200
+        assert response.headers['X-Snapshot'] == 'STORE'
+    
+    assert json.loads(published.get('/stories/1/start').data)['choices'][0]['min_roll'] == 4
+    assert json.loads(published.get('/pages/1?fields=id,text').data) == {'id': 1, 'text': 'Start'}
+
+
+def test_resolve_choice_from_store(published, query_budget):
+    """Test that following a published choice needs no SQL"""
+    with query_budget(0):
+        response = published.post('/pages/1/choices/1/resolve')
+    data = json.loads(response.data)
+    assert data['choice']['min_roll'] == 4
+    assert data['page']['text'] == 'End'
+
+
+def test_resolve_choice_from_store_matches_snapshot(published, store_app):
+    """Test that the choice table resolves to the same response as the database snapshot"""
+    stored = published.post('/pages/1/choices/1/resolve').data
+    store_app.extensions['story_store'] = None
+    assert published.post('/pages/1/choices/1/resolve').data == stored
+
+
+def test_other_format_files_are_ignored(published, store_app):
+    """Test that a story file of another format falls back to the database snapshot"""
+    store = store_app.extensions['story_store']
+    story_file = f"{store_app.config['STORY_STORE_DIR']}/story-1.bin"
+    with open(story_file, 'rb') as f:
+        data = bytearray(f.read())
+    data[4:6] = (1).to_bytes(2, 'little')
+    store._replace('story-1.bin', bytes(data))
+    
+    response = published.get('/pages/1')
+    assert response.status_code == 200
+    assert response.headers['X-Snapshot'] == 'HIT'
+    assert store.story(1) is None
+    
+    published.application.test_cli_runner().invoke(args=['story-store', 'rebuild'])
+    assert published.get('/pages/1').headers['X-Snapshot'] == 'STORE'
+
+
+def test_store_matches_snapshot(published, store_app):
+    """Test that store responses equal the database snapshot responses"""
+    stored = {url: published.get(url) for url in ['/stories/1/start', '/pages/2', '/stories/1/tree']}
+    store_app.extensions['story_store'] = None
+    for url, response in stored.items():
+        expected = published.get(url)
+        assert expected.headers['X-Snapshot'] == 'HIT'
+        assert response.data == expected.data
+        assert response.headers['ETag'] == expected.headers['ETag']
+
+
+def test_republish_and_unpublish_update_store(published, store_app, auth_headers):
+    """Test that other workers see a replaced file and a removed story"""
+    reader = StoryStore(store_app.config['STORY_STORE_DIR'])
+    assert json.loads(bytes(reader.page(1).body))['text'] == 'Start'
+    
+    published.put('/pages/1', data=json.dumps({'text': 'Edited'}), headers=auth_headers)
+    assert json.loads(bytes(reader.page(1).body))['text'] == 'Start'
+    published.put('/stories/1', data=json.dumps({'status': 'published'}), headers=auth_headers)
+    assert json.loads(bytes(reader.page(1).body))['text'] == 'Edited'
+    
+    published.put('/stories/1', data=json.dumps({'status': 'suspended'}), headers=auth_headers)
+    assert reader.page(1) is None
+    assert reader.story(1) is None
+
+
+def test_publishing_another_story_keeps_index_entries(published, store_app, auth_headers):
+    """Test that publishing story B rewrites only B's page index entries"""
+    published.post('/stories/import',
+        data=json.dumps({
+            'title': 'Second',
+            'pages': [{'text': 'Begin'}, {'text': 'Finish', 'is_ending': True}],
+            'choices': [{'from_page': 0, 'to_page': 1, 'text': 'On'}]
+        }),
+        headers=auth_headers)
+    store = store_app.extensions['story_store']
+    # Story 1's entries are only in the index file, as if another worker had written them
+    store.update_index([1], [(1, 1), (2, 1)], list)
+    with store_app.app_context():
+        db.session.execute(db.delete(PageSnapshot).where(PageSnapshot.story_id == 1))
+        db.session.commit()
+    
+    published.put('/stories/2', data=json.dumps({'status': 'published'}), headers=auth_headers)
+    assert store.read_index() == [(1, 1), (2, 1), (3, 2), (4, 2)]
+    assert json.loads(bytes(store.page(1).body))['text'] == 'Start'
+    assert json.loads(bytes(store.page(3).body))['text'] == 'Begin'
+
+
+def test_concurrent_index_updates_keep_both_stories(tmp_path, monkeypatch):
+    """Test that index rewrites from two writers at once are serialized by the lock"""
+    store = StoryStore(str(tmp_path))
+    with store.index_lock():
+        store.write_index([(1, 1)])
+    read_index = store.read_index
+    
+    def slow_read_index():
+        entries = read_index()
+        time.sleep(0.05)
+        return entries
+    
+    monkeypatch.setattr(store, 'read_index', slow_read_index)
+    writers = [Thread(target=store.update_index, args=([story_id], [(story_id, story_id)], list))
+               for story_id in (2, 3)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    assert read_index() == [(1, 1), (2, 2), (3, 3)]
+
+
+def test_rebuild_cli_command(published, store_app):
+    """Test that `flask story-store rebuild` rewrites every published story"""
+    store = store_app.extensions['story_store']
+    store.remove_story(1)
+    assert store.page(1) is None
+    
+    result = store_app.test_cli_runner().invoke(args=['story-store', 'rebuild'])
+    assert result.exit_code == 0
+    assert store.page(1) is not None
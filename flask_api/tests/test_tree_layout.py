@@ -0,0 +1,94 @@
+import json
+from app.services.tree_layout import count_crossings, layered_layout, LAYER_SPACING
+
+
+def tree(edges, pages):
+    """A tree response body with page 1 as the start"""
+    return {
+        'nodes': [{'id': i, 'is_start': i == 1} for i in range(1, pages + 1)],
+        'edges': [{'source': s, 'target': t} for s, t in edges]
+    }
+
+
+def test_count_crossings():
+    """Test inversion counting between two layers"""
+    assert count_crossings([1, 2], [3, 4], [(1, 3), (2, 4)]) == 0
+    assert count_crossings([1, 2], [3, 4], [(1, 4), (2, 3)]) == 1
+    assert count_crossings([1, 2, 3], [4, 5, 6], [(1, 6), (2, 5), (3, 4)]) == 3
+
+
+def test_layers_follow_bfs_depth():
+    """Test that layers are BFS depths and unreachable pages get their own roots"""
+    result = layered_layout(tree([(1, 2), (1, 3), (2, 4), (4, 1)], 5))
+    layers = {node['id']: node['layer'] for node in result['nodes']}
+    assert layers == {1: 0, 2: 1, 3: 1, 4: 2, 5: 0}
+    assert all(node['y'] == node['layer'] * LAYER_SPACING for node in result['nodes'])
+    assert result['layout']['layers'] == 3
+
+
+def test_crossings_are_reduced():
+    """Test that a crossed pair of branches is untangled"""
+    # 1 -> 2, 3; 2 -> 5; 3 -> 4 in discovery order crosses once
+    result = layered_layout(tree([(1, 2), (1, 3), (3, 4), (2, 5)], 5))
+    assert result['layout']['crossings'] == 0
+    x = {node['id']: node['x'] for node in result['nodes']}
+    assert (x[2] < x[3]) == (x[5] < x[4])
+
+
+def test_long_edges_get_bend_points():
+    """Test that an edge spanning layers bends through its dummy nodes"""
+    # BFS edges span one layer; page 5 is unreachable, so it roots at layer 0
+    result = layered_layout(tree([(1, 2), (2, 3), (3, 4), (5, 4), (4, 1)], 5))
+    points = {(e['source'], e['target']): e['points'] for e in result['edges']}
+    assert [y for _, y in points[(5, 4)]] == [LAYER_SPACING, 2 * LAYER_SPACING]
+    assert points[(1, 2)] == [] and points[(4, 1)] == []
+
+
+def test_layered_tree_endpoint(client, auth_headers):
+    """Test ?layout=layered on the tree, cached per story version"""
+    client.post('/stories/import',
+        data=json.dumps({
+            'title': 'Layout',
+            'pages': [{'text': 'Start'}, {'text': 'Left'}, {'text': 'Right', 'is_ending': True}],
+            'choices': [{'from_page': 0, 'to_page': 1, 'text': 'L'},
+                        {'from_page': 0, 'to_page': 2, 'text': 'R'},
+                        {'from_page': 1, 'to_page': 2, 'text': 'On'}]
+        }),
+        headers=auth_headers)
+    
+    response = client.get('/stories/1/tree?layout=layered')
+    assert response.status_code == 200
+    assert response.headers['X-Cache'] == 'MISS'
+    data = json.loads(response.data)
+    assert data['layout']['type'] == 'layered'
+    assert {(n['id'], n['layer']) for n in data['nodes']} == {(1, 0), (2, 1), (3, 1)}
+    
+    plain_etag = client.get('/stories/1/tree').headers['ETag']
+    etag = response.headers['ETag']
+    assert etag != plain_etag
+    assert client.get('/stories/1/tree?layout=layered').headers['X-Cache'] == 'HIT'
+    assert client.get('/stories/1/tree?layout=layered', headers={'If-None-Match': etag}).status_code == 304
+    
+    client.post('/stories/1/pages', data=json.dumps({'text': 'Extra'}), headers=auth_headers)
+    response = client.get('/stories/1/tree?layout=layered')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert len(json.loads(response.data)['nodes']) == 4
+    
+    assert client.get('/stories/1/tree?layout=radial').status_code == 400
+    assert client.get('/stories/99/tree?layout=layered').status_code == 404
+
+
+def test_layered_tree_of_published_story(client, auth_headers):
+    """Test that the layout of a published story is built from its snapshot"""
+    client.post('/stories/import',
+        data=json.dumps({
+            'title': 'Published',
+            'pages': [{'text': 'Start'}, {'text': 'End', 'is_ending': True}],
+            'choices': [{'from_page': 0, 'to_page': 1, 'text': 'Finish'}]
+        }),
+        headers=auth_headers)
+    client.put('/stories/1', data=json.dumps({'status': 'published'}), headers=auth_headers)
+    client.post('/stories/1/pages', data=json.dumps({'text': 'Draft'}), headers=auth_headers)
+    
+    data = json.loads(client.get('/stories/1/tree?layout=layered').data)
+    assert [(node['id'], node['x'], node['y']) for node in data['nodes']] == [(1, 0, 0), (2, 0, LAYER_SPACING)]
@@ -0,0 +1,107 @@
+import json
+import pytest
+from app.services import StoryGraph
+
+
+def import_story(client, auth_headers, pages, choices):
+    response = client.post('/stories/import',
+        data=json.dumps({'title': 'Graph', 'pages': pages, 'choices': choices}),
+        headers=auth_headers)
+    return json.loads(response.data)['id']
+
+
+def test_valid_story_publishes(client, auth_headers):
+    """Test that a well-formed story can be published"""
+    story_id = import_story(client, auth_headers,
+        [{'text': 'Start'}, {'text': 'End', 'is_ending': True}],
+        [{'from_page': 0, 'to_page': 1, 'text': 'Finish'}])
+    
+    report = json.loads(client.get(f'/stories/{story_id}/validate').data)
+    assert report['valid']
+    
+    response = client.put(f'/stories/{story_id}',
+        data=json.dumps({'status': 'published'}),
+        headers=auth_headers)
+    assert response.status_code == 200
+    assert json.loads(response.data)['status'] == 'published'
+
+
+def test_loop_without_exit_blocks_publish(client, auth_headers):
+    """Test that a reachable loop with no way out is rejected"""
+    story_id = import_story(client, auth_headers,
+        [{'text': 'Start'}, {'text': 'Loop A'}, {'text': 'Loop B'}, {'text': 'End', 'is_ending': True}],
+        [
+            {'from_page': 0, 'to_page': 1, 'text': 'Into the loop'},
+            {'from_page': 0, 'to_page': 3, 'text': 'Finish'},
+            {'from_page': 1, 'to_page': 2, 'text': 'Around'},
+            {'from_page': 2, 'to_page': 1, 'text': 'And around'},
+        ])
+    
+    report = json.loads(client.get(f'/stories/{story_id}/validate').data)
+    assert not report['valid']
+    assert report['cycles_without_exit'] == [[2, 3]]
+    
+    response = client.put(f'/stories/{story_id}',
+        data=json.dumps({'status': 'published'}),
+        headers=auth_headers)
+    assert response.status_code == 400
+    assert json.loads(response.data)['code'] == 'INVALID_STORY_GRAPH'
+
+
+def test_graph_findings():
+    """Test dangling, cross-story, unreachable and trapped detection"""
+    graph = StoryGraph(
+        story_id=1,
+        start_page_id=10,
+        pages=[(10, False), (11, False), (12, True), (13, False)],
+        choices=[
+            (1, 10, 11, 1),
+            (2, 10, 12, 1),
+            (3, 11, 99, None),
+            (4, 11, 50, 2),
+            (5, 13, 12, 1),
+        ]
+    )
+    report = graph.validate()
+    assert report['dangling_choices'] == [3]
+    assert report['cross_story_choices'] == [4]
+    assert report['unreachable_pages'] == [13]
+    assert report['trapped_pages'] == [11]
+    assert report['warnings']
+
+
+def test_large_story_validates_in_fixed_queries(client, auth_headers, query_budget):
+    """Test a 10k-page story: three queries and a linear pass"""
+    size = 10000
+    pages = [{'text': f'Page {i}', 'is_ending': i == size - 1} for i in range(size)]
+    choices = [{'from_page': i, 'to_page': i + 1, 'text': 'Next'} for i in range(size - 1)]
+    choices += [{'from_page': i, 'to_page': 0, 'text': 'Restart'} for i in range(1, size - 1, 100)]
+    story_id = import_story(client, auth_headers, pages, choices)
+    
+    with query_budget(3):
+        graph = StoryGraph.load(story_id)
+    report = graph.validate()
+    assert report['valid']
+    assert report['reachable_pages'] == size
+
+
+def test_cycles_filter_each_adjacency_once():
+    """Test that Tarjan's walk stays linear for a page with many choices"""
+    fan_out = 2000
+    hub = 1
+    pages = [(hub, False)] + [(page_id, False) for page_id in range(2, fan_out + 2)]
+    choices = [(page_id, hub, page_id, 1) for page_id in range(2, fan_out + 2)]
+    choices += [(fan_out + page_id, page_id, hub, 1) for page_id in range(2, fan_out + 2)]
+    graph = StoryGraph(story_id=1, start_page_id=hub, pages=pages, choices=choices)
+    
+    class CountingSet(set):
+        lookups = 0
+        
+        def __contains__(self, item):
+            CountingSet.lookups += 1
+            return super().__contains__(item)
+    
+    components = graph.cycles(CountingSet(graph.edges))
+    assert components == [list(range(1, fan_out + 2))]
+    # One membership test per edge while filtering, plus the root scan
+    assert CountingSet.lookups <= len(choices) + len(pages)